@@ -0,0 +1,186 @@
+"""
+Benchmark del tiempo de importación del arranque (al estilo de -X importtime):
+cada etapa se importa en un intérprete nuevo con -X importtime y se suma el
+tiempo acumulado de sus importaciones de primer nivel, sin contar las del
+arranque del propio intérprete.
+
+Etapas:
+    hasta_running     lo que SvcDoRun importa antes de informar RUNNING
+    servicio          lo que SvcDoRun importa antes de la primera sonda
+    cliente_firebase  src.database.firebase_client solo
+    escaner           src.core.scanner solo
+
+Además de latencia (p50 y máxima, en ms y relativa a las importaciones del
+arranque del intérprete en el mismo proceso) y cantidad de módulos, verifica
+que ninguna etapa cargue dependencias pesadas (firebase_admin, grpc,
+requests, los módulos win32 de las sondas): esas se cargan en su primer uso.
+Uso:
+
+    python benchmarks/bench_arranque.py [--repeticiones N] [--guardar] [--tolerancia 0.25]
+
+--guardar reemplaza la línea base (benchmarks/lineas_base/arranque.json); sin
+él, se compara contra ella y se sale con código 1 si hay regresiones. Una
+dependencia pesada en el arranque es regresión con o sin línea base. Los ms
+absolutos dependen del equipo y solo se informan: se compara p50_rel (tiempo
+de la etapa / tiempo de importación del propio intérprete, ambos medidos en la
+misma corrida), que vale en cualquier equipo con la misma versión de Python.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINEA_BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lineas_base', 'arranque.json')
+
+ETAPAS = {
+    'hasta_running': ('main', 'src.core.registro'),
+    'servicio': ('main', 'src.core.registro', 'src.database.firebase_client',
+                 'src.core.planificador', 'src.core.telemetria', 'src.core.scanner'),
+    'cliente_firebase': ('src.database.firebase_client',),
+    'escaner': ('src.core.scanner',),
+}
+
+# Dependencias que no deben cargarse al arrancar (paquete o cualquier submódulo)
+PESADOS = ('firebase_admin', 'google', 'grpc', 'requests', 'urllib3',
+           'win32evtlog', 'win32evtlogutil', 'win32gui', 'win32gui_struct', 'pythoncom', 'win32com')
+
+METRICAS_TOLERANCIA = ('p50_rel', 'modulos')
+
+# Por debajo de este piso (veces el arranque del intérprete / módulos) una diferencia es ruido
+PISO = {'p50_rel': 0.1, 'modulos': 10}
+
+
+def importar(modulos, entorno):
+    """
+    Importa los módulos en un intérprete nuevo con -X importtime.
+
+    Returns:
+        [(nombre, nivel, acumulado_us)] en el orden de la salida
+    """
+    codigo = '; '.join(f'import {m}' for m in modulos) or 'pass'
+    resultado = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo], cwd=RAIZ, env=entorno,
+                               capture_output=True, text=True, timeout=120)
+    if resultado.returncode != 0:
+        raise RuntimeError(f"Falló la importación de {', '.join(modulos)}:\n{resultado.stderr[-2000:]}")
+    importaciones = []
+    for linea in resultado.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        # Dos espacios de sangría por nivel de anidamiento
+        nivel = (len(nombre) - len(nombre.lstrip(' ')) - 1) // 2
+        importaciones.append((nombre.strip(), nivel, int(acumulado)))
+    return importaciones
+
+
+def es_pesado(nombre):
+    return any(nombre == p or nombre.startswith(p + '.') for p in PESADOS)
+
+
+def _primer_nivel_ms(importaciones):
+    return sum(acumulado for _, nivel, acumulado in importaciones if nivel == 0) / 1000
+
+
+def medir_etapa(modulos, repeticiones, entorno, del_interprete):
+    """
+    Latencia de las importaciones de primer nivel propias de la etapa, en ms y
+    relativa a las del arranque del intérprete en el mismo proceso
+    """
+    duraciones, relativas, cargados = [], [], []
+    # La primera corrida compila los .pyc y no se cuenta
+    for corrida in range(repeticiones + 1):
+        todas = importar(modulos, entorno)
+        importaciones = [i for i in todas if i[0] not in del_interprete]
+        if corrida == 0:
+            continue
+        duraciones.append(_primer_nivel_ms(importaciones))
+        relativas.append(duraciones[-1] / _primer_nivel_ms([i for i in todas if i[0] in del_interprete]))
+        cargados = [nombre for nombre, _, _ in importaciones]
+    return {
+        'p50_ms': round(statistics.median(duraciones), 1),
+        'max_ms': round(max(duraciones), 1),
+        'p50_rel': round(statistics.median(relativas), 2),
+        'modulos': len(cargados),
+        'pesados': sorted({n for n in cargados if es_pesado(n)})
+    }
+
+
+def ejecutar(repeticiones):
+    carpeta = tempfile.mkdtemp(prefix='bench_arranque_')
+    try:
+        # configurar_registro() crea archivos en DATA_DIR: que no sea el del usuario
+        entorno = dict(os.environ, HOME=carpeta, USERPROFILE=carpeta, ProgramData=carpeta)
+        entorno.pop('PYTHONDONTWRITEBYTECODE', None)
+        del_interprete = {nombre for nombre, _, _ in importar((), entorno)}
+        return {etapa: medir_etapa(modulos, repeticiones, entorno, del_interprete)
+                for etapa, modulos in ETAPAS.items()}
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+def comparar(etapas, linea_base, tolerancia):
+    """Lista de regresiones (texto) respecto de la línea base"""
+    regresiones = []
+    for etapa, metricas in etapas.items():
+        if metricas['pesados']:
+            regresiones.append(f"{etapa}.pesados: {', '.join(metricas['pesados'])}")
+        base = linea_base.get(etapa)
+        if base is None:
+            continue
+        for clave in METRICAS_TOLERANCIA:
+            if clave in base and metricas[clave] > base[clave] * (1 + tolerancia) + PISO[clave]:
+                regresiones.append(f"{etapa}.{clave}: {base[clave]} -> {metricas[clave]}")
+    return regresiones
+
+
+def imprimir(etapas):
+    columnas = ('p50_ms', 'max_ms', 'p50_rel', 'modulos')
+    print(f"{'etapa':<18}" + ''.join(f"{c:>10}" for c in columnas) + "  pesados")
+    for etapa, metricas in etapas.items():
+        print(f"{etapa:<18}" + ''.join(f"{str(metricas[c]):>10}" for c in columnas)
+              + f"  {', '.join(metricas['pesados']) or '-'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del tiempo de importación del arranque")
+    parser.add_argument('--repeticiones', type=int, default=7)
+    parser.add_argument('--guardar', action='store_true', help="Guardar como nueva línea base")
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="Aumento relativo admitido en tiempo y módulos (0.25 = 25 %%)")
+    parser.add_argument('--linea-base', default=LINEA_BASE_PATH)
+    argumentos = parser.parse_args()
+
+    etapas = ejecutar(argumentos.repeticiones)
+    imprimir(etapas)
+
+    linea_base = {}
+    if argumentos.guardar:
+        os.makedirs(os.path.dirname(argumentos.linea_base), exist_ok=True)
+        with open(argumentos.linea_base, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'repeticiones': argumentos.repeticiones,
+                'etapas': etapas
+            }, f, indent=2)
+            f.write('\n')
+        print(f"\nLínea base guardada en {argumentos.linea_base}")
+    elif os.path.exists(argumentos.linea_base):
+        with open(argumentos.linea_base, 'r', encoding='utf-8') as f:
+            linea_base = json.load(f)['etapas']
+    else:
+        print("\nSin línea base (usar --guardar para crearla)")
+
+    regresiones = comparar(etapas, linea_base, argumentos.tolerancia)
+    if regresiones:
+        print("\nRegresiones en el arranque:")
+        for regresion in regresiones:
+            print(f"  {regresion}")
+        sys.exit(1)
+    print("\nSin regresiones en el arranque")
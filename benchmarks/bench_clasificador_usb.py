@@ -0,0 +1,110 @@
+"""
+Benchmark del clasificador USB con miles de entradas PnP sintéticas (corre en Linux).
+
+Compara el clasificador compilado con la implementación anterior (normalizar
+todas las exclusiones en cada llamada y consolidar HID con 'd not in genericos')
+y verifica que ambas den el mismo resultado. Uso:
+
+    python benchmarks/bench_clasificador_usb.py [cantidad]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.clasificador_usb import (CATEGORIAS_USB, EXCLUIR_USB, HID_GENERICOS,
+                                       ClasificadorUSB, normalizar_nombre_usb)
+
+_NOMBRES = [
+    'USB Root Hub (USB 3.0)', 'Concentrador raíz USB', 'Generic USB Hub', 'USB Composite Device',
+    'HID-compliant mouse', 'Dispositivo de entrada USB', 'USB Input Device', 'HID Keyboard Device',
+    'Logitech BRIO', 'Integrated Webcam', 'SanDisk Cruzer Blade', 'Kingston DataTraveler',
+    'Realtek USB GbE Family Controller', 'Intel(R) Wireless Bluetooth(R)', 'Synaptics FS7605',
+    'Microsoft Usbccid Smartcard Reader', 'Jabra Evolve 40', 'EPSON L3150 Series',
+]
+_CLASES = ['USB', 'HIDClass', 'Image', 'DiskDrive', 'Net', 'Bluetooth', 'Biometric',
+           'SmartCardReader', 'Media', 'Printer']
+_FABRICANTES = ['', '(Standard system devices)', 'Microsoft', 'Logitech', 'Intel', 'Realtek']
+
+
+def entradas_sinteticas(cantidad, semilla=7):
+    rnd = random.Random(semilla)
+    return [{
+        'FriendlyName': f"{rnd.choice(_NOMBRES)} #{rnd.randint(1, cantidad // 4)}",
+        'Class': rnd.choice(_CLASES),
+        'Manufacturer': rnd.choice(_FABRICANTES),
+    } for _ in range(cantidad)]
+
+
+# ---------- Implementación anterior (referencia) ----------
+def _normalizar_anterior(texto):
+    if not texto:
+        return ''
+    t = texto.lower().strip()
+    for old, new in [('í', 'i'), ('á', 'a'), ('é', 'e'), ('ó', 'o'), ('ú', 'u'), ('ñ', 'n')]:
+        t = t.replace(old, new)
+    return t
+
+
+def clasificar_anterior(datos):
+    dispositivos = []
+    vistos = set()
+    for dispositivo in datos:
+        nombre = dispositivo.get('FriendlyName', '')
+        fabricante = dispositivo.get('Manufacturer', '')
+        clase = dispositivo.get('Class', 'Otro')
+        nombre_norm = _normalizar_anterior(nombre)
+        if any(t in nombre_norm for t in [_normalizar_anterior(t) for t in EXCLUIR_USB]):
+            continue
+        nombre_final = normalizar_nombre_usb(nombre, fabricante)
+        clave = f"{nombre_final}|{clase}"
+        if clave in vistos:
+            continue
+        vistos.add(clave)
+        dispositivos.append({
+            'nombre': nombre_final,
+            'categoria': CATEGORIAS_USB.get(clase, clase),
+            'fabricante': fabricante or '—',
+            'clase': clase,
+            '_es_generico_hid': clase == 'HIDClass' and any(
+                t in _normalizar_anterior(nombre) for t in HID_GENERICOS)
+        })
+    genericos = [d for d in dispositivos if d.pop('_es_generico_hid', False)]
+    otros = [d for d in dispositivos if d not in genericos]
+    if genericos:
+        count = len(genericos)
+        otros.append({
+            'nombre': "Teclado y Mouse" + (f" ({count} dispositivos)" if count > 1 else ""),
+            'categoria': 'Teclado/Mouse/Controlador',
+            'fabricante': '—',
+            'clase': 'HIDClass'
+        })
+    otros.sort(key=lambda d: (d['categoria'], d['nombre']))
+    return otros
+
+
+def medir(funcion, datos, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion(datos)
+    return (time.perf_counter() - inicio) / repeticiones, resultado
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    datos = entradas_sinteticas(cantidad)
+
+    inicio = time.perf_counter()
+    clasificador = ClasificadorUSB()
+    compilacion = time.perf_counter() - inicio
+
+    t_anterior, r_anterior = medir(clasificar_anterior, datos, 3)
+    t_nuevo, r_nuevo = medir(clasificador.clasificar, datos, 3)
+
+    print(f"Entradas PnP sintéticas: {cantidad} → {len(r_nuevo)} periféricos")
+    print(f"Compilación de reglas:   {compilacion * 1e3:.2f} ms (una vez)")
+    print(f"Anterior:                {t_anterior * 1e3:.1f} ms")
+    print(f"Compilado:               {t_nuevo * 1e3:.1f} ms (x{t_anterior / t_nuevo:.1f})")
+    print(f"Mismo resultado:         {r_anterior == r_nuevo}")
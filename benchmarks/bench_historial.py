@@ -0,0 +1,66 @@
+"""
+Benchmark del muestreador de historial con contadores sintéticos (corre en Linux).
+
+Mide el costo de cada muestra y de cada resumen, y la memoria fija de los
+buffers circulares. Uso:
+
+    python benchmarks/bench_historial.py
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.historial import CAPACIDAD, Muestreador
+
+
+def contadores_sinteticos():
+    estado = {'cpu_total': 0.0, 'cpu_ocioso': 0.0, 'disco_lectura': 0, 'disco_escritura': 0,
+              'red_envio': 0, 'red_recepcion': 0}
+
+    def leer():
+        estado['cpu_total'] += 5.0
+        estado['cpu_ocioso'] += random.uniform(0, 5.0)
+        for clave in ('disco_lectura', 'disco_escritura', 'red_envio', 'red_recepcion'):
+            estado[clave] += random.randint(0, 10_000_000)
+        return dict(estado, ram_porcentaje=random.uniform(30, 90))
+
+    return leer
+
+
+def reloj_falso():
+    t = [0.0]
+
+    def reloj():
+        t[0] += 5.0
+        return t[0]
+
+    return reloj
+
+
+if __name__ == "__main__":
+    muestreador = Muestreador(leer_contadores=contadores_sinteticos(), reloj=reloj_falso())
+    muestreador.muestrear()
+
+    n = CAPACIDAD * 10
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    for _ in range(n):
+        muestreador.muestrear()
+    por_muestra = (time.perf_counter() - inicio) / n
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    resumen = muestreador.resumen()
+    t_resumen = time.perf_counter() - inicio
+
+    print(f"Muestras:            {n} (capacidad {CAPACIDAD})")
+    print(f"Costo por muestra:   {por_muestra * 1e6:.1f} µs")
+    print(f"Costo del resumen:   {t_resumen * 1e3:.2f} ms ({resumen['muestras']} muestras)")
+    print(f"Memoria de buffers:  {muestreador.bytes_ocupados / 1024:.1f} KB (fija)")
+    print(f"Pico de asignación:  {pico / 1024:.1f} KB durante el muestreo")
+    print(f"CPU p95 ventana:     {resumen['cpu_porcentaje']['p95']}%")
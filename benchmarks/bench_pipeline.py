@@ -0,0 +1,243 @@
+"""
+Benchmark reproducible del escaneo y la sincronización completos, sin Windows,
+sin red y sin Firebase (backends falsos de benchmarks/falsos.py; corre en Linux).
+
+Etapas:
+    escaneo_frio       primer obtener_datos_pc() (cachés vacías)
+    escaneo            obtener_datos_pc() siguientes (con registros de eventos nuevos)
+    perifericos        obtener_todos_los_perifericos() (escaneo completo)
+    envio_completo     primer enviar_datos_pc() (documento completo)
+    envio_incremental  enviar_datos_pc() siguientes (solo lo que cambió)
+
+Por etapa informa latencia (p50 y máxima, en ms y relativa a un lazo de
+calibración), memoria asignada (pico de tracemalloc), RSS pico del proceso,
+procesos hijos y llamadas a PowerShell, y lotes/escrituras/bytes enviados a
+Firestore. Uso:
+
+    python benchmarks/bench_pipeline.py [--repeticiones N] [--guardar] [--tolerancia 0.25]
+
+--guardar reemplaza la línea base (benchmarks/lineas_base/pipeline.json); sin
+él, se compara contra ella y se sale con código 1 si hay regresiones. Los
+conteos se comparan exactos y la memoria y los bytes con tolerancia; los ms
+absolutos dependen del equipo y solo se informan. La latencia se compara
+relativa a un lazo de calibración medido junto a cada corrida (p50_rel, en
+unidades de calibración) y solo en las etapas de varias corridas: una
+corrida única (escaneo_frio, envio_completo) es puro ruido.
+"""
+import argparse
+import json
+import os
+import random
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from falsos import BackendsFalsos
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+LINEA_BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lineas_base', 'pipeline.json')
+
+# Métricas que se comparan con tolerancia relativa; los conteos se comparan exactos
+METRICAS_TOLERANCIA = ('p50_rel', 'asignado_kb', 'bytes_escritos')
+METRICAS_EXACTAS = ('hijos', 'powershell', 'lotes', 'escrituras')
+
+# Por debajo de este piso (calibraciones / KB / bytes) una diferencia es ruido
+PISO = {'p50_rel': 0.25, 'asignado_kb': 64.0, 'bytes_escritos': 256}
+
+# Corridas del lazo de calibración antes de cada corrida de una etapa (se toma la mínima)
+CORRIDAS_CALIBRACION = 3
+
+# Registros de eventos nuevos entre escaneos
+EVENTOS_POR_CICLO = 40
+
+
+def rss_pico_mb():
+    """RSS máximo del proceso hasta ahora (None si la plataforma no lo informa)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss viene en KB en Linux y en bytes en macOS
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def lazo_calibracion():
+    """
+    Trabajo fijo en Python puro parecido al del pipeline (diccionarios, texto
+    y JSON): su duración es la unidad de p50_rel en este equipo e intérprete.
+    """
+    aleatorio = random.Random(0)
+    procesos = [{'pid': i, 'nombre': f'proceso{i % 40}.exe', 'ram_mb': aleatorio.random() * 500,
+                 'cpu': aleatorio.random() * 100} for i in range(500)]
+    por_nombre = {}
+    for proceso in procesos:
+        por_nombre.setdefault(proceso['nombre'].lower(), []).append(proceso['ram_mb'])
+    resumen = {nombre: round(sum(valores), 2) for nombre, valores in sorted(por_nombre.items())}
+    json.loads(json.dumps({'procesos': procesos, 'resumen': resumen}))
+
+
+def calibrar(corridas=CORRIDAS_CALIBRACION):
+    """Duración mínima (ms) del lazo de calibración: la menos afectada por el resto del equipo"""
+    duraciones = []
+    for _ in range(corridas):
+        inicio = time.perf_counter()
+        lazo_calibracion()
+        duraciones.append((time.perf_counter() - inicio) * 1000)
+    return min(duraciones)
+
+
+def medir_etapa(falsos, funcion, repeticiones, preparar=None):
+    """
+    Corre la etapa 'repeticiones' veces midiendo tiempo; la última corrida se
+    repite con tracemalloc (que la enlentece) solo para medir asignaciones.
+    Los conteos de backends son por corrida y no incluyen a preparar(). Cada
+    corrida va precedida de una calibración: p50_rel compara ambas en el mismo
+    momento y no le afecta que el equipo se enlentezca a mitad del benchmark.
+    """
+    conteos = {}
+    duraciones, relativas = [], []
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        calibracion_ms = calibrar()
+        antes = falsos.contadores()
+        inicio = time.perf_counter()
+        funcion()
+        duraciones.append((time.perf_counter() - inicio) * 1000)
+        relativas.append(duraciones[-1] / calibracion_ms)
+        for clave, valor in falsos.contadores().items():
+            conteos[clave] = conteos.get(clave, 0) + valor - antes[clave]
+
+    if preparar:
+        preparar()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    resultado = {
+        'corridas': repeticiones,
+        'p50_ms': round(statistics.median(duraciones), 2),
+        'max_ms': round(max(duraciones), 2),
+        'p50_rel': round(statistics.median(relativas), 3),
+        'asignado_kb': round((pico - base) / 1024, 1),
+        'rss_pico_mb': rss_pico_mb()
+    }
+    for clave, total in conteos.items():
+        resultado[clave] = round(total / repeticiones, 1)
+    return resultado
+
+
+def ejecutar(repeticiones):
+    carpeta = tempfile.mkdtemp(prefix='bench_pipeline_')
+    try:
+        falsos = BackendsFalsos(carpeta)
+        falsos.instalar()
+
+        from src.core.perifericos import obtener_todos_los_perifericos
+        from src.core.scanner import obtener_datos_pc
+        from src.database import firebase_client
+
+        def enviar(datos, **opciones):
+            firebase_client.enviar_datos_pc(dict(datos), **opciones)
+            # El escritor agrupa en segundo plano: se vacía para contar lo enviado
+            firebase_client.vaciar_escrituras()
+
+        etapas = {}
+        datos = {}
+
+        def escanear():
+            datos.update(obtener_datos_pc())
+
+        etapas['escaneo_frio'] = medir_etapa(falsos, escanear, 1)
+        etapas['escaneo'] = medir_etapa(falsos, escanear, repeticiones,
+                                        preparar=lambda: falsos.eventos.agregar(EVENTOS_POR_CICLO))
+        etapas['perifericos'] = medir_etapa(falsos, obtener_todos_los_perifericos, repeticiones)
+        etapas['envio_completo'] = medir_etapa(falsos, lambda: enviar(datos, forzar_completo=True), 1)
+
+        def escanear_y_cambiar():
+            falsos.eventos.agregar(EVENTOS_POR_CICLO)
+            escanear()
+
+        etapas['envio_incremental'] = medir_etapa(falsos, lambda: enviar(datos), repeticiones,
+                                                  preparar=escanear_y_cambiar)
+        firebase_client.detener_cliente()
+        return etapas
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+def comparar(etapas, linea_base, tolerancia):
+    """Lista de regresiones (texto) respecto de la línea base"""
+    regresiones = []
+    for etapa, metricas in etapas.items():
+        base = linea_base.get(etapa)
+        if base is None:
+            continue
+        for clave in METRICAS_TOLERANCIA:
+            if clave == 'p50_rel' and metricas['corridas'] < 3:
+                continue
+            if clave in base and metricas[clave] > base[clave] * (1 + tolerancia) + PISO[clave]:
+                regresiones.append(f"{etapa}.{clave}: {base[clave]} -> {metricas[clave]}")
+        for clave in METRICAS_EXACTAS:
+            if clave in base and metricas[clave] > base[clave]:
+                regresiones.append(f"{etapa}.{clave}: {base[clave]} -> {metricas[clave]}")
+    return regresiones
+
+
+def imprimir(etapas):
+    columnas = ('p50_ms', 'max_ms', 'p50_rel', 'asignado_kb', 'rss_pico_mb', 'hijos', 'powershell',
+                'lotes', 'escrituras', 'bytes_escritos')
+    print(f"{'etapa':<18}" + ''.join(f"{c:>15}" for c in columnas))
+    for etapa, metricas in etapas.items():
+        print(f"{etapa:<18}" + ''.join(f"{str(metricas[c]):>15}" for c in columnas))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark offline del escaneo y la sincronización")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--guardar', action='store_true', help="Guardar como nueva línea base")
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="Aumento relativo admitido en latencia, memoria y bytes (0.25 = 25 %%)")
+    parser.add_argument('--linea-base', default=LINEA_BASE_PATH)
+    argumentos = parser.parse_args()
+
+    etapas = ejecutar(argumentos.repeticiones)
+    imprimir(etapas)
+
+    if argumentos.guardar:
+        os.makedirs(os.path.dirname(argumentos.linea_base), exist_ok=True)
+        with open(argumentos.linea_base, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'repeticiones': argumentos.repeticiones,
+                'etapas': etapas
+            }, f, indent=2)
+            f.write('\n')
+        print(f"\nLínea base guardada en {argumentos.linea_base}")
+        sys.exit(0)
+
+    if not os.path.exists(argumentos.linea_base):
+        print("\nSin línea base (usar --guardar para crearla)")
+        sys.exit(0)
+    with open(argumentos.linea_base, 'r', encoding='utf-8') as f:
+        linea_base = json.load(f)
+    regresiones = comparar(etapas, linea_base['etapas'], argumentos.tolerancia)
+    if regresiones:
+        print("\nRegresiones respecto de la línea base:")
+        for regresion in regresiones:
+            print(f"  {regresion}")
+        sys.exit(1)
+    print("\nSin regresiones respecto de la línea base")
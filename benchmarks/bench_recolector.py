@@ -0,0 +1,64 @@
+"""
+Benchmark del recolector de sondas con sondas simuladas (corre en Linux).
+
+Compara la ejecución secuencial (como el escaneo original) contra el
+Recolector en paralelo. Uso:
+
+    python benchmarks/bench_recolector.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.recolector import Recolector
+
+# Duraciones aproximadas de las sondas reales en un equipo de la flota (segundos)
+SONDAS_FALSAS = {
+    "uuid": 0.30,
+    "cpu_uso_porcentaje": 0.50,
+    "discos": 0.80,
+    "servicios_criticos": 0.60,
+    "ip_publica": 0.40,
+    "anydesk_id": 0.30,
+    "aplicaciones_activas": 1.20,
+    "errores_huellas": 0.40,
+    "perifericos": 1.50,
+}
+
+
+def _sonda_falsa(clave, duracion):
+    def sonda():
+        time.sleep(duracion)
+        return clave
+    return sonda
+
+
+def medir_secuencial():
+    inicio = time.perf_counter()
+    for clave, duracion in SONDAS_FALSAS.items():
+        _sonda_falsa(clave, duracion)()
+    return time.perf_counter() - inicio
+
+
+def medir_paralelo():
+    recolector = Recolector()
+    for clave, duracion in SONDAS_FALSAS.items():
+        recolector.registrar(clave, _sonda_falsa(clave, duracion), timeout=5)
+    inicio = time.perf_counter()
+    resultados = recolector.ejecutar()
+    transcurrido = time.perf_counter() - inicio
+    recolector.cerrar()
+    assert resultados == {c: c for c in SONDAS_FALSAS}
+    return transcurrido
+
+
+if __name__ == "__main__":
+    secuencial = medir_secuencial()
+    paralelo = medir_paralelo()
+    mas_lenta = max(SONDAS_FALSAS.values())
+    print(f"Secuencial:        {secuencial:.2f}s")
+    print(f"Paralelo:          {paralelo:.2f}s")
+    print(f"Sonda más lenta:   {mas_lenta:.2f}s")
+    print(f"Aceleración:       x{secuencial / paralelo:.1f}")
@@ -0,0 +1,532 @@
+"""
+Backends falsos para correr el escaneo y la sincronización sin Windows, sin red
+y sin Firebase (usados por bench_pipeline.py):
+
+- wmic y sc: salidas grabadas en benchmarks/grabaciones
+- PowerShell: JSON grabado, elegido por una marca del script
+- psutil: tabla de procesos y contadores sintéticos, reproducibles por semilla
+- Visor de eventos: registros sintéticos, con llegada de registros nuevos a pedido
+- Firestore: base en memoria que cuenta lotes, escrituras y bytes
+
+Uso (antes de importar cualquier módulo de src):
+
+    falsos = BackendsFalsos(carpeta_datos)
+    falsos.instalar()
+    from src.core.scanner import obtener_datos_pc
+"""
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import types
+from collections import Counter, namedtuple
+
+GRABACIONES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grabaciones')
+
+
+def leer_grabacion(nombre, carpeta=GRABACIONES):
+    with open(os.path.join(carpeta, nombre), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+# ==================== SUBPROCESS (wmic / sc) ====================
+_Completado = namedtuple('_Completado', 'args returncode stdout stderr')
+
+
+class SubprocesoGrabado:
+    """
+    Sustituto del módulo subprocess en el backend de Windows: devuelve la salida
+    grabada del comando y cuenta las llamadas. Un comando sin grabación se
+    comporta como un ejecutable inexistente.
+    """
+
+    CREATE_NO_WINDOW = 0x08000000
+    PIPE = subprocess.PIPE
+    TimeoutExpired = subprocess.TimeoutExpired
+
+    COMANDOS = {
+        ('wmic', 'diskdrive'): 'wmic_diskdrive.txt',
+        ('wmic', 'path'): 'wmic_particiones.txt',
+        ('wmic', 'csproduct'): 'wmic_csproduct.txt',
+        ('sc', 'queryex'): 'sc_queryex.txt',
+    }
+
+    def __init__(self, carpeta=GRABACIONES):
+        self._salidas = {clave: leer_grabacion(archivo, carpeta) for clave, archivo in self.COMANDOS.items()}
+        self.llamadas = Counter()
+
+    def _salida(self, args):
+        partes = args.split() if isinstance(args, str) else list(args)
+        clave = tuple(p.lower() for p in partes[:2])
+        self.llamadas[' '.join(clave)] += 1
+        if clave not in self._salidas:
+            raise FileNotFoundError(f"Sin grabación para {' '.join(partes)}")
+        return self._salidas[clave]
+
+    def run(self, args, capture_output=False, text=False, timeout=None, **opciones):
+        salida = self._salida(args)
+        return _Completado(args, 0, salida if text else salida.encode('utf-8'), '' if text else b'')
+
+
+# ==================== POWERSHELL ====================
+class PowerShellGrabado:
+    """
+    Sustituto de ejecutar_powershell: identifica el script por una marca y
+    devuelve el JSON grabado. latencia simula el viaje al host (0 = solo el
+    costo del lado de Python).
+    """
+
+    MARCAS = (
+        ('PantallasAgente', 'ps_monitores.json'),
+        ('Get-Printer', 'ps_impresoras.json'),
+        ('Get-PnpDevice', 'ps_usb.json'),
+        ('Win32_SoundDevice', 'ps_audio.json'),
+        ('FileVersionInfo', 'ps_descripciones.json'),
+    )
+
+    def __init__(self, carpeta=GRABACIONES, latencia=0.0):
+        self._datos = {marca: json.loads(leer_grabacion(archivo, carpeta)) for marca, archivo in self.MARCAS}
+        self._latencia = latencia
+        self.llamadas = Counter()
+
+    def __call__(self, script, timeout=10):
+        if self._latencia:
+            time.sleep(self._latencia)
+        for marca, _ in self.MARCAS:
+            if marca in script:
+                self.llamadas[marca] += 1
+                return json.dumps(self._responder(marca, script), ensure_ascii=False)
+        self.llamadas['otro'] += 1
+        return ''
+
+    def _responder(self, marca, script):
+        datos = self._datos[marca]
+        if marca == 'Get-PnpDevice' and '-InstanceId @(' in script:
+            # describir_usb_pnp: solo los ids pedidos
+            pedidos = script.split('-InstanceId @(', 1)[1].split(')', 1)[0]
+            return [d for d in datos if f"'{d['InstanceId']}'" in pedidos]
+        if marca == 'FileVersionInfo':
+            # Las rutas viajan como '<json>' | ConvertFrom-Json
+            rutas = json.loads(script.split("'", 1)[1].rsplit("' | ConvertFrom-Json", 1)[0].replace("''", "'"))
+            return [{'Ruta': r, 'Descripcion': datos.get(os.path.basename(r).lower(), '')} for r in rutas]
+        return datos
+
+
+# ==================== PSUTIL ====================
+_scputimes = namedtuple('scputimes', 'user system idle')
+_pcputimes = namedtuple('pcputimes', 'user system')
+_pmem = namedtuple('pmem', 'rss vms private')
+_svmem = namedtuple('svmem', 'total available percent used free')
+_sdiskpart = namedtuple('sdiskpart', 'device mountpoint fstype opts')
+_sdiskusage = namedtuple('sdiskusage', 'total used free percent')
+_snicstats = namedtuple('snicstats', 'isup duplex speed mtu')
+_snicaddr = namedtuple('snicaddr', 'family address netmask broadcast ptp')
+_snetio = namedtuple('snetio', 'bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout')
+_sdiskio = namedtuple('sdiskio', 'read_count write_count read_bytes write_bytes')
+_suser = namedtuple('suser', 'name terminal host started')
+
+# (nombre, tiene ejecutable legible, instancias, MB por instancia) de un puesto de oficina típico
+_PROCESOS_TIPICOS = [
+    ('chrome.exe', True, 28, 90),
+    ('msedge.exe', True, 12, 60),
+    ('teams.exe', True, 6, 120),
+    ('outlook.exe', True, 1, 250),
+    ('excel.exe', True, 1, 180),
+    ('winword.exe', True, 1, 150),
+    ('explorer.exe', True, 1, 110),
+    ('msmpeng.exe', True, 1, 200),
+    ('searchhost.exe', True, 1, 80),
+    ('anydesk.exe', True, 2, 30),
+    ('svchost.exe', True, 70, 12),
+    ('conhost.exe', True, 8, 6),
+    ('runtimebroker.exe', True, 10, 15),
+    ('csrss.exe', False, 2, 5),
+    ('lsass.exe', False, 1, 20),
+    ('dwm.exe', False, 1, 90),
+]
+
+
+class _ProcesoSintetico:
+    __slots__ = ('pid', 'info')
+
+    def __init__(self, pid, info):
+        self.pid = pid
+        self.info = info
+
+
+class PsutilSintetico:
+    """
+    Módulo psutil sintético y reproducible: procesos de un puesto de oficina
+    (más relleno hasta 'procesos') y contadores que avanzan en cada lectura.
+
+    Args:
+        carpeta_programas: Carpeta de los ejecutables; la caché de descripciones
+                           hace os.stat, así que BackendsFalsos los crea vacíos
+    """
+
+    def __init__(self, procesos=300, semilla=1, carpeta_programas='programas'):
+        rnd = random.Random(semilla)
+        self._procesos = []
+        pid = 4
+        for nombre, legible, instancias, mb in _PROCESOS_TIPICOS:
+            exe = os.path.join(carpeta_programas, nombre) if legible else None
+            for _ in range(instancias):
+                pid += 4
+                self._procesos.append([pid, nombre, exe, int(mb * rnd.uniform(0.5, 1.5) * 1024 * 1024),
+                                       rnd.uniform(0, 50), 1_700_000_000 + pid])
+        while len(self._procesos) < procesos:
+            pid += 4
+            self._procesos.append([pid, f"proceso{pid}.exe", os.path.join(carpeta_programas, f"proceso{pid}.exe"),
+                                   rnd.randint(1, 40) * 1024 * 1024, rnd.uniform(0, 5), 1_700_000_000 + pid])
+        self._rnd = rnd
+        self._lecturas = 0
+
+    def ejecutables(self):
+        return sorted({fila[2] for fila in self._procesos if fila[2]})
+
+    def _avanzar(self):
+        self._lecturas += 1
+        return self._lecturas
+
+    # ---------- API de psutil usada por el agente ----------
+    def process_iter(self, attrs=None):
+        for fila in self._procesos:
+            # CPU acumulada crece un poco en cada lectura (como un equipo real)
+            fila[4] += self._rnd.uniform(0, 0.2)
+            pid, nombre, exe, rss, cpu, creado = fila
+            yield _ProcesoSintetico(pid, {
+                'name': nombre,
+                'exe': exe,
+                'memory_info': _pmem(rss, rss * 2, rss),
+                'cpu_times': _pcputimes(cpu * 0.7, cpu * 0.3),
+                'create_time': creado
+            })
+
+    def cpu_times(self):
+        n = self._avanzar()
+        return _scputimes(1000.0 + n * 0.6, 400.0 + n * 0.2, 8000.0 + n * 3.2)
+
+    def cpu_percent(self, interval=None):
+        return 12.5
+
+    def cpu_count(self, logical=True):
+        return 8 if logical else 4
+
+    def virtual_memory(self):
+        total = 16 * 1024 ** 3
+        return _svmem(total, total * 0.42, 58.0, total * 0.58, total * 0.42)
+
+    def disk_partitions(self, all=False):
+        return [_sdiskpart('C:\\', 'C:\\', 'NTFS', 'rw,fixed'),
+                _sdiskpart('D:\\', 'D:\\', 'NTFS', 'rw,fixed'),
+                _sdiskpart('E:\\', 'E:\\', 'FAT32', 'rw,removable')]
+
+    def disk_usage(self, ruta):
+        total = 512 * 1024 ** 3 if ruta.upper().startswith('C') else 1024 ** 4
+        return _sdiskusage(total, int(total * 0.61), int(total * 0.39), 61.0)
+
+    def disk_io_counters(self):
+        n = self._avanzar()
+        return _sdiskio(n * 10, n * 5, n * 4_000_000, n * 1_500_000)
+
+    def net_if_stats(self):
+        return {'Ethernet': _snicstats(True, 2, 1000, 1500),
+                'Wi-Fi': _snicstats(False, 0, 0, 1500),
+                'Loopback Pseudo-Interface 1': _snicstats(True, 0, 1073, 1500)}
+
+    def net_if_addrs(self):
+        return {'Ethernet': [_snicaddr(socket.AF_INET, '10.20.30.41', '255.255.255.0', None, None)],
+                'Loopback Pseudo-Interface 1': [_snicaddr(socket.AF_INET, '127.0.0.1', '255.0.0.0', None, None)]}
+
+    def net_io_counters(self):
+        n = self._avanzar()
+        return _snetio(n * 250_000, n * 1_200_000, n * 900, n * 1500, 0, 0, 0, 0)
+
+    def users(self):
+        return [_suser('usuario', None, None, 1_700_000_000.0)]
+
+    def sensors_battery(self):
+        return None
+
+    def modulo(self):
+        """Este objeto como módulo 'psutil' (para sys.modules)"""
+        modulo = types.ModuleType('psutil')
+        for nombre in ('process_iter', 'cpu_times', 'cpu_percent', 'cpu_count', 'virtual_memory',
+                       'disk_partitions', 'disk_usage', 'disk_io_counters', 'net_if_stats',
+                       'net_if_addrs', 'net_io_counters', 'users', 'sensors_battery'):
+            setattr(modulo, nombre, getattr(self, nombre))
+        return modulo
+
+
+# ==================== VISOR DE EVENTOS ====================
+_FUENTES_EVENTOS = [
+    ('Service Control Manager', 7000, "El servicio {0} no pudo iniciarse debido al siguiente error: 0x{1:x}"),
+    ('Service Control Manager', 7031, "El servicio {0} terminó inesperadamente. Esto sucedió {1} veces."),
+    ('disk', 7, "El dispositivo \\Device\\Harddisk{1}\\DR{1} tiene un bloque defectuoso."),
+    ('DistributedCOM', 10016, "La configuración de permisos de la aplicación no concede el permiso {{{2}}}"),
+    ('Microsoft-Windows-Kernel-Power', 41, "El sistema se ha reiniciado sin apagarse limpiamente primero."),
+    ('Microsoft-Windows-WindowsUpdateClient', 20, "Error de instalación: Windows no pudo instalar KB50{1}"),
+]
+
+
+class RegistroEventosSintetico:
+    """
+    Log de eventos en memoria con la interfaz de leer_registros del backend
+    (inyectable en LectorEventos). agregar() simula registros nuevos entre ciclos.
+    """
+
+    def __init__(self, cantidad=1000, semilla=11):
+        self._rnd = random.Random(semilla)
+        self._registros = []
+        self.agregar(cantidad)
+
+    def agregar(self, cantidad):
+        for _ in range(cantidad):
+            numero = len(self._registros) + 1
+            fuente, evento_id, plantilla = self._rnd.choice(_FUENTES_EVENTOS)
+            guid = '%08x-%04x-%04x-%04x-%012x' % tuple(self._rnd.getrandbits(b) for b in (32, 16, 16, 16, 48))
+            self._registros.append({
+                'registro': numero,
+                'tipo': self._rnd.choice((1, 1, 2, 4, 4, 4)),
+                'fuente': fuente,
+                'evento_id': evento_id,
+                'fecha': f"10/{1 + numero // 1000 % 28:02d}/26 {numero // 60 % 24:02d}:{numero % 60:02d}:00",
+                'mensaje': plantilla.format(self._rnd.choice(('wuauserv', 'BITS', 'Spooler', 'AnyDesk')),
+                                            self._rnd.randint(1, 99999), guid)
+            })
+
+    def leer(self, log, desde):
+        from src.core.eventos import REGISTROS_INICIALES
+
+        ultimo = len(self._registros)
+        inicio = max(1, ultimo - REGISTROS_INICIALES + 1) if desde is None else desde + 1
+        return self._registros[inicio - 1:], ultimo
+
+
+# ==================== FIRESTORE EN MEMORIA ====================
+class _Centinela:
+    def __init__(self, nombre):
+        self._nombre = nombre
+
+    def __repr__(self):
+        return self._nombre
+
+
+SERVER_TIMESTAMP = _Centinela('SERVER_TIMESTAMP')
+
+
+class _Referencia:
+    def __init__(self, db, coleccion, documento):
+        self._db = db
+        self.ruta = (coleccion, documento)
+
+    def get(self):
+        return self._db.documentos.get(self.ruta)
+
+    def on_snapshot(self, callback):
+        return None
+
+
+class _Coleccion:
+    def __init__(self, db, nombre):
+        self._db = db
+        self._nombre = nombre
+
+    def document(self, documento):
+        return _Referencia(self._db, self._nombre, documento)
+
+
+class _Lote:
+    def __init__(self, db):
+        self._db = db
+        self._operaciones = []
+
+    def set(self, ref, datos, merge=False):
+        self._operaciones.append(('merge' if merge else 'set', ref.ruta, datos))
+
+    def update(self, ref, datos):
+        self._operaciones.append(('update', ref.ruta, datos))
+
+    def commit(self):
+        self._db.aplicar(self._operaciones)
+
+
+class FirestoreEnMemoria:
+    """
+    Doble de firestore.Client: documentos en un dict, WriteBatch con set,
+    merge y update por rutas de campo, y contadores de lo escrito.
+    """
+
+    def __init__(self):
+        self.documentos = {}
+        self.estadisticas = Counter()
+
+    def collection(self, nombre):
+        return _Coleccion(self, nombre)
+
+    def batch(self):
+        return _Lote(self)
+
+    def aplicar(self, operaciones):
+        from src.database.cola_offline import aplicar_update, mezclar
+
+        self.estadisticas['lotes'] += 1
+        for tipo, ruta, datos in operaciones:
+            self.estadisticas['escrituras'] += 1
+            self.estadisticas['campos'] += len(datos)
+            self.estadisticas['bytes'] += len(json.dumps(datos, ensure_ascii=False, default=repr))
+            if tipo == 'set':
+                self.documentos[ruta] = dict(datos)
+            elif tipo == 'merge':
+                self.documentos[ruta] = mezclar(self.documentos.get(ruta, {}), datos)
+            else:
+                if ruta not in self.documentos:
+                    raise KeyError(f"No existe el documento {ruta}")
+                self.documentos[ruta] = aplicar_update(self.documentos[ruta], datos)
+
+
+def modulos_firebase(db):
+    """firebase_admin, firebase_admin.credentials y firebase_admin.firestore sobre db"""
+    firebase_admin = types.ModuleType('firebase_admin')
+    firebase_admin._apps = {}
+    firebase_admin.initialize_app = lambda credencial=None, **opciones: firebase_admin._apps.setdefault(
+        '[DEFAULT]', credencial)
+
+    credentials = types.ModuleType('firebase_admin.credentials')
+    credentials.Certificate = lambda ruta: ruta
+
+    firestore = types.ModuleType('firebase_admin.firestore')
+    firestore.client = lambda: db
+    firestore.SERVER_TIMESTAMP = SERVER_TIMESTAMP
+
+    firebase_admin.credentials = credentials
+    firebase_admin.firestore = firestore
+    return {'firebase_admin': firebase_admin,
+            'firebase_admin.credentials': credentials,
+            'firebase_admin.firestore': firestore}
+
+
+# ==================== REQUESTS ====================
+class _Respuesta:
+    status_code = 200
+    text = '203.0.113.7\n'
+    content = text.encode('ascii')
+
+
+def modulo_requests():
+    requests = types.ModuleType('requests')
+    requests.get = lambda url, timeout=None, **opciones: _Respuesta()
+    return requests
+
+
+# ==================== CARPETA DE DATOS ====================
+# Archivos del agente bajo config.DATA_DIR
+ARCHIVOS_DATOS = {
+    'IDENTIDAD_PATH': 'identidad.json',
+    'COLA_OFFLINE_PATH': 'cola_offline.db',
+    'DESCRIPCIONES_PATH': 'descripciones.json',
+    'CURSOR_EVENTOS_PATH': 'cursor_eventos.json',
+    'HUELLAS_EVENTOS_PATH': 'huellas_eventos.json',
+    'LOG_PATH': 'agente.log',
+}
+
+# Módulos que copian esas rutas al importarse
+COPIAS_RUTAS = {
+    'src.core.scanner': ('IDENTIDAD_PATH', 'DESCRIPCIONES_PATH'),
+    'src.core.eventos': ('CURSOR_EVENTOS_PATH', 'HUELLAS_EVENTOS_PATH'),
+    'src.core.registro': ('LOG_PATH',),
+    'src.database.firebase_client': ('COLA_OFFLINE_PATH',),
+}
+
+
+def redirigir_datos(carpeta, asignar=setattr):
+    """
+    Apunta config.DATA_DIR, sus rutas y las copias de cada módulo a carpeta,
+    aunque config ya se haya importado. Con asignar=monkeypatch.setattr se
+    deshace al terminar cada prueba.
+    """
+    import importlib
+
+    from config import config
+    from src.core import telemetria
+    from src.core.descripciones import CacheDescripciones
+
+    rutas = {nombre: os.path.join(carpeta, archivo) for nombre, archivo in ARCHIVOS_DATOS.items()}
+    asignar(config, 'DATA_DIR', carpeta)
+    for nombre, ruta in rutas.items():
+        asignar(config, nombre, ruta)
+    for modulo, nombres in COPIAS_RUTAS.items():
+        modulo = importlib.import_module(modulo)
+        for nombre in nombres:
+            asignar(modulo, nombre, rutas[nombre])
+    asignar(telemetria, 'CARPETA_PERFILES', os.path.join(carpeta, 'perfiles'))
+
+    # Estado ya construido con las rutas anteriores
+    scanner = sys.modules['src.core.scanner']
+    asignar(scanner, '_DESCRIPCIONES', CacheDescripciones(rutas['DESCRIPCIONES_PATH']))
+    asignar(sys.modules['src.core.eventos'], '_LECTOR', None)
+
+
+# ==================== INSTALACIÓN ====================
+class BackendsFalsos:
+    """
+    Instala todos los backends falsos. Debe llamarse antes de importar src:
+    los módulos del agente toman psutil, requests y firebase_admin al importarse.
+
+    Args:
+        carpeta_datos: Carpeta vacía para los archivos del agente (identidad,
+                       cachés, cola offline, registro): cada corrida arranca en frío
+    """
+
+    def __init__(self, carpeta_datos, procesos=300, semilla=1, latencia_powershell=0.0):
+        self.carpeta_datos = carpeta_datos
+        self.psutil = PsutilSintetico(procesos, semilla, os.path.join(carpeta_datos, 'programas'))
+        self.subproceso = SubprocesoGrabado()
+        self.powershell = PowerShellGrabado(latencia=latencia_powershell)
+        self.eventos = RegistroEventosSintetico(semilla=semilla)
+        self.firestore = FirestoreEnMemoria()
+
+    def instalar(self):
+        for exe in self.psutil.ejecutables():
+            os.makedirs(os.path.dirname(exe), exist_ok=True)
+            with open(exe, 'wb') as f:
+                f.write(b'MZ')
+
+        # config.DATA_DIR sale de HOME (Linux) o ProgramData (Windows)
+        os.environ['HOME'] = os.environ['USERPROFILE'] = os.environ['ProgramData'] = self.carpeta_datos
+
+        sys.modules['psutil'] = self.psutil.modulo()
+        sys.modules['requests'] = modulo_requests()
+        sys.modules.update(modulos_firebase(self.firestore))
+        # Por si config ya estaba importado con el DATA_DIR real
+        redirigir_datos(self.carpeta_datos)
+
+        from src.core import eventos, perifericos, plataforma, scanner
+        from src.core.plataforma import windows
+
+        # Las grabaciones son de Windows: se fuerza ese backend en cualquier sistema
+        plataforma.establecer_backend(windows)
+        windows.subprocess = self.subproceso
+        scanner.subprocess = self.subproceso
+        # Siempre por 'sc' (grabado), también en un Windows con pywin32
+        windows.leer_estados_scm = windows.leer_estados_sc
+        windows.ejecutar_powershell = self.powershell
+        # Sin escucha de dispositivos: el inventario usa el TTL sin señal
+        perifericos._ESCUCHA.iniciar = lambda: False
+        eventos._LECTOR = eventos.LectorEventos(ruta_cursor=eventos.CURSOR_EVENTOS_PATH,
+                                                ruta_huellas=eventos.HUELLAS_EVENTOS_PATH,
+                                                leer_registros=self.eventos.leer,
+                                                formatear=lambda registro, log: registro['mensaje'])
+
+    def contadores(self):
+        """Llamadas a procesos hijos, a PowerShell y escrituras en Firestore hasta ahora"""
+        return {
+            'hijos': sum(self.subproceso.llamadas.values()),
+            'powershell': sum(self.powershell.llamadas.values()),
+            'lotes': self.firestore.estadisticas['lotes'],
+            'escrituras': self.firestore.estadisticas['escrituras'],
+            'bytes_escritos': self.firestore.estadisticas['bytes'],
+        }
@@ -13,5 +13,69 @@ BASE_DIR = get_base_path()
 # Rutas absolutas garantizadas
 FIREBASE_JSON_PATH = os.path.join(BASE_DIR, "auth", "serviceAccountKey.json")
 FIREBASE_COLLECTION_NAME = "computadoras"
+
+# Datos persistentes del agente (fuera del bundle, que es de solo lectura)
+if os.name == 'nt':
+    DATA_DIR = os.path.join(os.environ.get('ProgramData', 'C:\\ProgramData'), 'AgenteMonitoreo')
+else:
+    DATA_DIR = os.path.join(os.path.expanduser('~'), '.agente_monitoreo')
+IDENTIDAD_PATH = os.path.join(DATA_DIR, "identidad.json")
+COLA_OFFLINE_PATH = os.path.join(DATA_DIR, "cola_offline.db")
+DESCRIPCIONES_PATH = os.path.join(DATA_DIR, "descripciones.json")
+CURSOR_EVENTOS_PATH = os.path.join(DATA_DIR, "cursor_eventos.json")
+HUELLAS_EVENTOS_PATH = os.path.join(DATA_DIR, "huellas_eventos.json")
+
+# Registro: una línea JSON por evento, archivo rotativo (reemplaza C:\agente_debug.txt)
+LOG_PATH = os.path.join(DATA_DIR, "agente.log")
+LOG_MAX_BYTES = 5 * 1024 * 1024
+# Antigüedad máxima (segundos) de un archivo antes de rotar aunque no llegue a LOG_MAX_BYTES
+LOG_MAX_EDAD = 7 * 24 * 3600
+LOG_COPIAS = 3
+# Nivel por logger (nombre de módulo); '' es la raíz, que incluye librerías de terceros
+NIVELES_LOG = {
+    "": "WARNING",
+    "src": "INFO",
+    "__main__": "INFO"
+}
 VERSION = "2.0.0"
-DEBUG_MODE = False
\ No newline at end of file
+DEBUG_MODE = False
+
+# Servicios vigilados: nombre interno → nombre legible (puede crecer sin costo extra)
+SERVICIOS_CRITICOS = {
+    "WinDefend": "Windows Defender",
+    "wuauserv": "Windows Update",
+    "mpssvc": "Firewall de Windows",
+    "wscsvc": "Centro de seguridad"
+}
+
+# Equivalente en Linux (unidades de systemd sin '.service')
+SERVICIOS_CRITICOS_LINUX = {
+    "ssh": "Servidor SSH",
+    "cron": "Tareas programadas",
+    "systemd-timesyncd": "Sincronización de hora",
+    "rsyslog": "Registro del sistema"
+}
+
+# Perfilado local con cProfile de cada sonda (DATA_DIR/perfiles/<sonda>.prof); también
+# se activa con la variable de entorno AGENTE_PERFILAR=1. Solo para diagnóstico.
+PERFILAR_SONDAS = False
+
+# Cadencia base (segundos) por sonda; las que no figuran usan 300. El planificador
+# la alarga con la máquina ocupada o con batería y la acorta si los datos cambian rápido.
+CADENCIAS_SONDAS = {
+    "aplicaciones_activas": 900,
+    "errores_huellas": 1800,
+    "perifericos": 1800,
+    "ip_publica": 3600,
+    "anydesk_id": 3600,
+    "telemetria_agente": 1800
+}
+
+# Sondas que el planificador nunca acelera: resúmenes y contadores propios del
+# agente, distintos en cada ejecución aunque el equipo no cambie
+SONDAS_SIN_ACELERACION = {"metricas_ventana", "telemetria_agente"}
+
+# Reglas de clasificación USB (vacío = reglas de fábrica de src/core/clasificador_usb.py).
+# Claves: 'excluir' y 'hid_genericos' (listas de términos) reemplazan a las de fábrica;
+# 'categorias' ({clase PnP: categoría}) se suma a las de fábrica.
+REGLAS_USB = {}
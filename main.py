@@ -2,6 +2,7 @@ import time
 import sys
 import subprocess
 import os
+import logging
 
 # --- 1. PREVENCIÓN DE ERRORES EN MODO INVISIBLE ---
 # Se define antes que nada para evitar crasheos por falta de consola 
@@ -29,6 +30,22 @@ def verificar_permisos_admin():
     except: 
         return False
 
+def mostrar_en_consola(mensaje):
+    """
+    Muestra un mensaje a quien ejecutó el .exe desde una consola. En el build
+    sin consola stdout va a devnull: se escribe en la consola del proceso padre.
+    """
+    if sys.stdout is not None and getattr(sys.stdout, 'name', None) != os.devnull:
+        print(mensaje)
+        return
+    try:
+        import ctypes
+        if ctypes.windll.kernel32.AttachConsole(-1):  # ATTACH_PARENT_PROCESS
+            with open('CONOUT$', 'w') as consola:
+                consola.write(mensaje + '\n')
+    except Exception:
+        pass
+
 def solicitar_permisos_admin():
     import ctypes
     if sys.argv[-1] != 'asadmin':
@@ -80,29 +97,67 @@ if RUNNING_AS_SERVICE:
         def SvcStop(self):
             self.running = False
             win32event.SetEvent(self.hWaitStop)
+            # Vaciar escrituras pendientes solo si el cliente ya se cargó en SvcDoRun
+            cliente = sys.modules.get('src.database.firebase_client')
+            if cliente is not None:
+                cliente.detener_cliente()
+            try:
+                from src.core.powershell import cerrar_hosts
+                cerrar_hosts()
+            except Exception:
+                pass
+            # Último: lo que registraron los pasos anteriores queda en el archivo
+            registro = sys.modules.get('src.core.registro')
+            if registro is not None:
+                registro.detener_registro()
 
         def SvcDoRun(self):
             # NOTIFICAR INICIO A WINDOWS INMEDIATAMENTE PARA EVITAR ERROR 1053
             self.ReportServiceStatus(win32service.SERVICE_START_PENDING)
             
+            from src.core.registro import configurar_registro
+            configurar_registro()
+            
+            # AVISAR QUE YA ESTÁ CORRIENDO: antes de importar nada más. Firebase,
+            # requests y los módulos win32 de las sondas se cargan en su primer
+            # uso (ver benchmarks/bench_arranque.py)
+            self.ReportServiceStatus(win32service.SERVICE_RUNNING)
+            
             try:
                 # Importaciones tardías para no demorar el arranque 
                 from src.database.firebase_client import enviar_datos_pc, escuchar_comandos_remotos, log_debug
-                from src.core.scanner import obtener_datos_pc
+                from src.core.planificador import crear_planificador
+                from src.core.telemetria import TELEMETRIA
+                from src.core.scanner import cierre_ventana, claves_sondas, obtener_datos_pc
                 
-                # AVISAR QUE YA ESTÁ CORRIENDO
-                self.ReportServiceStatus(win32service.SERVICE_RUNNING)
                 log_debug("Servicio en estado RUNNING.")
                 
+                cerrar_ventana = cierre_ventana()
                 datos = obtener_datos_pc()
-                enviar_datos_pc(datos)
+                enviar_datos_pc(datos, al_confirmar=cerrar_ventana)
                 escuchar_comandos_remotos(datos['uuid'])
                 
+                # Cadencia por sonda, ajustada por carga/batería/cambios y repartida en la flota
+                planificador = crear_planificador(claves_sondas(), id_flota=datos['uuid'])
                 while self.running:
-                    rc = win32event.WaitForSingleObject(self.hWaitStop, 300000)
+                    espera_ms = int(planificador.proxima_espera() * 1000)
+                    rc = win32event.WaitForSingleObject(self.hWaitStop, espera_ms)
                     if rc == win32event.WAIT_OBJECT_0:
                         break
-                    enviar_datos_pc(obtener_datos_pc())
+                    campos = planificador.vencidas()
+                    if not campos:
+                        continue
+                    # Solo se recolecta lo que se va a enviar en este despertar
+                    inicio = time.perf_counter()
+                    # La ventana de métricas se cierra solo si su resumen llega a Firestore
+                    cerrar_ventana = cierre_ventana() if 'metricas_ventana' in campos else None
+                    with TELEMETRIA.medir('ciclo_escaneo'):
+                        datos = obtener_datos_pc(solo=campos)
+                    with TELEMETRIA.medir('ciclo_envio'):
+                        cambiados = enviar_datos_pc(datos, campos=campos, al_confirmar=cerrar_ventana)
+                    planificador.completar(campos, cambiados)
+                    log_debug("Ciclo completado", ciclo_ms=round((time.perf_counter() - inicio) * 1000, 1),
+                              sondas=campos, cambiadas=sorted(cambiados))
                     
             except Exception as e:
                 from src.database.firebase_client import log_debug
@@ -116,6 +171,17 @@ if __name__ == "__main__":
             win32serviceutil.HandleCommandLine(AgenteMonitoreoService)
         sys.exit(0)
 
+    # Caso A2: Revalidar el UUID tras un cambio de hardware (luego reiniciar el servicio)
+    if len(sys.argv) > 1 and sys.argv[1].lower() == 'revalidar':
+        from src.core.registro import configurar_registro, detener_registro
+        configurar_registro()
+        from src.core.scanner import revalidar_id_inventario
+        uuid = revalidar_id_inventario()
+        logging.getLogger(__name__).info(f"UUID revalidado: {uuid}")
+        detener_registro()
+        mostrar_en_consola(f"UUID: {uuid}")
+        sys.exit(0)
+
     # Caso B: Ejecución como servicio de Windows (SCM)
     # Solo entra aquí si Windows SCM lo llama
     if RUNNING_AS_SERVICE and len(sys.argv) == 1:
@@ -0,0 +1,152 @@
+import re
+
+# Términos a excluir: infraestructura USB interna, no periféricos reales
+# Incluye equivalentes en inglés y español (Windows localizado)
+EXCLUIR_USB = (
+    'root hub', 'host controller', 'generic usb hub', 'usb root hub',
+    'usb composite device', 'composite usb device',
+    'usb hub', 'enhanced host controller', 'extensible host controller',
+    'xhc host controller', 'usb serial converter',
+    # Español (y variantes por codificación)
+    'concentrador raíz', 'concentrador raiz', 'concentrador ra', 'concentrador usb',
+    'dispositivo compuesto usb', 'controladora de host', 'controlador de host',
+    'concentradores usb',
+)
+
+# HID genéricos que representan teclado/mouse (se consolidan en uno)
+HID_GENERICOS = ('dispositivo de entrada usb', 'usb input device', 'hid-compliant')
+
+# Mapeo de clases a categorías amigables
+CATEGORIAS_USB = {
+    'HIDClass': 'Teclado/Mouse/Controlador',
+    'Image': 'Cámara/Scanner',
+    'Media': 'Audio/Video',
+    'DiskDrive': 'Almacenamiento (pendrive/disco)',
+    'Printer': 'Impresora',
+    'Bluetooth': 'Bluetooth',
+    'Biometric': 'Huella/Biometría',
+    'SmartCardReader': 'Lector de tarjetas',
+    'Net': 'Adaptador de red USB',
+}
+
+# Acentos que pueden llegar mal codificados (í/ı) → comparación sin acentos
+_SIN_ACENTOS = str.maketrans('íáéóúñ', 'iaeoun')
+
+
+def normalizar(texto):
+    """Normaliza texto para comparación (minúsculas, sin acentos)"""
+    if not texto:
+        return ''
+    return texto.lower().strip().translate(_SIN_ACENTOS)
+
+
+def compilar_terminos(terminos):
+    """Una sola expresión regular para 'contiene alguno de los términos'"""
+    normalizados = sorted({normalizar(t) for t in terminos if t}, key=len, reverse=True)
+    if not normalizados:
+        return re.compile(r'(?!)')
+    return re.compile('|'.join(re.escape(t) for t in normalizados))
+
+
+def normalizar_nombre_usb(nombre, fabricante):
+    """Evita mostrar 'Desconocido' y mejora nombres genéricos"""
+    nombre = (nombre or '').strip()
+    fabricante = (fabricante or '').strip()
+    if not nombre or nombre.lower() == 'desconocido':
+        return fabricante or 'Dispositivo USB'
+    # Si el nombre es muy genérico pero tenemos fabricante, combinar
+    if fabricante and nombre.lower().startswith(('usb ', 'generic ', 'hid ')):
+        return f"{fabricante} - {nombre}"
+    return nombre
+
+
+class ClasificadorUSB:
+    """
+    Reglas de clasificación de dispositivos PnP USB compiladas una sola vez:
+    las exclusiones y los HID genéricos son una expresión regular cada uno,
+    así cada dispositivo cuesta una búsqueda por regla en lugar de normalizar
+    y recorrer todas las listas.
+    """
+
+    def __init__(self, excluir=EXCLUIR_USB, hid_genericos=HID_GENERICOS, categorias=CATEGORIAS_USB):
+        self._excluir = compilar_terminos(excluir)
+        self._hid_genericos = compilar_terminos(hid_genericos)
+        self._categorias = dict(categorias)
+
+    def excluido(self, nombre):
+        """True si el dispositivo es infraestructura interna (hub, controladora...)"""
+        return self._excluir.search(normalizar(nombre)) is not None
+
+    def hid_generico(self, nombre):
+        """True si es un HID genérico (teclado/mouse sin nombre de modelo)"""
+        return self._hid_genericos.search(normalizar(nombre)) is not None
+
+    def categoria(self, clase):
+        return self._categorias.get(clase, clase)
+
+    def clasificar(self, entradas):
+        """
+        Convierte entradas de Get-PnpDevice ({FriendlyName, Class, Manufacturer})
+        en la lista de periféricos: sin infraestructura, sin duplicados y con
+        los HID genéricos consolidados en una sola línea.
+        """
+        dispositivos = []
+        vistos = set()  # Evitar duplicados por nombre similar
+        genericos = 0
+
+        for entrada in entradas:
+            nombre = entrada.get('FriendlyName') or ''
+            fabricante = entrada.get('Manufacturer') or ''
+            clase = entrada.get('Class') or 'Otro'
+
+            # Excluir infraestructura interna
+            if self.excluido(nombre):
+                continue
+
+            nombre_final = normalizar_nombre_usb(nombre, fabricante)
+            clave = f"{nombre_final}|{clase}"
+            if clave in vistos:
+                continue
+            vistos.add(clave)
+
+            if clase == 'HIDClass' and self.hid_generico(nombre):
+                genericos += 1
+                continue
+
+            dispositivos.append({
+                'nombre': nombre_final,
+                'categoria': self.categoria(clase),
+                'fabricante': fabricante or '—',
+                'clase': clase
+            })
+
+        # Consolidar teclados/mouse genéricos en una sola línea
+        if genericos:
+            dispositivos.append({
+                'nombre': "Teclado y Mouse" + (f" ({genericos} dispositivos)" if genericos > 1 else ""),
+                'categoria': 'Teclado/Mouse/Controlador',
+                'fabricante': '—',
+                'clase': 'HIDClass'
+            })
+
+        # Ordenar: primero por categoría, luego por nombre
+        dispositivos.sort(key=lambda d: (d['categoria'], d['nombre']))
+        return dispositivos
+
+
+def cargar_clasificador(reglas=None):
+    """
+    Clasificador con las reglas por defecto, reemplazadas por las que traiga
+    'reglas' (por defecto REGLAS_USB de config): claves 'excluir',
+    'hid_genericos' y 'categorias'; 'categorias' se mezcla con las de fábrica.
+    """
+    if reglas is None:
+        try:
+            from config.config import REGLAS_USB as reglas
+        except ImportError:
+            reglas = {}
+    return ClasificadorUSB(
+        excluir=reglas.get('excluir', EXCLUIR_USB),
+        hid_genericos=reglas.get('hid_genericos', HID_GENERICOS),
+        categorias={**CATEGORIAS_USB, **reglas.get('categorias', {})}
+    )
@@ -0,0 +1,186 @@
+import logging
+import threading
+import time
+from array import array
+
+_log = logging.getLogger(__name__)
+
+# Cada cuánto el hilo de fondo renueva la base de tiempos de CPU del sistema
+INTERVALO_SEGUNDOS = 10
+
+# Ventana mínima para que un porcentaje tenga sentido
+VENTANA_MINIMA = 1.0
+
+# Una base de procesos más vieja promediaría minutos de uso: se toma otra al momento
+VENTANA_MAXIMA_PROCESOS = 60.0
+
+
+# ==================== LECTURA DE CONTADORES ====================
+def leer_tiempos_sistema():
+    """(total, ocioso) acumulados de CPU del sistema"""
+    import psutil
+
+    cpu = psutil.cpu_times()
+    return sum(cpu), cpu.idle
+
+
+def leer_tabla_procesos():
+    """Tabla de procesos fresca (también queda como instantánea del ciclo)"""
+    from src.core.procesos import obtener_tabla_procesos
+
+    return obtener_tabla_procesos(max_edad=0)
+
+
+# ==================== CÁLCULO ====================
+def calcular_porcentaje_sistema(previo, actual):
+    total = actual[0] - previo[0]
+    ocioso = actual[1] - previo[1]
+    if total <= 0:
+        return 0.0
+    return round(100.0 * (total - ocioso) / total, 1)
+
+
+def calcular_porcentajes_procesos(previa, actual, segundos):
+    """
+    Porcentaje de CPU por fila de 'actual' (TablaProcesos), con la misma semántica
+    que psutil.Process.cpu_percent (puede superar 100 con varios núcleos). Las filas
+    se emparejan por (pid, create_time) para no mezclar un PID reutilizado.
+
+    Returns:
+        array('d') alineado con las filas de 'actual'
+    """
+    porcentajes = array('d', bytes(8 * len(actual)))
+    if segundos <= 0:
+        return porcentajes
+    indice_previo = previa.indice_por_clave()
+    for i in range(len(actual)):
+        j = indice_previo.get((actual.pids[i], actual.creados[i]))
+        if j is not None:
+            porcentajes[i] = max(0.0, 100.0 * (actual.cpu[i] - previa.cpu[j]) / segundos)
+    return porcentajes
+
+
+# ==================== RASTREADOR ====================
+class RastreadorCPU:
+    """
+    Guarda instantáneas de tiempos de CPU del sistema en segundo plano (una
+    lectura de contadores, sin recorrer procesos) para que cpu_sistema() dé un
+    porcentaje al instante, sin cpu_percent(interval=...) ni sleep.
+
+    Los porcentajes por proceso se calculan a pedido: la tabla de procesos es
+    cara y solo la usa aplicaciones_activas, cada varios minutos. Si no hay una
+    base de procesos reciente se toma una y se espera VENTANA_MINIMA.
+
+    Los lectores, el reloj y la espera son inyectables para probar con
+    contadores sintéticos (ver TablaProcesos.desde_filas).
+    """
+
+    def __init__(self, leer_sistema=leer_tiempos_sistema, leer_procesos=leer_tabla_procesos,
+                 intervalo=INTERVALO_SEGUNDOS, reloj=time.monotonic, esperar=time.sleep):
+        self._leer_sistema = leer_sistema
+        self._leer_procesos = leer_procesos
+        self._intervalo = intervalo
+        self._reloj = reloj
+        self._esperar = esperar
+        # Dos bases: se usa la más reciente que tenga al menos VENTANA_MINIMA de antigüedad
+        self._bases = []
+        # Ídem para las tablas de procesos, que solo se leen a pedido
+        self._tablas = []
+        self._ultimo_sistema = 0.0
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        if self._hilo is None:
+            self.actualizar()
+            self._hilo = threading.Thread(target=self._bucle, name="rastreador-cpu", daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def _bucle(self):
+        while not self._detener.wait(self._intervalo):
+            try:
+                self.actualizar()
+            except Exception as e:
+                _log.warning(f"Error en rastreador de CPU: {e}")
+
+    def actualizar(self, procesos=None):
+        """Toma una nueva base del sistema; 'procesos' (TablaProcesos ya leída) pasa a ser la de procesos"""
+        base = {'t': self._reloj(), 'sistema': self._leer_sistema()}
+        with self._lock:
+            self._bases = (self._bases + [base])[-2:]
+            if procesos is not None:
+                self._agregar_tabla(procesos)
+
+    def _agregar_tabla(self, tabla):
+        # Una tabla casi simultánea a la última no sirve de base: desplazaría a la anterior
+        if not self._tablas or tabla.leida_en - self._tablas[-1].leida_en >= VENTANA_MINIMA:
+            self._tablas = (self._tablas + [tabla])[-2:]
+
+    def _tabla_base(self, leida_en):
+        """Tabla más reciente con antigüedad entre VENTANA_MINIMA y VENTANA_MAXIMA_PROCESOS"""
+        with self._lock:
+            for tabla in reversed(self._tablas):
+                if VENTANA_MINIMA <= leida_en - tabla.leida_en <= VENTANA_MAXIMA_PROCESOS:
+                    return tabla
+        return None
+
+    def _base_para(self, ahora):
+        with self._lock:
+            for base in reversed(self._bases):
+                if ahora - base['t'] >= VENTANA_MINIMA:
+                    return base
+            return self._bases[0] if self._bases else None
+
+    def cpu_sistema(self):
+        """Porcentaje de CPU del sistema desde la base; no bloquea"""
+        ahora = self._reloj()
+        base = self._base_para(ahora)
+        # Recién iniciado (base de hace milisegundos) el porcentaje sería ruido: 0 o 100
+        if base is None or ahora - base['t'] < VENTANA_MINIMA:
+            return self._ultimo_sistema
+        self._ultimo_sistema = calcular_porcentaje_sistema(base['sistema'], self._leer_sistema())
+        return self._ultimo_sistema
+
+    def porcentajes(self, tabla=None):
+        """
+        Porcentajes por fila de una tabla de procesos (por defecto, una lectura
+        nueva), contra una tabla anterior de entre VENTANA_MINIMA y
+        VENTANA_MAXIMA_PROCESOS de antigüedad. Si no la hay, 'tabla' pasa a ser
+        la base, se espera VENTANA_MINIMA y se lee otra, que es la que se devuelve.
+
+        Returns:
+            (tabla, array('d') alineado con sus filas)
+        """
+        if tabla is None:
+            tabla = self._leer_procesos()
+        base = self._tabla_base(tabla.leida_en)
+        if base is None:
+            base = tabla
+            with self._lock:
+                self._agregar_tabla(base)
+            self._esperar(VENTANA_MINIMA)
+            tabla = self._leer_procesos()
+        with self._lock:
+            self._agregar_tabla(tabla)
+        segundos = tabla.leida_en - base.leida_en
+        if segundos < VENTANA_MINIMA:
+            return tabla, array('d', bytes(8 * len(tabla)))
+        return tabla, calcular_porcentajes_procesos(base, tabla, segundos)
+
+    def cpu_procesos(self, tabla=None):
+        """{pid: (nombre, porcentaje)}"""
+        tabla, porcentajes = self.porcentajes(tabla)
+        return {
+            pid: (tabla.nombres[codigo], porcentaje)
+            for pid, codigo, porcentaje in zip(tabla.pids, tabla.codigos, porcentajes)
+        }
+
+    def cpu_por_nombre(self, tabla=None):
+        """{nombre_proceso: porcentaje sumado de todas sus instancias}"""
+        tabla, porcentajes = self.porcentajes(tabla)
+        sumas = tabla.sumar_por_nombre(porcentajes)
+        return dict(zip(tabla.nombres, sumas))
@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+_log = logging.getLogger(__name__)
+
+# Ejecutables distintos recordados (los menos usados se descartan primero)
+CAPACIDAD = 2000
+
+
+class CacheDescripciones:
+    """
+    Caché persistente de FileDescription por ejecutable, con clave
+    (ruta, tamaño, mtime): si el binario se actualiza, se vuelve a consultar.
+    Tras el calentamiento solo se hace os.stat; nunca se leen recursos PE
+    de binarios ya vistos.
+
+    En disco es un único JSON compacto [[ruta, tamaño, mtime, descripción], ...]
+    en orden LRU (el último es el más reciente). Una descripción null indica que
+    el sistema respondió que el binario no tiene; las rutas sin respuesta no se
+    guardan y se vuelven a consultar.
+    """
+
+    def __init__(self, ruta_archivo, capacidad=CAPACIDAD):
+        self._ruta_archivo = ruta_archivo
+        self._capacidad = capacidad
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._cargada = False
+        self._modificada = False
+
+    def _cargar(self):
+        if self._cargada:
+            return
+        self._cargada = True
+        try:
+            with open(self._ruta_archivo, 'r', encoding='utf-8') as f:
+                for ruta, tamano, mtime, descripcion in json.load(f):
+                    # '' es de versiones anteriores, que no distinguían "sin
+                    # descripción" de "sin respuesta": se vuelve a consultar
+                    if descripcion == '':
+                        continue
+                    self._entradas[ruta] = (tamano, mtime, descripcion)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            _log.warning(f"Caché de descripciones ilegible, se reconstruye: {e}")
+
+    def guardar(self):
+        with self._lock:
+            if not self._modificada:
+                return
+            filas = [[ruta, t, m, d] for ruta, (t, m, d) in self._entradas.items()]
+            self._modificada = False
+        try:
+            os.makedirs(os.path.dirname(self._ruta_archivo), exist_ok=True)
+            temporal = self._ruta_archivo + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(filas, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temporal, self._ruta_archivo)
+        except Exception as e:
+            _log.warning(f"No se pudo guardar la caché de descripciones: {e}")
+
+    def obtener(self, rutas, consultar):
+        """
+        Devuelve {ruta: descripción} consultando solo los binarios no vistos o cambiados.
+
+        Args:
+            rutas: Rutas de ejecutables
+            consultar: Callable(lista_de_rutas) -> {ruta: descripción}, con ''
+                       para las rutas respondidas sin descripción; las rutas que
+                       falten en la respuesta (o todas, si lanza una excepción)
+                       no se cachean
+        """
+        resultado = {}
+        firmas = {}
+        faltantes = []
+
+        with self._lock:
+            self._cargar()
+            for ruta in rutas:
+                if not ruta:
+                    continue
+                try:
+                    estado = os.stat(ruta)
+                except OSError:
+                    continue
+                firma = (estado.st_size, int(estado.st_mtime))
+                clave = os.path.normcase(ruta)
+                entrada = self._entradas.get(clave)
+                if entrada is not None and entrada[:2] == firma:
+                    self._entradas.move_to_end(clave)
+                    if entrada[2]:
+                        resultado[ruta] = entrada[2]
+                else:
+                    firmas[ruta] = firma
+                    faltantes.append(ruta)
+
+        if not faltantes:
+            return resultado
+
+        nuevas = consultar(faltantes)
+
+        with self._lock:
+            for ruta in faltantes:
+                if ruta not in nuevas:
+                    # Consulta fallida o incompleta: se vuelve a preguntar en el próximo ciclo
+                    continue
+                # Se guarda también la ausencia de descripción (None) para no volver a preguntar
+                descripcion = nuevas[ruta] or None
+                self._entradas[os.path.normcase(ruta)] = firmas[ruta] + (descripcion,)
+                if descripcion:
+                    resultado[ruta] = descripcion
+            while len(self._entradas) > self._capacidad:
+                self._entradas.popitem(last=False)
+            self._modificada = True
+
+        self.guardar()
+        return resultado
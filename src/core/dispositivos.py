@@ -0,0 +1,108 @@
+import logging
+import re
+import threading
+
+_log = logging.getLogger(__name__)
+
+# Valores de dbt.h (no todos están en win32con)
+WM_DEVICECHANGE = 0x0219
+DBT_DEVNODES_CHANGED = 0x0007
+DBT_DEVICEARRIVAL = 0x8000
+DBT_DEVICEREMOVECOMPLETE = 0x8004
+DEVICE_NOTIFY_WINDOW_HANDLE = 0x0
+DEVICE_NOTIFY_ALL_INTERFACE_CLASSES = 0x4
+
+
+_RE_GUID_INTERFAZ = re.compile(r'#\{[0-9a-f-]+\}$', re.IGNORECASE)
+
+
+def instancia_desde_interfaz(ruta):
+    r"""
+    Id de instancia PnP a partir de la ruta de interfaz de un aviso:
+    '\\?\USB#VID_046D&PID_085E#1234#{a5dcbf10-...}' → 'USB\VID_046D&PID_085E\1234'
+    """
+    ruta = (ruta or '').strip()
+    if ruta.startswith('\\\\?\\'):
+        ruta = ruta[4:]
+    return _RE_GUID_INTERFAZ.sub('', ruta).replace('#', '\\').upper()
+
+
+class EscuchaDispositivos:
+    """
+    Escucha WM_DEVICECHANGE en una ventana oculta con su propio hilo y llama a
+    al_cambiar(evento, ruta) por cada aviso de llegada, retiro o cambio de
+    nodos; ruta es la ruta de interfaz del dispositivo (None si el aviso no la trae).
+    Registra todas las clases de interfaz para recibir avisos también desde
+    la sesión 0 del servicio.
+    """
+
+    def __init__(self, al_cambiar):
+        self._al_cambiar = al_cambiar
+        self._hilo = None
+        self._hwnd = None
+        self.activa = False
+
+    def iniciar(self):
+        """Arranca la escucha; devuelve False si pywin32 no está disponible"""
+        try:
+            import win32gui  # noqa: F401
+        except ImportError:
+            return False
+        if self._hilo is None:
+            listo = threading.Event()
+            self._hilo = threading.Thread(target=self._bucle, args=(listo,),
+                                          name="escucha-dispositivos", daemon=True)
+            self._hilo.start()
+            listo.wait(5)
+        return self.activa
+
+    def detener(self):
+        if self._hwnd:
+            import win32con
+            import win32gui
+            win32gui.PostMessage(self._hwnd, win32con.WM_CLOSE, 0, 0)
+
+    def _al_mensaje(self, hwnd, mensaje, wparam, lparam):
+        if wparam in (DBT_DEVNODES_CHANGED, DBT_DEVICEARRIVAL, DBT_DEVICEREMOVECOMPLETE):
+            try:
+                ruta = None
+                if wparam != DBT_DEVNODES_CHANGED and lparam:
+                    import win32gui_struct
+                    ruta = getattr(win32gui_struct.UnpackDEV_BROADCAST(lparam), 'name', None)
+                self._al_cambiar(wparam, ruta)
+            except Exception as e:
+                _log.warning(f"Error procesando aviso de dispositivo: {e}")
+        return True
+
+    def _bucle(self, listo):
+        import win32api
+        import win32con
+        import win32gui
+        import win32gui_struct
+
+        try:
+            clase = win32gui.WNDCLASS()
+            clase.hInstance = win32api.GetModuleHandle(None)
+            clase.lpszClassName = "AgenteMonitoreoDispositivos"
+            clase.lpfnWndProc = {
+                WM_DEVICECHANGE: self._al_mensaje,
+                win32con.WM_CLOSE: lambda h, m, w, l: win32gui.DestroyWindow(h),
+                win32con.WM_DESTROY: lambda h, m, w, l: win32gui.PostQuitMessage(0),
+            }
+            atomo = win32gui.RegisterClass(clase)
+            # Ventana de nivel superior oculta: las de solo mensajes no reciben difusiones
+            self._hwnd = win32gui.CreateWindow(atomo, "AgenteMonitoreo", 0, 0, 0, 0, 0,
+                                               0, 0, clase.hInstance, None)
+            filtro = win32gui_struct.PackDEV_BROADCAST_DEVICEINTERFACE(
+                "{00000000-0000-0000-0000-000000000000}")
+            win32gui.RegisterDeviceNotification(
+                self._hwnd, filtro, DEVICE_NOTIFY_WINDOW_HANDLE | DEVICE_NOTIFY_ALL_INTERFACE_CLASSES)
+            self.activa = True
+        except Exception as e:
+            _log.warning(f"No se pudo escuchar cambios de dispositivos: {e}")
+            return
+        finally:
+            listo.set()
+
+        win32gui.PumpMessages()
+        self.activa = False
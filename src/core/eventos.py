@@ -0,0 +1,284 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from src.core.plataforma import obtener_backend
+
+try:
+    from config.config import CURSOR_EVENTOS_PATH, HUELLAS_EVENTOS_PATH
+except ImportError:
+    CURSOR_EVENTOS_PATH = os.path.join(os.path.expanduser('~'), '.agente_monitoreo', 'cursor_eventos.json')
+    HUELLAS_EVENTOS_PATH = os.path.join(os.path.expanduser('~'), '.agente_monitoreo', 'huellas_eventos.json')
+
+_log = logging.getLogger(__name__)
+
+# Tipos de evento (valores de win32con.EVENTLOG_*_TYPE; journald se traduce a estos)
+TIPO_ERROR = 1
+TIPO_ADVERTENCIA = 2
+TIPO_INFORMACION = 4
+
+# Sin cursor previo solo se miran los últimos registros (no todo el historial)
+REGISTROS_INICIALES = 200
+
+# Tope de registros leídos por ciclo (un log muy ruidoso no bloquea la sonda)
+MAX_REGISTROS_POR_CICLO = 5000
+
+# Huellas de error distintas que se recuerdan (y se suben) a la vez
+CAPACIDAD_BUFFER = 50
+
+# Mensajes formateados recordados (evita recargar DLLs de mensajes)
+CAPACIDAD_MENSAJES = 500
+
+LARGO_MENSAJE = 150
+
+
+# ==================== FILTRO Y DEDUPLICACIÓN ====================
+def filtrar_registros(registros, tipos=(TIPO_ERROR,)):
+    return [r for r in registros if r['tipo'] in tipos]
+
+
+def recortar_mensaje(mensaje):
+    if not mensaje:
+        return "Sin descripción"
+    mensaje = mensaje.strip()
+    return mensaje[:LARGO_MENSAJE] + "..." if len(mensaje) > LARGO_MENSAJE else mensaje
+
+
+_RE_GUID = re.compile(r'\{?[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\}?')
+_RE_HEX = re.compile(r'\b0x[0-9a-f]+\b')
+_RE_NUMERO = re.compile(r'\d+')
+_RE_ESPACIOS = re.compile(r'\s+')
+
+
+def normalizar_mensaje(mensaje):
+    """Quita lo que varía entre repeticiones (GUIDs, direcciones, números)"""
+    texto = (mensaje or '').lower()
+    texto = _RE_GUID.sub('<guid>', texto)
+    texto = _RE_HEX.sub('<hex>', texto)
+    texto = _RE_NUMERO.sub('<n>', texto)
+    return _RE_ESPACIOS.sub(' ', texto).strip()
+
+
+def calcular_huella(fuente, evento_id, mensaje):
+    """Identificador corto y estable de (fuente, id, mensaje normalizado)"""
+    clave = f"{fuente}|{evento_id}|{normalizar_mensaje(mensaje)}"
+    return hashlib.sha1(clave.encode('utf-8')).hexdigest()[:12]
+
+
+class HuellasEventos:
+    """
+    Agrupa eventos en huellas (fuente, id, mensaje normalizado) con conteo,
+    primera y última aparición. Un driver ruidoso solo incrementa su conteo
+    y no desplaza al resto; el tamaño del conjunto está acotado.
+
+    Args:
+        ruta: Archivo JSON donde persistir las huellas (None = solo memoria)
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_BUFFER, ruta=None):
+        self._capacidad = capacidad
+        self._ruta = ruta
+        self._entradas = OrderedDict()
+        self._modificada = False
+        self._cargar()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _cargar(self):
+        if not self._ruta:
+            return
+        try:
+            with open(self._ruta, 'r', encoding='utf-8') as f:
+                for huella, entrada in json.load(f):
+                    self._entradas[huella] = entrada
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            _log.warning(f"Huellas de eventos ilegibles, se reconstruyen: {e}")
+
+    def guardar(self):
+        if not self._ruta or not self._modificada:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._ruta), exist_ok=True)
+            temporal = self._ruta + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(list(self._entradas.items()), f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temporal, self._ruta)
+            self._modificada = False
+        except Exception as e:
+            _log.warning(f"No se pudieron guardar las huellas de eventos: {e}")
+
+    def agregar(self, fuente, evento_id, mensaje, fecha):
+        huella = calcular_huella(fuente, evento_id, mensaje)
+        entrada = self._entradas.pop(huella, None)
+        if entrada is None:
+            entrada = {
+                "fuente": fuente,
+                "evento_id": evento_id,
+                "mensaje": mensaje,
+                "conteo": 0,
+                "primera_vez": fecha
+            }
+        entrada["ultima_vez"] = fecha
+        entrada["conteo"] += 1
+        self._entradas[huella] = entrada
+        while len(self._entradas) > self._capacidad:
+            self._entradas.popitem(last=False)
+        self._modificada = True
+
+    def huellas(self):
+        """{huella: entrada} de todas las huellas vigentes"""
+        return {huella: dict(entrada) for huella, entrada in self._entradas.items()}
+
+    def recientes(self, limite):
+        """Las huellas vistas más recientemente primero, en el formato de la antigua lista de últimos errores"""
+        return [{
+            "fecha": e["ultima_vez"],
+            "tipo": "Error",
+            "fuente": e["fuente"],
+            "evento_id": e["evento_id"],
+            "mensaje": e["mensaje"],
+            "repeticiones": e["conteo"]
+        } for e in reversed(self._entradas.values())][:limite]
+
+
+# ==================== LECTOR INCREMENTAL ====================
+class LectorEventos:
+    """
+    Lee solo los registros nuevos desde el último número procesado (persistido
+    en disco) y los agrupa en HuellasEventos.
+
+    Args:
+        leer_registros: Callable(log, desde) -> (registros, ultimo) (inyectable); por
+                        defecto el del backend del sistema (Visor de eventos o journald).
+                        El cursor es el último número de registro o el cursor de journald.
+        formatear: Callable(registro, log) -> mensaje (inyectable); por defecto el del backend
+    """
+
+    def __init__(self, log="System", ruta_cursor=CURSOR_EVENTOS_PATH,
+                 leer_registros=None, formatear=None,
+                 tipos=(TIPO_ERROR,), capacidad=CAPACIDAD_BUFFER, ruta_huellas=HUELLAS_EVENTOS_PATH):
+        self._log = log
+        self._ruta_cursor = ruta_cursor
+        self._leer = leer_registros or obtener_backend().leer_registros
+        self._formatear = formatear or obtener_backend().formatear_mensaje
+        self._tipos = tipos
+        self.huellas = HuellasEventos(capacidad, ruta_huellas)
+        self._mensajes = OrderedDict()
+        self._cursor = self._cargar_cursor()
+        self._lock = threading.Lock()
+
+    # ---------- Cursor ----------
+    def _cargar_cursor(self):
+        if not self._ruta_cursor:
+            return None
+        try:
+            with open(self._ruta_cursor, 'r', encoding='utf-8') as f:
+                return json.load(f).get(self._log)
+        except Exception:
+            return None
+
+    def _guardar_cursor(self):
+        if not self._ruta_cursor:
+            return
+        try:
+            cursores = {}
+            if os.path.exists(self._ruta_cursor):
+                with open(self._ruta_cursor, 'r', encoding='utf-8') as f:
+                    cursores = json.load(f)
+            cursores[self._log] = self._cursor
+            os.makedirs(os.path.dirname(self._ruta_cursor), exist_ok=True)
+            temporal = self._ruta_cursor + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(cursores, f)
+            os.replace(temporal, self._ruta_cursor)
+        except Exception as e:
+            _log.warning(f"No se pudo guardar el cursor de eventos: {e}")
+
+    # ---------- Mensajes ----------
+    def _mensaje(self, registro):
+        """Formatea con caché por (fuente, id, inserciones)"""
+        if 'mensaje' in registro:
+            return recortar_mensaje(registro['mensaje'])
+        clave = (registro['fuente'], registro['evento_id'], registro.get('inserciones', ()))
+        mensaje = self._mensajes.get(clave)
+        if mensaje is None:
+            try:
+                mensaje = recortar_mensaje(self._formatear(registro, self._log))
+            except Exception:
+                mensaje = "Error al leer mensaje"
+            self._mensajes[clave] = mensaje
+            while len(self._mensajes) > CAPACIDAD_MENSAJES:
+                self._mensajes.popitem(last=False)
+        else:
+            self._mensajes.move_to_end(clave)
+        return mensaje
+
+    # ---------- Procesamiento ----------
+    def procesar(self):
+        """
+        Lee los registros nuevos, filtra, agrupa en huellas y avanza el cursor.
+
+        Returns:
+            Cantidad de eventos que pasaron el filtro
+        """
+        with self._lock:
+            registros, ultimo = self._leer(self._log, self._cursor)
+            filtrados = filtrar_registros(registros, self._tipos)
+            for registro in filtrados:
+                self.huellas.agregar(registro['fuente'], registro['evento_id'],
+                                     self._mensaje(registro), registro['fecha'])
+            # Huellas antes que cursor: si algo falla, a lo sumo se recuenta, nunca se pierde
+            self.huellas.guardar()
+            if ultimo != self._cursor:
+                self._cursor = ultimo
+                self._guardar_cursor()
+            return len(filtrados)
+
+    def recientes(self, limite):
+        with self._lock:
+            return self.huellas.recientes(limite)
+
+    def mapa_huellas(self):
+        with self._lock:
+            return self.huellas.huellas()
+
+
+_LECTOR = None
+
+
+def _obtener_lector():
+    global _LECTOR
+    if _LECTOR is None:
+        # Rutas leídas ahora y no al importar: las pruebas y los benchmarks las redirigen
+        _LECTOR = LectorEventos(ruta_cursor=CURSOR_EVENTOS_PATH, ruta_huellas=HUELLAS_EVENTOS_PATH)
+    return _LECTOR
+
+
+def obtener_errores_sistema(limite=5):
+    """Obtiene los errores críticos más recientes leyendo solo registros nuevos"""
+    try:
+        lector = _obtener_lector()
+        lector.procesar()
+        return lector.recientes(limite)
+    except Exception as e:
+        return [{
+            "error": f"No se pudo leer Event Viewer: {str(e)}"
+        }]
+
+
+def obtener_huellas_errores():
+    """
+    {huella: {fuente, evento_id, mensaje, conteo, primera_vez, ultima_vez}} de los
+    errores del sistema. El mapa completo tiene tamaño acotado; el envío de solo
+    lo nuevo o cambiado lo resuelve el cálculo de delta.
+    """
+    lector = _obtener_lector()
+    lector.procesar()
+    return lector.mapa_huellas()
@@ -0,0 +1,202 @@
+import logging
+import math
+import threading
+import time
+from array import array
+
+_log = logging.getLogger(__name__)
+
+# Muestreo: cada INTERVALO_SEGUNDOS, con historia fija de CAPACIDAD muestras
+# (720 × 5 s = 1 hora). Memoria: CAPACIDAD × (8 + 4 × len(METRICAS)) bytes ≈ 23 KB.
+INTERVALO_SEGUNDOS = 5
+CAPACIDAD = 720
+
+METRICAS = (
+    'cpu_porcentaje',
+    'ram_porcentaje',
+    'disco_lectura_kbs',
+    'disco_escritura_kbs',
+    'red_envio_kbs',
+    'red_recepcion_kbs',
+)
+
+
+class BufferCircular:
+    """Buffer circular de tamaño fijo sobre array.array (sin objetos por muestra)"""
+
+    def __init__(self, capacidad, tipo='f'):
+        self._datos = array(tipo, bytes(array(tipo).itemsize * capacidad))
+        self._capacidad = capacidad
+        self._inicio = 0
+        self._cantidad = 0
+
+    def __len__(self):
+        return self._cantidad
+
+    @property
+    def bytes_ocupados(self):
+        return self._datos.itemsize * self._capacidad
+
+    def agregar(self, valor):
+        fin = (self._inicio + self._cantidad) % self._capacidad
+        self._datos[fin] = valor
+        if self._cantidad < self._capacidad:
+            self._cantidad += 1
+        else:
+            self._inicio = (self._inicio + 1) % self._capacidad
+
+    def valores(self, desde_indice=0):
+        """Valores en orden cronológico a partir de la posición lógica desde_indice"""
+        return [self._datos[(self._inicio + i) % self._capacidad]
+                for i in range(desde_indice, self._cantidad)]
+
+
+def resumir(valores):
+    """min/max/prom/p95 (percentil por rango más cercano)"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    p95 = ordenados[max(0, math.ceil(0.95 * len(ordenados)) - 1)]
+    return {
+        'min': round(ordenados[0], 1),
+        'max': round(ordenados[-1], 1),
+        'prom': round(sum(ordenados) / len(ordenados), 1),
+        'p95': round(p95, 1)
+    }
+
+
+# ==================== LECTURA DE CONTADORES ====================
+def leer_contadores_psutil():
+    """Contadores acumulados del sistema (las tasas se calculan por diferencia)"""
+    import psutil
+
+    cpu = psutil.cpu_times()
+    disco = psutil.disk_io_counters()
+    red = psutil.net_io_counters()
+    return {
+        'cpu_total': sum(cpu),
+        'cpu_ocioso': cpu.idle,
+        'ram_porcentaje': psutil.virtual_memory().percent,
+        'disco_lectura': disco.read_bytes if disco else 0,
+        'disco_escritura': disco.write_bytes if disco else 0,
+        'red_envio': red.bytes_sent,
+        'red_recepcion': red.bytes_recv,
+    }
+
+
+def calcular_muestra(previos, actuales, segundos):
+    """Convierte dos lecturas de contadores en una muestra {metrica: valor}"""
+    cpu_total = actuales['cpu_total'] - previos['cpu_total']
+    cpu_ocioso = actuales['cpu_ocioso'] - previos['cpu_ocioso']
+    segundos = max(segundos, 1e-6)
+
+    def tasa_kbs(clave):
+        # max(0, ...) por si un contador se reinicia (adaptador reconectado)
+        return max(0, actuales[clave] - previos[clave]) / 1024 / segundos
+
+    return {
+        'cpu_porcentaje': 100.0 * (cpu_total - cpu_ocioso) / cpu_total if cpu_total > 0 else 0.0,
+        'ram_porcentaje': actuales['ram_porcentaje'],
+        'disco_lectura_kbs': tasa_kbs('disco_lectura'),
+        'disco_escritura_kbs': tasa_kbs('disco_escritura'),
+        'red_envio_kbs': tasa_kbs('red_envio'),
+        'red_recepcion_kbs': tasa_kbs('red_recepcion'),
+    }
+
+
+# ==================== MUESTREADOR ====================
+class Muestreador:
+    """
+    Toma una muestra de CPU, RAM, E/S de disco y red cada pocos segundos y
+    guarda la historia en buffers circulares de tamaño fijo. En cada
+    sincronización se envían agregados de la ventana en lugar de un valor
+    instantáneo, así los picos entre sincronizaciones no se pierden.
+
+    Args:
+        leer_contadores: Callable que devuelve contadores acumulados (inyectable)
+        reloj: Callable que devuelve segundos monotónicos (inyectable)
+    """
+
+    def __init__(self, leer_contadores=leer_contadores_psutil, intervalo=INTERVALO_SEGUNDOS,
+                 capacidad=CAPACIDAD, reloj=time.monotonic):
+        self._leer = leer_contadores
+        self._intervalo = intervalo
+        self._reloj = reloj
+        self._tiempos = BufferCircular(capacidad, 'd')
+        self._series = {m: BufferCircular(capacidad, 'f') for m in METRICAS}
+        self._previos = None
+        self._t_previo = None
+        self._total_muestras = 0
+        self._muestras_resumidas = 0
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    @property
+    def bytes_ocupados(self):
+        return self._tiempos.bytes_ocupados + sum(s.bytes_ocupados for s in self._series.values())
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name="muestreador", daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            try:
+                self.muestrear()
+            except Exception as e:
+                _log.warning(f"Error en muestreador: {e}")
+            self._detener.wait(self._intervalo)
+
+    def muestrear(self):
+        """Toma una muestra (la primera lectura solo fija la base de los contadores)"""
+        actuales = self._leer()
+        ahora = self._reloj()
+        with self._lock:
+            if self._previos is not None:
+                muestra = calcular_muestra(self._previos, actuales, ahora - self._t_previo)
+                self._tiempos.agregar(ahora)
+                for metrica, valor in muestra.items():
+                    self._series[metrica].agregar(valor)
+                self._total_muestras += 1
+            self._previos, self._t_previo = actuales, ahora
+
+    def marca(self):
+        """Posición actual de la historia (ver cerrar_ventana)"""
+        with self._lock:
+            return self._total_muestras
+
+    def cerrar_ventana(self, marca):
+        """
+        Da por enviadas las muestras hasta 'marca': el próximo resumen empieza
+        ahí. Se llama cuando la escritura que llevaba el resumen se confirmó; un
+        resumen que no llegó a Firestore no consume su ventana.
+        """
+        with self._lock:
+            self._muestras_resumidas = max(self._muestras_resumidas, marca)
+
+    def resumen(self):
+        """
+        Agregados min/max/prom/p95 de las muestras de la ventana abierta (desde
+        la última cerrar_ventana). Solo lee: varios resúmenes seguidos coinciden.
+
+        Returns:
+            {'muestras': n, 'segundos': s, metrica: {...}, ...} o {} si no hay muestras
+        """
+        with self._lock:
+            nuevas = min(self._total_muestras - self._muestras_resumidas, len(self._tiempos))
+            if nuevas <= 0:
+                return {}
+            desde = len(self._tiempos) - nuevas
+            tiempos = self._tiempos.valores(desde)
+            resultado = {
+                'muestras': nuevas,
+                'segundos': round(tiempos[-1] - tiempos[0] + self._intervalo)
+            }
+            for metrica, serie in self._series.items():
+                resultado[metrica] = resumir(serie.valores(desde))
+        return resultado
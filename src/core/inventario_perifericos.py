@@ -0,0 +1,103 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+
+_log = logging.getLogger(__name__)
+
+# Con aviso de cambio de dispositivos, el reescaneo completo es solo un respaldo
+TTL_SEGUNDOS = 6 * 3600
+
+# Sin aviso (pywin32 ausente o escucha caída) se vuelve a la frecuencia de antes
+TTL_SIN_SENAL = 1800
+
+
+def huella_contenido(valor):
+    """Hash estable del contenido de una categoría (independiente del orden de claves)"""
+    texto = json.dumps(valor, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+class InventarioPerifericos:
+    """
+    Inventario de periféricos guiado por cambios. Cada categoría (monitores,
+    impresoras, USB, audio) se reescanea solo si llegó un aviso de cambio de
+    dispositivos o si venció su TTL; si el contenido resultante tiene la misma
+    huella que el anterior, se conserva el valor previo y la categoría no
+    cuenta como cambiada.
+
+    Args:
+        lectores: {categoria: Callable() -> valor} (inyectables para pruebas)
+        reloj: Callable que devuelve segundos monotónicos (inyectable)
+    """
+
+    def __init__(self, lectores, ttl=TTL_SEGUNDOS, ttl_sin_senal=TTL_SIN_SENAL, reloj=time.monotonic):
+        self._lectores = dict(lectores)
+        self._ttl = ttl
+        self._ttl_sin_senal = ttl_sin_senal
+        self._reloj = reloj
+        self._valores = {}
+        self._huellas = {}
+        self._leidas_en = {}
+        self._pendientes = set(self._lectores)
+        self._con_senal = False
+        self._lock = threading.Lock()
+        self.estadisticas = {'escaneos': 0, 'escaneos_omitidos': 0, 'cambios': 0}
+
+    def activar_senal(self, activa=True):
+        """Indica si hay una fuente de avisos de cambio (define qué TTL aplica)"""
+        self._con_senal = activa
+
+    def marcar_cambio(self, categorias=None):
+        """Aviso de cambio de dispositivos: las categorías se releen en la próxima consulta"""
+        with self._lock:
+            self._pendientes.update(self._lectores if categorias is None else categorias)
+
+    def _vencida(self, categoria, ahora):
+        ttl = self._ttl if self._con_senal else self._ttl_sin_senal
+        leida_en = self._leidas_en.get(categoria)
+        return leida_en is None or ahora - leida_en >= ttl
+
+    def actualizar(self):
+        """
+        Relee las categorías marcadas o vencidas.
+
+        Returns:
+            Lista de categorías cuyo contenido cambió
+        """
+        ahora = self._reloj()
+        with self._lock:
+            a_leer = [c for c in self._lectores if c in self._pendientes or self._vencida(c, ahora)]
+            self._pendientes.difference_update(a_leer)
+        self.estadisticas['escaneos_omitidos'] += len(self._lectores) - len(a_leer)
+
+        cambiadas = []
+        for categoria in a_leer:
+            try:
+                valor = self._lectores[categoria]()
+            except Exception as e:
+                _log.warning(f"Error leyendo periféricos ({categoria}): {e}")
+                # Se conserva el valor anterior y el aviso sigue pendiente
+                with self._lock:
+                    self._pendientes.add(categoria)
+                continue
+            self.estadisticas['escaneos'] += 1
+            huella = huella_contenido(valor)
+            with self._lock:
+                self._leidas_en[categoria] = ahora
+                if huella != self._huellas.get(categoria):
+                    self._huellas[categoria] = huella
+                    self._valores[categoria] = valor
+                    cambiadas.append(categoria)
+        self.estadisticas['cambios'] += len(cambiadas)
+        return cambiadas
+
+    def valores(self):
+        """{categoria: valor} con la última lectura conocida de cada categoría"""
+        with self._lock:
+            return {c: self._valores[c] for c in self._lectores if c in self._valores}
+
+    def huellas(self):
+        with self._lock:
+            return dict(self._huellas)
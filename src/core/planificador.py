@@ -0,0 +1,209 @@
+import hashlib
+import random
+import threading
+import time
+
+try:
+    from config.config import CADENCIAS_SONDAS
+except ImportError:
+    CADENCIAS_SONDAS = {
+        'aplicaciones_activas': 900,
+        'errores_huellas': 1800,
+        'perifericos': 1800,
+        'ip_publica': 3600,
+        'anydesk_id': 3600,
+        'telemetria_agente': 1800,
+    }
+
+try:
+    from config.config import SONDAS_SIN_ACELERACION
+except ImportError:
+    SONDAS_SIN_ACELERACION = {'metricas_ventana', 'telemetria_agente'}
+
+# Cadencia de las sondas sin entrada en CADENCIAS_SONDAS (la del bucle anterior)
+CADENCIA_BASE = 300
+
+# Costo relativo de cada sonda (el resto cuesta 1) y tope de costo por ciclo
+COSTOS_SONDAS = {
+    'aplicaciones_activas': 5,
+    'perifericos': 5,
+    'errores_huellas': 2,
+    'discos': 2,
+    'servicios_criticos': 2,
+}
+PRESUPUESTO_CICLO = 16
+
+# Variación aleatoria de cada reprogramación (±10 %)
+JITTER = 0.1
+
+# Límites de la cadencia efectiva respecto de la base
+FACTOR_MINIMO = 0.25
+FACTOR_MAXIMO = 4.0
+CADENCIA_MINIMA = 60
+
+# Máquina ocupada: CPU por encima de este porcentaje
+UMBRAL_OCUPADO = 80
+
+# Si algo vence, se adelantan las sondas a las que les falte menos de esta
+# fracción de su cadencia: un despertar sirve a varias pese al jitter
+VENTANA_AGRUPACION = 0.15
+
+# Una sonda diferida por presupuesto se reintenta tras esta espera
+ESPERA_DIFERIDA = 30
+
+
+def leer_carga_psutil():
+    """CPU del sistema desde la llamada anterior (no bloquea)"""
+    import psutil
+
+    return psutil.cpu_percent(interval=None)
+
+
+def leer_bateria_psutil():
+    """True si el equipo funciona con batería (sin cargador)"""
+    import psutil
+
+    bateria = psutil.sensors_battery() if hasattr(psutil, 'sensors_battery') else None
+    return bateria is not None and not bateria.power_plugged
+
+
+def desfase_flota(id_flota, cadencia):
+    """
+    Desfase estable en [0, cadencia) derivado del id del equipo: miles de
+    agentes arrancados a la vez quedan repartidos en todo el intervalo. Es
+    el mismo para todas las sondas del equipo, así las de igual cadencia
+    comparten despertar.
+    """
+    digest = hashlib.sha1(str(id_flota).encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') / 2 ** 32 * cadencia
+
+
+class Planificador:
+    """
+    Decide qué sondas tocan en cada despertar. Cada sonda tiene cadencia,
+    costo y jitter propios; la cadencia efectiva se alarga con la máquina
+    ocupada o con batería y se acorta mientras sus datos cambian rápido.
+
+    Args:
+        tareas: {clave: (cadencia_segundos, costo)}
+        id_flota: Identificador del equipo para repartir la carga de la flota
+        sin_aceleracion: Sondas que nunca aceleran (None = SONDAS_SIN_ACELERACION)
+        reloj, aleatorio, leer_carga, en_bateria: inyectables (reloj falso en pruebas)
+    """
+
+    def __init__(self, tareas, id_flota='', presupuesto=PRESUPUESTO_CICLO, jitter=JITTER,
+                 reloj=time.monotonic, aleatorio=None, leer_carga=leer_carga_psutil,
+                 en_bateria=leer_bateria_psutil, sin_aceleracion=None):
+        self._presupuesto = presupuesto
+        self._sin_aceleracion = set(SONDAS_SIN_ACELERACION if sin_aceleracion is None else sin_aceleracion)
+        self._jitter = jitter
+        self._reloj = reloj
+        self._aleatorio = aleatorio or random.Random()
+        self._leer_carga = leer_carga
+        self._en_bateria = en_bateria
+        self._lock = threading.Lock()
+        ahora = reloj()
+        self._tareas = {
+            clave: {
+                'cadencia': cadencia,
+                'costo': costo,
+                'multiplicador': 1.0,
+                'proxima': ahora + desfase_flota(id_flota, cadencia)
+            }
+            for clave, (cadencia, costo) in tareas.items()
+        }
+
+    # ---------- Factores ----------
+    def factor_global(self):
+        """Multiplicador por estado de la máquina (1 = normal)"""
+        factor = 1.0
+        try:
+            if self._leer_carga() >= UMBRAL_OCUPADO:
+                factor *= 2
+        except Exception:
+            pass
+        try:
+            if self._en_bateria():
+                factor *= 2
+        except Exception:
+            pass
+        return factor
+
+    def cadencia_efectiva(self, clave, factor=1.0):
+        tarea = self._tareas[clave]
+        base = tarea['cadencia']
+        minima = max(CADENCIA_MINIMA, base * FACTOR_MINIMO)
+        return min(base * FACTOR_MAXIMO, max(minima, base * tarea['multiplicador'] * factor))
+
+    # ---------- Ciclo ----------
+    def vencidas(self):
+        """
+        Sondas vencidas que entran en el presupuesto del ciclo, las más
+        atrasadas primero; las que no entran se difieren ESPERA_DIFERIDA.
+        Siempre se entrega al menos una si hay alguna vencida.
+        """
+        ahora = self._reloj()
+        with self._lock:
+            if not any(t['proxima'] <= ahora for t in self._tareas.values()):
+                return []
+            vencidas = [c for c, t in self._tareas.items()
+                        if t['proxima'] <= ahora + t['cadencia'] * VENTANA_AGRUPACION]
+            vencidas.sort(key=lambda c: (ahora - self._tareas[c]['proxima']) / self._tareas[c]['cadencia'],
+                          reverse=True)
+            elegidas, gastado = [], 0
+            for clave in vencidas:
+                costo = self._tareas[clave]['costo']
+                if elegidas and gastado + costo > self._presupuesto:
+                    self._tareas[clave]['proxima'] = ahora + ESPERA_DIFERIDA
+                    continue
+                elegidas.append(clave)
+                gastado += costo
+            return elegidas
+
+    def completar(self, claves, cambiadas=()):
+        """
+        Reprograma las sondas ejecutadas. Las que cambiaron aceleran (hasta
+        FACTOR_MINIMO); las que no, vuelven gradualmente a su cadencia base.
+
+        Args:
+            cambiadas: Sondas con cambios significativos (más allá de su banda de
+                       aceleración); las de SONDAS_SIN_ACELERACION se ignoran
+        """
+        factor = self.factor_global()
+        ahora = self._reloj()
+        cambiadas = set(cambiadas) - self._sin_aceleracion
+        # Un jitter por tanda: lo que corrió junto sigue despertando junto
+        variacion = 1 + self._aleatorio.uniform(-self._jitter, self._jitter)
+        with self._lock:
+            for clave in claves:
+                tarea = self._tareas.get(clave)
+                if tarea is None:
+                    continue
+                if clave in cambiadas:
+                    tarea['multiplicador'] = max(FACTOR_MINIMO, tarea['multiplicador'] * 0.5)
+                else:
+                    tarea['multiplicador'] = min(1.0, tarea['multiplicador'] * 1.5)
+                tarea['proxima'] = ahora + self.cadencia_efectiva(clave, factor) * variacion
+
+    def proxima_espera(self):
+        """Segundos hasta la próxima sonda vencida (0 si ya hay alguna)"""
+        ahora = self._reloj()
+        with self._lock:
+            if not self._tareas:
+                return CADENCIA_BASE
+            return max(0.0, min(t['proxima'] for t in self._tareas.values()) - ahora)
+
+    def estado(self):
+        """{clave: segundos hasta su próxima ejecución}"""
+        ahora = self._reloj()
+        with self._lock:
+            return {c: round(t['proxima'] - ahora, 1) for c, t in self._tareas.items()}
+
+
+def crear_planificador(claves, id_flota='', **opciones):
+    """Planificador con las cadencias de config y los costos por defecto"""
+    tareas = {
+        clave: (CADENCIAS_SONDAS.get(clave, CADENCIA_BASE), COSTOS_SONDAS.get(clave, 1))
+        for clave in claves
+    }
+    return Planificador(tareas, id_flota=id_flota, **opciones)
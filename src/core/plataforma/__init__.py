@@ -0,0 +1,47 @@
+"""
+Backends por sistema operativo para las sondas que dependen de él. Cada
+backend es un módulo con la misma interfaz:
+
+    Identidad:    leer_uuid(), rutas_anydesk()
+    Discos:       leer_modelos_discos(), leer_indice_particiones(),
+                  clave_particion(dispositivo), es_particion_local(particion)
+    Servicios:    SERVICIOS_CRITICOS, leer_estados_servicios()
+    Eventos:      leer_registros(log, desde), formatear_mensaje(registro, log)
+    Aplicaciones: describir_ejecutables(rutas)
+    Periféricos:  obtener_monitores(), obtener_impresoras(), enumerar_usb(),
+                  describir_usb(ids), obtener_dispositivos_audio()
+
+Solo se importa el backend del sistema en uso, la primera vez que se pide.
+"""
+import subprocess
+import sys
+import threading
+
+# creationflags para no abrir consola (0 fuera de Windows)
+SIN_VENTANA = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+
+_BACKEND = None
+_LOCK = threading.Lock()
+
+
+def obtener_backend():
+    """Módulo del backend del sistema actual (importado al primer uso)"""
+    global _BACKEND
+    if _BACKEND is None:
+        with _LOCK:
+            if _BACKEND is None:
+                if sys.platform == 'win32':
+                    from src.core.plataforma import windows as backend
+                elif sys.platform.startswith('linux'):
+                    from src.core.plataforma import linux as backend
+                else:
+                    raise RuntimeError(f"Sistema no soportado: {sys.platform}")
+                _BACKEND = backend
+    return _BACKEND
+
+
+def establecer_backend(backend):
+    """Fija el backend a usar (benchmarks y pruebas con backends falsos)"""
+    global _BACKEND
+    with _LOCK:
+        _BACKEND = backend
@@ -0,0 +1,419 @@
+import json
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+
+from src.core.eventos import (MAX_REGISTROS_POR_CICLO, REGISTROS_INICIALES, TIPO_ADVERTENCIA,
+                              TIPO_ERROR, TIPO_INFORMACION)
+from src.core.perifericos import calcular_pulgadas
+from src.core.telemetria import contar_hijo
+
+try:
+    from config.config import SERVICIOS_CRITICOS_LINUX as SERVICIOS_CRITICOS
+except ImportError:
+    SERVICIOS_CRITICOS = {
+        "ssh": "Servidor SSH",
+        "cron": "Tareas programadas",
+        "systemd-timesyncd": "Sincronización de hora",
+        "rsyslog": "Registro del sistema"
+    }
+
+_log = logging.getLogger(__name__)
+
+_SYS_BLOCK = '/sys/block'
+_SYS_CLASS_BLOCK = '/sys/class/block'
+_DRM = '/sys/class/drm'
+_USB = '/sys/bus/usb/devices'
+_ASOUND = '/proc/asound'
+
+
+def _leer(ruta, defecto=''):
+    try:
+        with open(ruta, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read().strip()
+    except OSError:
+        return defecto
+
+
+def _listar(ruta):
+    try:
+        return sorted(os.listdir(ruta))
+    except OSError:
+        return []
+
+
+def _ejecutar(comando, timeout=10, **opciones):
+    resultado = subprocess.run(comando, capture_output=True, text=True, timeout=timeout, **opciones)
+    contar_hijo(len(resultado.stdout))
+    return resultado
+
+
+# ==================== IDENTIDAD ====================
+def leer_uuid():
+    """UUID de la placa (DMI; legible como root) o, sin él, el machine-id"""
+    uuid = _leer('/sys/class/dmi/id/product_uuid').upper()
+    if uuid:
+        return uuid
+    machine_id = _leer('/etc/machine-id')
+    if machine_id:
+        return machine_id
+    raise RuntimeError("Sin UUID de placa ni machine-id")
+
+
+def rutas_anydesk():
+    return ['/usr/bin/anydesk', '/usr/local/bin/anydesk', '/opt/anydesk/anydesk']
+
+
+# ==================== DISCOS ====================
+# Dispositivos de bloque que no son discos físicos
+_BLOQUES_VIRTUALES = ('loop', 'ram', 'zram', 'dm-', 'md', 'sr', 'fd', 'nbd')
+
+# Sistemas de archivos de solo lectura o en memoria
+_FS_NO_LOCALES = {'squashfs', 'iso9660', 'udf', 'overlay', 'tmpfs', 'devtmpfs'}
+
+
+def leer_modelos_discos():
+    """{disco: modelo} de /sys/block ('sda', 'nvme0n1', ...)"""
+    modelos = {}
+    for disco in _listar(_SYS_BLOCK):
+        if disco.startswith(_BLOQUES_VIRTUALES):
+            continue
+        modelo = _leer(os.path.join(_SYS_BLOCK, disco, 'device', 'model'))
+        if modelo:
+            modelos[disco] = modelo
+    return modelos
+
+
+def _disco_de(nombre, profundidad=0):
+    """Disco físico de un dispositivo de bloque: partición → disco, LVM/dm → disco del primer esclavo"""
+    ruta = os.path.realpath(os.path.join(_SYS_CLASS_BLOCK, nombre))
+    if os.path.exists(os.path.join(ruta, 'partition')):
+        return os.path.basename(os.path.dirname(ruta))
+    esclavos = _listar(os.path.join(ruta, 'slaves'))
+    if esclavos and profundidad < 4:
+        return _disco_de(esclavos[0], profundidad + 1)
+    return nombre
+
+
+def leer_indice_particiones():
+    """{'/dev/sda1': 'sda', '/dev/dm-0': 'nvme0n1', ...}"""
+    return {'/dev/' + nombre: _disco_de(nombre) for nombre in _listar(_SYS_CLASS_BLOCK)}
+
+
+def clave_particion(dispositivo):
+    """'/dev/mapper/vg-root' → '/dev/dm-0' (clave de leer_indice_particiones)"""
+    return os.path.realpath(dispositivo)
+
+
+def es_particion_local(particion):
+    if not particion.device.startswith('/dev/') or particion.fstype in _FS_NO_LOCALES:
+        return False
+    nombre = os.path.basename(clave_particion(particion.device))
+    if nombre.startswith('loop'):
+        return False
+    return _leer(os.path.join(_SYS_BLOCK, _disco_de(nombre), 'removable'), '0') != '1'
+
+
+# ==================== SERVICIOS ====================
+# ActiveState de systemd → código del SCM (ver servicios.ESTADOS_SERVICIO)
+_ESTADOS_SYSTEMD = {
+    'active': 4,
+    'reloading': 4,
+    'activating': 2,
+    'deactivating': 3,
+    'inactive': 1,
+    'failed': 1
+}
+
+
+def leer_estados_servicios():
+    """{unidad_sin_.service: código SCM} con un único systemctl"""
+    resultado = _ejecutar(['systemctl', 'list-units', '--type=service', '--all',
+                           '--no-legend', '--plain', '--no-pager'])
+    if resultado.returncode != 0 and not resultado.stdout:
+        raise RuntimeError(resultado.stderr.strip() or "systemctl falló")
+    return parsear_list_units(resultado.stdout)
+
+
+def parsear_list_units(salida):
+    """Líneas 'ssh.service loaded active running ...' → {'ssh': 4}"""
+    estados = {}
+    for linea in salida.splitlines():
+        partes = linea.split(None, 4)
+        if len(partes) < 4 or not partes[0].endswith('.service') or partes[1] == 'not-found':
+            continue
+        codigo = _ESTADOS_SYSTEMD.get(partes[2])
+        if codigo:
+            estados[partes[0][:-len('.service')].lower()] = codigo
+    return estados
+
+
+# ==================== JOURNALD ====================
+def _registro_journal(entrada):
+    prioridad = int(entrada.get('PRIORITY', 6))
+    mensaje = entrada.get('MESSAGE') or ''
+    if isinstance(mensaje, list):
+        # Mensajes no UTF-8: journalctl los entrega como lista de bytes
+        mensaje = bytes(mensaje).decode('utf-8', 'replace')
+    return {
+        'registro': entrada.get('__CURSOR'),
+        'tipo': TIPO_ERROR if prioridad <= 3 else TIPO_ADVERTENCIA if prioridad == 4 else TIPO_INFORMACION,
+        'fuente': entrada.get('SYSLOG_IDENTIFIER') or entrada.get('_SYSTEMD_UNIT') or entrada.get('_COMM') or 'kernel',
+        # journald no tiene id de evento: la huella sale de la fuente y el mensaje normalizado
+        'evento_id': 0,
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S',
+                               time.localtime(int(entrada.get('__REALTIME_TIMESTAMP', 0)) / 1e6)),
+        'mensaje': mensaje
+    }
+
+
+def _cursor_actual():
+    """Cursor de la última entrada del journal (sin filtro de prioridad)"""
+    resultado = _ejecutar(['journalctl', '--no-pager', '-o', 'json', '-n', '1'], timeout=15)
+    lineas = resultado.stdout.strip().splitlines()
+    return json.loads(lineas[-1]).get('__CURSOR') if lineas else None
+
+
+def leer_registros(log, desde):
+    """
+    Errores del journal del sistema (prioridad err o más grave) posteriores
+    al cursor; log no aplica en Linux.
+
+    Returns:
+        (registros, cursor): cursor de journald de la última entrada vista
+    """
+    comando = ['journalctl', '--no-pager', '-o', 'json', '-p', '3']
+    if desde is None:
+        comando += ['-n', str(REGISTROS_INICIALES)]
+    else:
+        comando += ['-n', str(MAX_REGISTROS_POR_CICLO), f'--after-cursor={desde}']
+    resultado = _ejecutar(comando, timeout=15)
+    if resultado.returncode != 0 and desde is not None:
+        # Cursor que ya no existe (journal rotado o vaciado): empezar por lo que haya
+        return leer_registros(log, None)
+
+    registros = [_registro_journal(json.loads(linea)) for linea in resultado.stdout.splitlines() if linea.strip()]
+    if registros:
+        return registros, registros[-1]['registro']
+    # Sin errores en la primera lectura: fijar el cursor igual, para no releer el historial
+    return [], desde if desde is not None else _cursor_actual()
+
+
+def formatear_mensaje(registro, log):
+    return registro.get('mensaje', '')
+
+
+# ==================== APLICACIONES ====================
+_CARPETAS_APLICACIONES = (
+    '/usr/share/applications',
+    '/usr/local/share/applications',
+    '/var/lib/flatpak/exports/share/applications',
+    '/var/lib/snapd/desktop/applications',
+)
+
+_INDICE_APLICACIONES = None
+_LOCK_APLICACIONES = threading.Lock()
+
+
+def _leer_lanzador(ruta):
+    """(ejecutable, Name) de un archivo .desktop (sección [Desktop Entry])"""
+    nombre = ejecutable = None
+    en_entrada = False
+    with open(ruta, 'r', encoding='utf-8', errors='replace') as f:
+        for linea in f:
+            linea = linea.strip()
+            if linea.startswith('['):
+                en_entrada = linea == '[Desktop Entry]'
+            elif en_entrada and nombre is None and linea.startswith('Name='):
+                nombre = linea[5:].strip()
+            elif en_entrada and ejecutable is None and linea.startswith('Exec='):
+                # 'env VAR=1 /usr/bin/app %U' → 'app'
+                partes = [p for p in linea[5:].replace('"', '').split() if p != 'env' and '=' not in p]
+                ejecutable = os.path.basename(partes[0]) if partes else None
+    return ejecutable, nombre
+
+
+def _indice_aplicaciones():
+    """{nombre_de_ejecutable: Name} de los lanzadores instalados (se arma una vez)"""
+    global _INDICE_APLICACIONES
+    with _LOCK_APLICACIONES:
+        if _INDICE_APLICACIONES is None:
+            indice = {}
+            for carpeta in _CARPETAS_APLICACIONES:
+                for archivo in _listar(carpeta):
+                    if not archivo.endswith('.desktop'):
+                        continue
+                    try:
+                        ejecutable, nombre = _leer_lanzador(os.path.join(carpeta, archivo))
+                    except OSError:
+                        continue
+                    if ejecutable and nombre:
+                        indice.setdefault(ejecutable, nombre)
+            _INDICE_APLICACIONES = indice
+        return _INDICE_APLICACIONES
+
+
+def describir_ejecutables(rutas):
+    """Nombre legible de cada ejecutable según su lanzador .desktop ('' si no tiene)"""
+    indice = _indice_aplicaciones()
+    return {r: indice.get(os.path.basename(r), '') for r in rutas if r}
+
+
+# ==================== MONITORES ====================
+def _nombre_edid(edid):
+    """Nombre del monitor (descriptor 0xFC del bloque EDID base)"""
+    for inicio in (54, 72, 90, 108):
+        bloque = edid[inicio:inicio + 18]
+        if len(bloque) == 18 and bloque[:3] == b'\x00\x00\x00' and bloque[3] == 0xFC:
+            return bloque[5:].split(b'\n')[0].decode('ascii', 'replace').strip()
+    return ''
+
+
+def obtener_monitores():
+    """Monitores conectados según DRM (/sys/class/drm): EDID y modo preferido"""
+    monitores = []
+    for conector in _listar(_DRM):
+        ruta = os.path.join(_DRM, conector)
+        if _leer(os.path.join(ruta, 'status')) != 'connected':
+            continue
+        try:
+            with open(os.path.join(ruta, 'edid'), 'rb') as f:
+                edid = f.read()
+        except OSError:
+            edid = b''
+        ancho_cm, alto_cm = (edid[21], edid[22]) if len(edid) >= 128 else (0, 0)
+        modos = _leer(os.path.join(ruta, 'modes')).split()
+        monitores.append({
+            'nombre': _nombre_edid(edid) or 'Monitor Genérico',
+            'ancho_cm': ancho_cm,
+            'alto_cm': alto_cm,
+            'pulgadas': calcular_pulgadas(ancho_cm, alto_cm),
+            'resolucion': modos[0] if modos else 'Desconocida'
+        })
+    # Un servidor sin pantalla no tiene monitores: no se inventa uno genérico
+    return monitores
+
+
+# ==================== IMPRESORAS ====================
+_RE_LPSTAT_IMPRESORA = re.compile(r'^printer (\S+) (?:is (idle)|now (printing)|(disabled))')
+_RE_LPSTAT_DISPOSITIVO = re.compile(r'^device for (\S+): (\S+)')
+_RE_LPSTAT_PREDETERMINADA = re.compile(r'^system default destination: (\S+)')
+
+# Esquemas de URI de CUPS que indican una impresora de red
+_ESQUEMAS_RED = ('ipp', 'ipps', 'http', 'https', 'socket', 'lpd', 'smb', 'dnssd')
+
+
+def obtener_impresoras():
+    """Impresoras de CUPS con un único lpstat (sin CUPS: ninguna)"""
+    try:
+        resultado = _ejecutar(['lpstat', '-d', '-p', '-v'], env={**os.environ, 'LC_ALL': 'C'})
+    except (OSError, subprocess.TimeoutExpired):
+        return []
+    return parsear_lpstat(resultado.stdout)
+
+
+def parsear_lpstat(salida):
+    estados, puertos, predeterminada = {}, {}, None
+    for linea in salida.splitlines():
+        impresora = _RE_LPSTAT_IMPRESORA.match(linea)
+        if impresora:
+            nombre, libre, imprimiendo, _ = impresora.groups()
+            estados[nombre] = 'Disponible' if libre else 'Imprimiendo' if imprimiendo else 'Deshabilitada'
+            continue
+        dispositivo = _RE_LPSTAT_DISPOSITIVO.match(linea)
+        if dispositivo:
+            puertos[dispositivo.group(1)] = dispositivo.group(2)
+            continue
+        defecto = _RE_LPSTAT_PREDETERMINADA.match(linea)
+        if defecto:
+            predeterminada = defecto.group(1)
+
+    return [{
+        'nombre': nombre,
+        'driver': 'N/A',
+        'puerto': puertos.get(nombre, 'N/A'),
+        'tipo': 'Red' if puertos.get(nombre, '').split(':', 1)[0] in _ESQUEMAS_RED else 'Local',
+        'estado': estado,
+        'compartida': False,
+        'predeterminada': nombre == predeterminada
+    } for nombre, estado in estados.items()]
+
+
+# ==================== DISPOSITIVOS USB ====================
+# Clase USB (bDeviceClass / bInterfaceClass) → clase PnP de Windows, la que
+# entiende el clasificador de periféricos
+_CLASES_USB = {
+    '01': 'Media',
+    '02': 'Net',
+    '03': 'HIDClass',
+    '06': 'Image',
+    '07': 'Printer',
+    '08': 'DiskDrive',
+    '0b': 'SmartCardReader',
+    '0e': 'Image',
+    '10': 'Media',
+    'e0': 'Bluetooth',
+}
+_CLASE_HUB = '09'
+
+
+def _clase_usb(ruta, clase):
+    # 00 / ef: la clase la definen las interfaces ('1-2:1.0', ...)
+    if clase in ('00', 'ef'):
+        interfaces = [_leer(os.path.join(ruta, i, 'bInterfaceClass')) for i in _listar(ruta) if ':' in i]
+        clase = next((c for c in interfaces if c in _CLASES_USB), clase)
+    return _CLASES_USB.get(clase, 'USB')
+
+
+def enumerar_usb():
+    """{id_instancia: {FriendlyName, Class, Manufacturer}} desde /sys/bus/usb (sin hubs)"""
+    dispositivos = {}
+    for nombre in _listar(_USB):
+        ruta = os.path.join(_USB, nombre)
+        vid = _leer(os.path.join(ruta, 'idVendor'))
+        clase = _leer(os.path.join(ruta, 'bDeviceClass'))
+        if not vid or clase == _CLASE_HUB:
+            continue
+        pid = _leer(os.path.join(ruta, 'idProduct'))
+        serie = _leer(os.path.join(ruta, 'serial')) or nombre
+        # Mismo formato que el id de instancia PnP de Windows
+        id_instancia = f"USB\\VID_{vid}&PID_{pid}\\{serie}".upper()
+        dispositivos[id_instancia] = {
+            'InstanceId': id_instancia,
+            'FriendlyName': _leer(os.path.join(ruta, 'product')) or f"Dispositivo USB {vid}:{pid}",
+            'Class': _clase_usb(ruta, clase),
+            'Manufacturer': _leer(os.path.join(ruta, 'manufacturer'))
+        }
+    return dispositivos
+
+
+def describir_usb(ids):
+    pedidos = {i.upper() for i in ids}
+    return {i: d for i, d in enumerar_usb().items() if i in pedidos}
+
+
+# ==================== DISPOSITIVOS DE AUDIO ====================
+_RE_TARJETA = re.compile(r'^\s*(\d+)\s+\[[^\]]*\]:\s*(\S+)\s+-\s+(.+)$')
+
+
+def obtener_dispositivos_audio():
+    """Tarjetas de ALSA; una tarjeta con captura y reproducción figura en ambas listas"""
+    dispositivos_audio = {
+        'entrada': [],
+        'salida': []
+    }
+    for linea in _leer(os.path.join(_ASOUND, 'cards')).splitlines():
+        tarjeta = _RE_TARJETA.match(linea)
+        if not tarjeta:
+            continue
+        numero, controlador, nombre = tarjeta.groups()
+        pcms = [p for p in _listar(os.path.join(_ASOUND, f'card{numero}')) if p.startswith('pcm')]
+        info = {'nombre': nombre.strip(), 'fabricante': controlador, 'estado': 'Activo'}
+        if any(p.endswith('c') for p in pcms):
+            dispositivos_audio['entrada'].append(dict(info))
+        if any(p.endswith('p') for p in pcms):
+            dispositivos_audio['salida'].append(info)
+    return dispositivos_audio
@@ -0,0 +1,532 @@
+import json
+import logging
+import os
+import re
+import subprocess
+
+from src.core.dispositivos import instancia_desde_interfaz
+from src.core.eventos import MAX_REGISTROS_POR_CICLO, REGISTROS_INICIALES
+from src.core.perifericos import calcular_pulgadas
+from src.core.plataforma import SIN_VENTANA
+from src.core.powershell import ejecutar_powershell
+from src.core.telemetria import contar_hijo
+
+try:
+    from config.config import SERVICIOS_CRITICOS
+except ImportError:
+    SERVICIOS_CRITICOS = {
+        "WinDefend": "Windows Defender",
+        "wuauserv": "Windows Update",
+        "mpssvc": "Firewall de Windows",
+        "wscsvc": "Centro de seguridad"
+    }
+
+_log = logging.getLogger(__name__)
+
+
+# ==================== IDENTIDAD ====================
+def leer_uuid():
+    """UUID de la placa (Win32_ComputerSystemProduct); vacío si wmic no lo informa"""
+    resultado = subprocess.run(
+        ['wmic', 'csproduct', 'get', 'uuid'],
+        capture_output=True,
+        text=True,
+        timeout=10,
+        creationflags=SIN_VENTANA
+    )
+    contar_hijo(len(resultado.stdout))
+    lineas = [linea.strip() for linea in resultado.stdout.splitlines() if linea.strip()]
+    return lineas[1] if len(lineas) > 1 else ''
+
+
+def rutas_anydesk():
+    return [
+        r"C:\Program Files (x86)\AnyDesk\AnyDesk.exe",
+        r"C:\Program Files\AnyDesk\AnyDesk.exe",
+        os.path.join(os.environ.get('ProgramData', ''), 'AnyDesk', 'AnyDesk.exe'),
+        os.path.join(os.environ.get('LOCALAPPDATA', ''), 'AnyDesk', 'AnyDesk.exe')
+    ]
+
+
+# ==================== DISCOS ====================
+def leer_modelos_discos():
+    """{índice de disco físico: modelo} con un solo wmic"""
+    resultado = subprocess.run(
+        ['wmic', 'diskdrive', 'get', 'Index,Model'],
+        capture_output=True,
+        text=True,
+        timeout=10,
+        creationflags=SIN_VENTANA
+    )
+    contar_hijo(len(resultado.stdout))
+
+    modelos = {}
+    for linea in resultado.stdout.strip().split('\n')[1:]:
+        linea = linea.strip()
+        if linea:
+            partes = linea.split(None, 1)
+            if len(partes) == 2:
+                modelos[partes[0].strip()] = partes[1].strip()
+    return modelos
+
+
+def leer_indice_particiones():
+    """
+    Índice letra de unidad → número de disco físico con una sola consulta
+    WMI (en lugar de un wmic por cada letra).
+    """
+    resultado = subprocess.run(
+        ['wmic', 'path', 'Win32_LogicalDiskToPartition', 'get', 'Antecedent,Dependent'],
+        capture_output=True,
+        text=True,
+        timeout=10,
+        creationflags=SIN_VENTANA
+    )
+    contar_hijo(len(resultado.stdout))
+    return parsear_indice_particiones(resultado.stdout)
+
+
+def parsear_indice_particiones(salida):
+    """Extrae {'C:': '0', ...} de la salida de Win32_LogicalDiskToPartition"""
+    indice = {}
+    for linea in salida.split('\n'):
+        disco = re.search(r'Disk #(\d+)', linea)
+        letra = re.search(r'LogicalDisk\.DeviceID="([A-Za-z]:)"', linea)
+        if disco and letra:
+            indice[letra.group(1).upper()] = disco.group(1)
+    return indice
+
+
+def clave_particion(dispositivo):
+    """'C:\\' → 'C:' (clave de leer_indice_particiones)"""
+    letra = dispositivo.replace('\\', '').strip().upper()
+    if not letra.endswith(':'):
+        letra += ':'
+    return letra
+
+
+def es_particion_local(particion):
+    return 'fixed' in particion.opts
+
+
+# ==================== SERVICIOS ====================
+def leer_estados_scm():
+    """
+    Lee el estado de TODOS los servicios con una sola llamada al SCM.
+
+    Returns:
+        Diccionario {nombre_servicio_en_minúsculas: código_de_estado}
+    """
+    import win32service
+
+    scm = win32service.OpenSCManager(None, None, win32service.SC_MANAGER_ENUMERATE_SERVICE)
+    try:
+        servicios = win32service.EnumServicesStatus(
+            scm, win32service.SERVICE_WIN32, win32service.SERVICE_STATE_ALL
+        )
+    finally:
+        win32service.CloseServiceHandle(scm)
+
+    # Cada entrada: (nombre, nombre_visible, (tipo, estado, ...))
+    return {nombre.lower(): estado[1] for nombre, _, estado in servicios}
+
+
+def leer_estados_sc():
+    """Fallback: un único 'sc queryex' para todos los servicios"""
+    resultado = subprocess.run(
+        ['sc', 'queryex', 'type=', 'service', 'state=', 'all'],
+        capture_output=True,
+        text=True,
+        timeout=10,
+        creationflags=SIN_VENTANA
+    )
+    contar_hijo(len(resultado.stdout))
+    return parsear_salida_sc(resultado.stdout)
+
+
+# Bloques de 'sc query': la primera línea trae el nombre (SERVICE_NAME en inglés,
+# NOMBRE_SERVICIO en español) y la línea de estado "<clave> : <código> <PALABRA>"
+_RE_NOMBRE_SC = re.compile(r'^\s*(?:SERVICE_NAME|NOMBRE_SERVICIO)\s*:\s*(.+?)\s*$', re.IGNORECASE)
+_RE_ESTADO_SC = re.compile(
+    r'^\s*\S+\s*:\s*([1-7])\s+(?:STOPPED|START_PENDING|STOP_PENDING|RUNNING|'
+    r'CONTINUE_PENDING|PAUSE_PENDING|PAUSED)\b'
+)
+
+
+def parsear_salida_sc(salida):
+    """Convierte la salida de 'sc query(ex)' en {nombre_en_minúsculas: código}"""
+    estados = {}
+    actual = None
+    for linea in salida.splitlines():
+        nombre = _RE_NOMBRE_SC.match(linea)
+        if nombre:
+            actual = nombre.group(1).lower()
+            continue
+        estado = _RE_ESTADO_SC.match(linea)
+        if estado and actual is not None:
+            estados[actual] = int(estado.group(1))
+            actual = None
+    return estados
+
+
+def leer_estados_servicios():
+    """{nombre_en_minúsculas: código SCM}; por el SCM y, si no está disponible, con sc"""
+    try:
+        return leer_estados_scm()
+    except Exception as e:
+        _log.warning(f"SCM no disponible, usando sc: {e}")
+        return leer_estados_sc()
+
+
+# ==================== VISOR DE EVENTOS ====================
+def leer_registros(log, desde):
+    """
+    Lee en bloque los registros con número > desde, hacia adelante.
+
+    Returns:
+        (registros, ultimo_numero): registros como diccionarios; ultimo_numero es
+        el último registro existente en el log (para fijar el cursor)
+    """
+    import win32evtlog
+
+    hand = win32evtlog.OpenEventLog(None, log)
+    try:
+        total = win32evtlog.GetNumberOfEventLogRecords(hand)
+        if total == 0:
+            return [], 0
+        mas_antiguo = win32evtlog.GetOldestEventLogRecord(hand)
+        ultimo = mas_antiguo + total - 1
+
+        if desde is None:
+            inicio = max(mas_antiguo, ultimo - REGISTROS_INICIALES + 1)
+        elif desde > ultimo or desde < mas_antiguo - 1:
+            # Log borrado o rotado por encima del cursor: empezar por lo que haya
+            inicio = max(mas_antiguo, ultimo - REGISTROS_INICIALES + 1)
+        else:
+            inicio = desde + 1
+        if inicio > ultimo:
+            return [], ultimo
+
+        registros = []
+        flags = win32evtlog.EVENTLOG_SEEK_READ | win32evtlog.EVENTLOG_FORWARDS_READ
+        offset = inicio
+        while len(registros) < MAX_REGISTROS_POR_CICLO:
+            eventos = win32evtlog.ReadEventLog(hand, flags, offset)
+            if not eventos:
+                break
+            for evento in eventos:
+                registros.append({
+                    'registro': evento.RecordNumber,
+                    'tipo': evento.EventType,
+                    'fuente': evento.SourceName,
+                    'evento_id': evento.EventID,
+                    'fecha': evento.TimeGenerated.Format(),
+                    'inserciones': tuple(evento.StringInserts or ()),
+                    '_evento': evento
+                })
+            flags = win32evtlog.EVENTLOG_SEQUENTIAL_READ | win32evtlog.EVENTLOG_FORWARDS_READ
+            offset = 0
+        return registros, registros[-1]['registro'] if registros else ultimo
+    finally:
+        win32evtlog.CloseEventLog(hand)
+
+
+def formatear_mensaje(registro, log):
+    import win32evtlogutil
+
+    return win32evtlogutil.SafeFormatMessage(registro['_evento'], log)
+
+
+# ==================== APLICACIONES ====================
+def describir_ejecutables(rutas):
+    """
+    Obtiene FileDescription de cada ejecutable con una sola llamada a PowerShell.
+    Las rutas respondidas sin descripción vuelven con ''.
+    """
+    rutas = [r for r in rutas if r]
+    if not rutas:
+        return {}
+
+    rutas_json = json.dumps(rutas).replace("'", "''")
+    # foreach sobre la variable: en Windows PowerShell 5.1, ConvertFrom-Json
+    # entrega el arreglo al pipeline como UN objeto ($_ sería el arreglo entero)
+    powershell_script = f"""
+    $rutas = '{rutas_json}' | ConvertFrom-Json
+    @(foreach ($ruta in $rutas) {{
+        $descripcion = ''
+        try {{ $descripcion = [System.Diagnostics.FileVersionInfo]::GetVersionInfo($ruta).FileDescription }} catch {{}}
+        [PSCustomObject]@{{ Ruta = $ruta; Descripcion = $descripcion }}
+    }}) | ConvertTo-Json
+    """
+
+    salida = ejecutar_powershell(powershell_script, timeout=10)
+    if not salida.strip():
+        return {}
+    datos = json.loads(salida)
+    if isinstance(datos, dict):
+        datos = [datos]
+    return {d['Ruta']: d.get('Descripcion') or '' for d in datos if isinstance(d.get('Ruta'), str)}
+
+
+# ==================== MONITORES ====================
+# Una sola pasada: parámetros físicos (WmiMonitorBasicDisplayParams), nombres
+# (WmiMonitorID) y pantallas activas con los monitores de cada una
+# (EnumDisplayDevices con EDD_GET_DEVICE_INTERFACE_NAME). El tipo C# se
+# compila una vez por host de PowerShell.
+_SCRIPT_MONITORES = r"""
+if (-not ('PantallasAgente' -as [type])) {
+    Add-Type -AssemblyName System.Windows.Forms
+    Add-Type @"
+using System;
+using System.Collections.Generic;
+using System.Runtime.InteropServices;
+public class PantallasAgente {
+    [StructLayout(LayoutKind.Sequential, CharSet = CharSet.Unicode)]
+    public struct DISPLAY_DEVICE {
+        public int cb;
+        [MarshalAs(UnmanagedType.ByValTStr, SizeConst = 32)] public string DeviceName;
+        [MarshalAs(UnmanagedType.ByValTStr, SizeConst = 128)] public string DeviceString;
+        public int StateFlags;
+        [MarshalAs(UnmanagedType.ByValTStr, SizeConst = 128)] public string DeviceID;
+        [MarshalAs(UnmanagedType.ByValTStr, SizeConst = 128)] public string DeviceKey;
+    }
+    [DllImport("user32.dll", CharSet = CharSet.Unicode)]
+    static extern bool EnumDisplayDevices(string device, uint num, ref DISPLAY_DEVICE dd, uint flags);
+    public static string[] Monitores(string adaptador) {
+        var lista = new List<string>();
+        var dd = new DISPLAY_DEVICE();
+        dd.cb = Marshal.SizeOf(dd);
+        for (uint i = 0; EnumDisplayDevices(adaptador, i, ref dd, 1); i++) {
+            if ((dd.StateFlags & 1) != 0) { lista.Add(dd.DeviceID); }
+            dd.cb = Marshal.SizeOf(dd);
+        }
+        return lista.ToArray();
+    }
+}
+"@
+}
+$nombres = @{}
+Get-CimInstance -Namespace root\wmi -ClassName WmiMonitorID -ErrorAction SilentlyContinue | ForEach-Object {
+    $nombres[$_.InstanceName] = -join ($_.UserFriendlyName | Where-Object { $_ } | ForEach-Object { [char]$_ })
+}
+$monitores = @(Get-CimInstance -Namespace root\wmi -ClassName WmiMonitorBasicDisplayParams -ErrorAction SilentlyContinue | ForEach-Object {
+    [PSCustomObject]@{
+        Instancia = $_.InstanceName
+        Nombre = $nombres[$_.InstanceName]
+        AnchoCM = $_.MaxHorizontalImageSize
+        AltoCM = $_.MaxVerticalImageSize
+    }
+})
+$pantallas = @([System.Windows.Forms.Screen]::AllScreens | ForEach-Object {
+    [PSCustomObject]@{
+        Ancho = $_.Bounds.Width
+        Alto = $_.Bounds.Height
+        Principal = $_.Primary
+        Monitores = @([PantallasAgente]::Monitores($_.DeviceName))
+    }
+})
+@{ Monitores = $monitores; Pantallas = $pantallas } | ConvertTo-Json -Depth 4 -Compress
+"""
+
+
+def clave_instancia_monitor(texto):
+    r"""
+    Clave común entre el InstanceName de WMI ('DISPLAY\DEL40B0\5&2b&0&UID4353_0')
+    y la ruta de interfaz de EnumDisplayDevices
+    ('\\?\DISPLAY#DEL40B0#5&2b&0&UID4353#{e6f07b5f-...}').
+    """
+    clave = (texto or '').strip()
+    if clave.startswith('\\\\?\\'):
+        clave = instancia_desde_interfaz(clave)
+    return re.sub(r'_\d+$', '', clave.upper())
+
+
+def _como_lista(valor):
+    if valor is None:
+        return []
+    return valor if isinstance(valor, list) else [valor]
+
+
+def unir_monitores(datos):
+    """
+    Une monitores físicos y pantallas activas por instancia (no por posición).
+
+    Args:
+        datos: {'Monitores': [...], 'Pantallas': [...]} tal como los emite _SCRIPT_MONITORES
+    """
+    resoluciones = {}
+    pantallas = _como_lista(datos.get('Pantallas'))
+    for pantalla in pantallas:
+        res = f"{pantalla['Ancho']}x{pantalla['Alto']}"
+        if pantalla.get('Principal'):
+            res += " (Principal)"
+        pantalla['_resolucion'] = res
+        for interfaz in _como_lista(pantalla.get('Monitores')):
+            resoluciones[clave_instancia_monitor(interfaz)] = res
+
+    monitores = []
+    for monitor in _como_lista(datos.get('Monitores')):
+        ancho_cm = monitor.get('AnchoCM') or 0
+        alto_cm = monitor.get('AltoCM') or 0
+        monitores.append({
+            'nombre': (monitor.get('Nombre') or 'Monitor Genérico').strip(),
+            'ancho_cm': ancho_cm,
+            'alto_cm': alto_cm,
+            'pulgadas': calcular_pulgadas(ancho_cm, alto_cm),
+            'resolucion': resoluciones.get(clave_instancia_monitor(monitor.get('Instancia')), 'Desconocida')
+        })
+
+    # Sin datos WMI (p. ej. escritorio remoto): al menos las pantallas activas
+    if not monitores:
+        monitores = [{'nombre': 'Monitor detectado', 'resolucion': p['_resolucion']} for p in pantallas]
+    return monitores
+
+
+def obtener_monitores():
+    """Obtiene información de monitores conectados (una consulta para todo)"""
+    monitores = []
+
+    try:
+        salida = ejecutar_powershell(_SCRIPT_MONITORES, timeout=15)
+        if salida.strip():
+            monitores = unir_monitores(json.loads(salida))
+    except Exception as e:
+        _log.warning(f"Error obteniendo monitores: {e}")
+        monitores.append({
+            'nombre': 'Error al detectar',
+            'error': str(e)
+        })
+
+    # Si no se detectó ningún monitor, agregar uno genérico
+    if not monitores:
+        monitores.append({
+            'nombre': 'Monitor detectado',
+            'resolucion': 'Desconocida'
+        })
+
+    return monitores
+
+
+# ==================== IMPRESORAS ====================
+def obtener_impresoras():
+    """Obtiene impresoras instaladas (locales y de red)"""
+    impresoras = []
+
+    try:
+        ps_script = """
+        Get-Printer | Select-Object Name, DriverName, PortName,
+                     @{Name='Tipo';Expression={
+                         if ($_.Type -eq 'Local') {'Local'}
+                         elseif ($_.Type -eq 'Connection') {'Red'}
+                         else {$_.Type}
+                     }},
+                     @{Name='Estado';Expression={
+                         if ($_.PrinterStatus -eq 3) {'Inactiva'}
+                         elseif ($_.PrinterStatus -eq 4) {'Imprimiendo'}
+                         else {'Disponible'}
+                     }},
+                     Shared,
+                     @{Name='Predeterminada';Expression={
+                         $defaultPrinter = (Get-WmiObject Win32_Printer | Where-Object {$_.Default -eq $true}).Name
+                         $_.Name -eq $defaultPrinter
+                     }} |
+        ConvertTo-Json
+        """
+
+        salida = ejecutar_powershell(ps_script, timeout=10)
+
+        if salida.strip():
+            datos = json.loads(salida)
+
+            if isinstance(datos, dict):
+                datos = [datos]
+
+            for impresora in datos:
+                impresoras.append({
+                    'nombre': impresora.get('Name', 'Desconocida'),
+                    'driver': impresora.get('DriverName', 'N/A'),
+                    'puerto': impresora.get('PortName', 'N/A'),
+                    'tipo': impresora.get('Tipo', 'Desconocido'),
+                    'estado': impresora.get('Estado', 'Desconocido'),
+                    'compartida': impresora.get('Shared', False),
+                    'predeterminada': impresora.get('Predeterminada', False)
+                })
+
+    except Exception as e:
+        _log.warning(f"Error obteniendo impresoras: {e}")
+
+    return impresoras
+
+
+# ==================== DISPOSITIVOS USB ====================
+def _consultar_usb_pnp(filtro):
+    """{InstanceId: {FriendlyName, Class, Manufacturer}} de Get-PnpDevice"""
+    ps_script = f"""
+    Get-PnpDevice -PresentOnly {filtro} |
+    Where-Object {{$_.InstanceId -like "*USB*" -and $_.Status -eq "OK"}} |
+    Select-Object InstanceId, FriendlyName, Class, Manufacturer |
+    ConvertTo-Json
+    """
+    salida = ejecutar_powershell(ps_script, timeout=10)
+    if not salida.strip():
+        return {}
+    datos = json.loads(salida)
+    if isinstance(datos, dict):
+        datos = [datos]
+    return {d['InstanceId']: d for d in datos if d.get('InstanceId')}
+
+
+def enumerar_usb():
+    """Todos los dispositivos USB presentes (enumeración completa)"""
+    return _consultar_usb_pnp("")
+
+
+def describir_usb(ids):
+    """Solo los dispositivos indicados (llegadas avisadas por la escucha)"""
+    lista = ",".join("'" + i.replace("'", "''") + "'" for i in ids)
+    return _consultar_usb_pnp(f"-InstanceId @({lista}) -ErrorAction SilentlyContinue")
+
+
+# ==================== DISPOSITIVOS DE AUDIO ====================
+def obtener_dispositivos_audio():
+    """Obtiene dispositivos de audio (micrófonos, altavoces, etc.)"""
+    dispositivos_audio = {
+        'entrada': [],  # Micrófonos
+        'salida': []    # Altavoces/Auriculares
+    }
+
+    try:
+        # Dispositivos de grabación (entrada)
+        ps_entrada = """
+        Get-WmiObject Win32_SoundDevice |
+        Where-Object {$_.Status -eq "OK"} |
+        Select-Object Name, Manufacturer, Status |
+        ConvertTo-Json
+        """
+
+        salida = ejecutar_powershell(ps_entrada, timeout=8)
+
+        if salida.strip():
+            datos = json.loads(salida)
+
+            if isinstance(datos, dict):
+                datos = [datos]
+
+            for dispositivo in datos:
+                info = {
+                    'nombre': dispositivo.get('Name', 'Desconocido'),
+                    'fabricante': dispositivo.get('Manufacturer', 'Desconocido'),
+                    'estado': 'Activo' if dispositivo.get('Status') == 'OK' else 'Inactivo'
+                }
+
+                # Clasificar en entrada o salida basado en el nombre
+                nombre_lower = info['nombre'].lower()
+                if any(palabra in nombre_lower for palabra in ['microphone', 'mic', 'input', 'recording']):
+                    dispositivos_audio['entrada'].append(info)
+                else:
+                    dispositivos_audio['salida'].append(info)
+
+    except Exception as e:
+        _log.warning(f"Error obteniendo dispositivos de audio: {e}")
+
+    return dispositivos_audio
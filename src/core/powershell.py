@@ -0,0 +1,218 @@
+import base64
+import itertools
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+
+from src.core.telemetria import contar_hijo
+
+# ==================== PROTOCOLO ====================
+# Cada mensaje es un objeto JSON en una sola línea (ConvertTo-Json -Compress
+# y json.dumps escapan los saltos de línea, así que la línea es el marco):
+#   pedido:    {"id": 1, "script": "..."}
+#   respuesta: {"id": 1, "ok": true, "salida": "..."}
+#              {"id": 1, "ok": false, "error": "..."}
+
+# Solo el parseo del pedido usa -ErrorAction Stop: con $ErrorActionPreference
+# = 'Stop' de sesión, cada script lo heredaría y un error no terminante (p. ej.
+# una clase WMI que falta) haría fallar la sonda entera.
+_SCRIPT_HOST = r"""
+$utf8 = New-Object System.Text.UTF8Encoding $false
+[Console]::InputEncoding = $utf8
+[Console]::OutputEncoding = $utf8
+while ($true) {
+    $linea = [Console]::In.ReadLine()
+    if ($linea -eq $null) { break }
+    if (-not $linea.Trim()) { continue }
+    try {
+        $pedido = $linea | ConvertFrom-Json -ErrorAction Stop
+    } catch {
+        continue
+    }
+    try {
+        $salida = & ([ScriptBlock]::Create($pedido.script)) | Out-String
+        $respuesta = @{ id = $pedido.id; ok = $true; salida = $salida }
+    } catch {
+        $respuesta = @{ id = $pedido.id; ok = $false; error = $_.Exception.Message }
+    }
+    [Console]::Out.WriteLine(($respuesta | ConvertTo-Json -Compress))
+    [Console]::Out.Flush()
+}
+"""
+
+# Hosts simultáneos (las sondas corren en paralelo, ver recolector.py)
+MAX_HOSTS = 2
+
+
+class ErrorPowerShell(Exception):
+    """Fallo, timeout o caída del host de PowerShell"""
+
+
+def _comando_powershell():
+    script = base64.b64encode(_SCRIPT_HOST.encode('utf-16-le')).decode('ascii')
+    return ['powershell', '-NoProfile', '-NonInteractive', '-ExecutionPolicy', 'Bypass',
+            '-EncodedCommand', script]
+
+
+class HostPowerShell:
+    """
+    Proceso de PowerShell de larga vida que ejecuta scripts por pedido.
+
+    Se inicia en el primer uso y se reinicia solo si el proceso murió o si
+    un pedido excedió su timeout. El comando es inyectable para poder usar
+    un sustituto en Python que hable el mismo protocolo.
+    """
+
+    def __init__(self, comando=None):
+        self._comando = comando or _comando_powershell()
+        self._proceso = None
+        self._respuestas = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.reinicios = 0
+
+    def _vivo(self):
+        return self._proceso is not None and self._proceso.poll() is None
+
+    def _iniciar(self):
+        if self._proceso is not None:
+            self.reinicios += 1
+        self._proceso = subprocess.Popen(
+            self._comando,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+        # Cola propia por proceso: respuestas de un host anterior no se mezclan
+        self._respuestas = queue.Queue()
+        threading.Thread(
+            target=_leer_respuestas,
+            args=(self._proceso.stdout, self._respuestas),
+            daemon=True
+        ).start()
+
+    def _detener(self):
+        if self._proceso is None:
+            return
+        try:
+            self._proceso.kill()
+            self._proceso.wait(timeout=2)
+        except Exception:
+            pass
+
+    def ejecutar(self, script, timeout=10):
+        """
+        Ejecuta un script y devuelve su salida como texto.
+
+        Raises:
+            ErrorPowerShell: si el script falla, el host cae o se excede el timeout
+        """
+        with self._lock:
+            if not self._vivo():
+                self._iniciar()
+
+            id_pedido = next(self._ids)
+            try:
+                self._proceso.stdin.write(json.dumps({'id': id_pedido, 'script': script}) + '\n')
+                self._proceso.stdin.flush()
+            except (OSError, ValueError) as e:
+                self._detener()
+                raise ErrorPowerShell(f"Host de PowerShell no disponible: {e}")
+
+            limite = time.monotonic() + timeout
+            while True:
+                restante = limite - time.monotonic()
+                try:
+                    respuesta = self._respuestas.get(timeout=max(0, restante))
+                except queue.Empty:
+                    # El host quedó ocupado con un script colgado: se descarta
+                    self._detener()
+                    raise ErrorPowerShell(f"Timeout de {timeout}s en PowerShell")
+
+                if respuesta is None:
+                    self._detener()
+                    raise ErrorPowerShell("El host de PowerShell terminó inesperadamente")
+                if respuesta.get('id') != id_pedido:
+                    continue  # Respuesta tardía de un pedido anterior
+
+                if respuesta.get('ok'):
+                    return respuesta.get('salida') or ''
+                raise ErrorPowerShell(respuesta.get('error', 'Error desconocido'))
+
+    def cerrar(self):
+        with self._lock:
+            if self._vivo():
+                try:
+                    self._proceso.stdin.close()
+                    self._proceso.wait(timeout=2)
+                except Exception:
+                    pass
+            self._detener()
+            self._proceso = None
+
+
+def _leer_respuestas(stdout, respuestas):
+    """Hilo lector: decodifica cada línea y la deja en la cola (None = fin)"""
+    try:
+        for linea in stdout:
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                respuestas.put(json.loads(linea))
+            except ValueError:
+                continue  # Ruido fuera de protocolo
+    except Exception:
+        pass
+    respuestas.put(None)
+
+
+# ==================== API COMPARTIDA ====================
+_HOSTS_LIBRES = queue.Queue()
+_HOSTS_CREADOS = []
+_LOCK_HOSTS = threading.Lock()
+
+
+def _tomar_host():
+    try:
+        return _HOSTS_LIBRES.get_nowait()
+    except queue.Empty:
+        pass
+    with _LOCK_HOSTS:
+        if len(_HOSTS_CREADOS) < MAX_HOSTS:
+            host = HostPowerShell()
+            _HOSTS_CREADOS.append(host)
+            return host
+    return _HOSTS_LIBRES.get()
+
+
+def ejecutar_powershell(script, timeout=10):
+    """
+    Ejecuta un script en uno de los hosts persistentes y devuelve su salida.
+
+    Raises:
+        ErrorPowerShell: si el script falla, el host cae o se excede el timeout
+    """
+    host = _tomar_host()
+    salida = ''
+    try:
+        salida = host.ejecutar(script, timeout=timeout)
+        return salida
+    finally:
+        contar_hijo(len(salida))
+        _HOSTS_LIBRES.put(host)
+
+
+def cerrar_hosts():
+    """Cierra todos los hosts (al detener el servicio)"""
+    with _LOCK_HOSTS:
+        for host in _HOSTS_CREADOS:
+            host.cerrar()
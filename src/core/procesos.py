@@ -0,0 +1,132 @@
+import threading
+import time
+from array import array
+
+# Una lectura de la tabla sirve a todas las sondas de un mismo ciclo
+MAX_EDAD_SEGUNDOS = 2.0
+
+
+class TablaProcesos:
+    """
+    Instantánea columnar de la tabla de procesos, leída en una sola pasada.
+
+    Cada columna es un array.array alineado por fila; los nombres se guardan
+    una vez y las filas solo llevan su código, así 300+ procesos no crean
+    un diccionario por proceso.
+    """
+
+    def __init__(self, leida_en=None):
+        self.pids = array('Q')
+        self.creados = array('d')       # create_time (distingue PIDs reutilizados)
+        self.codigos = array('I')       # índice en self.nombres
+        self.rss = array('Q')
+        self.privados = array('Q')      # bytes privados (Windows); 0 si no aplica
+        self.cpu = array('d')           # segundos de CPU (user + system)
+        self.nombres = []
+        self.exes = []                  # ruta del ejecutable por código de nombre
+        self.leida_en = time.monotonic() if leida_en is None else leida_en
+        self._codigo_de = {}
+
+    def __len__(self):
+        return len(self.pids)
+
+    def agregar(self, pid, nombre, exe, rss, privado, cpu, creado):
+        codigo = self._codigo_de.get(nombre)
+        if codigo is None:
+            codigo = len(self.nombres)
+            self._codigo_de[nombre] = codigo
+            self.nombres.append(nombre)
+            self.exes.append(exe or '')
+        elif exe and not self.exes[codigo]:
+            self.exes[codigo] = exe
+        self.pids.append(pid)
+        self.creados.append(creado)
+        self.codigos.append(codigo)
+        self.rss.append(rss)
+        self.privados.append(privado)
+        self.cpu.append(cpu)
+
+    @classmethod
+    def desde_filas(cls, filas, leida_en=None):
+        """Construye una tabla a partir de tuplas (pid, nombre, exe, rss, privado, cpu, creado)"""
+        tabla = cls(leida_en)
+        for fila in filas:
+            tabla.agregar(*fila)
+        return tabla
+
+    @classmethod
+    def leer(cls):
+        """Lee todos los procesos con un único psutil.process_iter"""
+        import psutil
+
+        tabla = cls()
+        for proc in psutil.process_iter(['name', 'exe', 'memory_info', 'cpu_times', 'create_time']):
+            try:
+                info = proc.info
+                memoria = info['memory_info']
+                cpu = info['cpu_times']
+                tabla.agregar(
+                    proc.pid,
+                    info['name'] or '',
+                    info['exe'],
+                    memoria.rss if memoria else 0,
+                    getattr(memoria, 'private', 0) if memoria else 0,
+                    cpu.user + cpu.system if cpu else 0.0,
+                    info['create_time'] or 0.0
+                )
+            except Exception:
+                continue
+        return tabla
+
+    # ---------- Operaciones por nombre ----------
+    def sumar_por_nombre(self, columna):
+        """Suma una columna alineada por fila agrupando por nombre de proceso"""
+        sumas = array('d', bytes(8 * len(self.nombres)))
+        for codigo, valor in zip(self.codigos, columna):
+            sumas[codigo] += valor
+        return sumas
+
+    def contar_por_nombre(self):
+        conteos = array('I', bytes(4 * len(self.nombres)))
+        for codigo in self.codigos:
+            conteos[codigo] += 1
+        return conteos
+
+    def memoria(self):
+        """Columna de memoria a reportar: bytes privados si existen, si no RSS"""
+        return self.privados if any(self.privados) else self.rss
+
+    def top_por_memoria(self, n, excluir=(), minimo_bytes=0):
+        """
+        Códigos de nombre con más memoria sumada, de mayor a menor.
+
+        Args:
+            excluir: nombres (en minúsculas) a ignorar
+            minimo_bytes: descarta grupos por debajo de este total
+        """
+        memoria = self.sumar_por_nombre(self.memoria())
+        excluir = set(excluir)
+        candidatos = [
+            codigo for codigo in range(len(self.nombres))
+            if memoria[codigo] > minimo_bytes and self.nombres[codigo].lower() not in excluir
+        ]
+        candidatos.sort(key=memoria.__getitem__, reverse=True)
+        return candidatos[:n], memoria
+
+    def indice_por_clave(self):
+        """{(pid, create_time): fila}"""
+        return {(pid, creado): i for i, (pid, creado) in enumerate(zip(self.pids, self.creados))}
+
+
+# ==================== INSTANTÁNEA COMPARTIDA ====================
+_TABLA = None
+_LOCK = threading.Lock()
+
+
+def obtener_tabla_procesos(max_edad=MAX_EDAD_SEGUNDOS):
+    """Devuelve la tabla del ciclo actual; la relee si tiene más de max_edad segundos"""
+    global _TABLA
+    with _LOCK:
+        if _TABLA is None or time.monotonic() - _TABLA.leida_en > max_edad:
+            _TABLA = TablaProcesos.leer()
+        return _TABLA
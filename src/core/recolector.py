@@ -0,0 +1,122 @@
+import copy
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+_log = logging.getLogger(__name__)
+
+# Hilos máximos para sondas concurrentes (casi todas esperan procesos hijos):
+# al menos uno por sonda registrada en scanner, así ninguna espera turno
+MAX_HILOS = 16
+
+
+class Recolector:
+    """
+    Ejecuta sondas registradas en paralelo sobre un pool de hilos acotado.
+
+    Cada sonda tiene su propio timeout y un valor por defecto que se usa si
+    falla, excede el tiempo o sigue en curso desde un ciclo anterior. El
+    timeout corre desde que la sonda empieza, no desde que entra al pool:
+    con el pool lleno, la espera en la cola no se le descuenta.
+    """
+
+    def __init__(self, max_hilos=MAX_HILOS, telemetria=None):
+        self._telemetria = telemetria
+        self._sondas = {}
+        self._en_curso = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="sonda")
+
+    def registrar(self, clave, funcion, timeout=10, por_defecto=None, pesada=False):
+        """
+        Registra una sonda cuyo resultado se guardará en datos[clave].
+
+        Args:
+            clave: Campo del diccionario de datos
+            funcion: Callable sin argumentos que devuelve el valor
+            timeout: Segundos máximos de espera
+            por_defecto: Valor usado ante error o timeout
+            pesada: Si True, solo se ejecuta con incluir_pesados
+        """
+        self._sondas[clave] = {
+            'funcion': funcion,
+            'timeout': timeout,
+            'por_defecto': por_defecto,
+            'pesada': pesada
+        }
+
+    def _ejecutar_sonda(self, clave, funcion, comienzos, arrancada):
+        comienzos[clave] = time.monotonic()
+        arrancada.set()
+        if self._telemetria is None:
+            return funcion()
+        with self._telemetria.medir(clave):
+            return funcion()
+
+    def _anotar(self, clave, estado):
+        if self._telemetria is not None:
+            self._telemetria.anotar(clave, estado)
+
+    def claves(self, incluir_pesados=True):
+        return [c for c, s in self._sondas.items() if incluir_pesados or not s['pesada']]
+
+    def ejecutar(self, incluir_pesados=True, solo=None):
+        """
+        Lanza todas las sondas a la vez y espera a cada una hasta su timeout.
+
+        Args:
+            incluir_pesados: Si False, omite las sondas marcadas como pesadas
+            solo: Iterable opcional de claves a ejecutar (ignora el resto)
+
+        Returns:
+            Diccionario {clave: resultado}
+        """
+        inicio = time.monotonic()
+        futuros = {}
+        resultados = {}
+        comienzos, arrancadas = {}, {}
+
+        for clave in self.claves(incluir_pesados):
+            if solo is not None and clave not in solo:
+                continue
+            sonda = self._sondas[clave]
+
+            # No relanzar una sonda colgada: ocuparía otro hilo del pool
+            previo = self._en_curso.get(clave)
+            if previo is not None and not previo.done():
+                _log.warning(f"Sonda '{clave}' sigue en curso desde el ciclo anterior")
+                self._anotar(clave, 'en_curso')
+                resultados[clave] = copy.deepcopy(sonda['por_defecto'])
+                continue
+
+            arrancadas[clave] = threading.Event()
+            futuro = self._pool.submit(self._ejecutar_sonda, clave, sonda['funcion'], comienzos, arrancadas[clave])
+            self._en_curso[clave] = futuro
+            futuros[clave] = futuro
+
+        # Una sonda en cola tiene hasta el timeout más largo del ciclo para empezar:
+        # para entonces las que arrancaron primero terminaron o excedieron el suyo
+        limite_cola = inicio + max((self._sondas[c]['timeout'] for c in futuros), default=0)
+        for clave, futuro in futuros.items():
+            sonda = self._sondas[clave]
+            if not arrancadas[clave].wait(max(0, limite_cola - time.monotonic())) and futuro.cancel():
+                _log.warning(f"Sonda '{clave}' no llegó a empezar: pool ocupado")
+                self._anotar(clave, 'timeout')
+                resultados[clave] = copy.deepcopy(sonda['por_defecto'])
+                continue
+            comienzo = comienzos.get(clave, time.monotonic())
+            restante = max(0, comienzo + sonda['timeout'] - time.monotonic())
+            try:
+                resultados[clave] = futuro.result(timeout=restante)
+            except FuturesTimeout:
+                _log.warning(f"Sonda '{clave}' excedió {sonda['timeout']}s")
+                self._anotar(clave, 'timeout')
+                resultados[clave] = copy.deepcopy(sonda['por_defecto'])
+            except Exception as e:
+                _log.warning(f"Error en sonda '{clave}': {e}")
+                resultados[clave] = copy.deepcopy(sonda['por_defecto'])
+
+        return resultados
+
+    def cerrar(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,136 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+try:
+    from config.config import LOG_COPIAS, LOG_MAX_BYTES, LOG_MAX_EDAD, LOG_PATH, NIVELES_LOG
+except ImportError:
+    LOG_PATH = os.path.join(os.path.expanduser('~'), '.agente_monitoreo', 'agente.log')
+    LOG_MAX_BYTES = 5 * 1024 * 1024
+    LOG_MAX_EDAD = 7 * 24 * 3600
+    LOG_COPIAS = 3
+    NIVELES_LOG = {'': 'WARNING', 'src': 'INFO', '__main__': 'INFO'}
+
+
+class FormatoJSON(logging.Formatter):
+    """
+    Una línea JSON por registro: ts, nivel, modulo, hilo, msg y, si se pasó
+    extra={'datos': {...}}, los campos estructurados en 'datos'.
+    """
+
+    def format(self, record):
+        entrada = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f'.{int(record.msecs):03d}',
+            'nivel': record.levelname,
+            'modulo': record.name,
+            'hilo': record.threadName,
+            'msg': record.getMessage()
+        }
+        datos = getattr(record, 'datos', None)
+        if datos:
+            entrada['datos'] = datos
+        return json.dumps(entrada, ensure_ascii=False, default=str)
+
+
+def _inicio_archivo(ruta):
+    """
+    Momento del primer registro de un archivo existente (su 'ts'); la fecha de
+    modificación si no se puede leer, None si no existe.
+    """
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            ts = json.loads(f.readline())['ts']
+        return time.mktime(time.strptime(ts[:19], '%Y-%m-%dT%H:%M:%S'))
+    except FileNotFoundError:
+        return None
+    except Exception:
+        try:
+            return os.path.getmtime(ruta)
+        except OSError:
+            return None
+
+
+class ArchivoRotativo(logging.handlers.RotatingFileHandler):
+    """
+    Archivo que rota por tamaño o por antigüedad, lo que llegue primero: un
+    agente tranquilo que nunca alcanza max_bytes no conserva el mismo archivo
+    para siempre. La antigüedad se cuenta desde el primer registro del archivo
+    y no desde su fecha de creación, que Windows puede heredar del archivo
+    recién rotado (file tunneling).
+
+    Args:
+        max_edad: Segundos; 0 = solo por tamaño
+    """
+
+    def __init__(self, ruta, max_bytes=0, copias=0, max_edad=0):
+        super().__init__(ruta, maxBytes=max_bytes, backupCount=copias, encoding='utf-8', delay=True)
+        self._max_edad = max_edad
+        self._inicio = _inicio_archivo(self.baseFilename)
+
+    def shouldRollover(self, record):
+        if self._max_edad and self._inicio is not None and record.created - self._inicio >= self._max_edad:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self._inicio = None
+
+    def emit(self, record):
+        super().emit(record)
+        if self._inicio is None:
+            self._inicio = record.created
+
+
+_OYENTE = None
+_LOCK = threading.Lock()
+
+
+def configurar_registro(ruta=None, niveles=None, max_bytes=LOG_MAX_BYTES, copias=LOG_COPIAS,
+                        max_edad=LOG_MAX_EDAD):
+    """
+    Instala el registro del agente (idempotente). Los módulos solo encolan
+    (QueueHandler, sin E/S en el hilo que registra); un hilo propio escribe
+    en un archivo rotativo (por tamaño o antigüedad) abierto una sola vez.
+
+    Args:
+        ruta: Archivo de registro (None = LOG_PATH)
+        niveles: {nombre_logger: nivel}; '' es la raíz. Por defecto NIVELES_LOG.
+    """
+    global _OYENTE
+    ruta = LOG_PATH if ruta is None else ruta
+    with _LOCK:
+        if _OYENTE is not None:
+            return
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            archivo = ArchivoRotativo(ruta, max_bytes=max_bytes, copias=copias, max_edad=max_edad)
+        except Exception:
+            # Sin carpeta de datos escribible: al menos no perder WARNING+ por stderr
+            archivo = logging.StreamHandler()
+        archivo.setFormatter(FormatoJSON())
+
+        cola = queue.SimpleQueue()
+        raiz = logging.getLogger()
+        raiz.addHandler(logging.handlers.QueueHandler(cola))
+        for nombre, nivel in (NIVELES_LOG if niveles is None else niveles).items():
+            logging.getLogger(nombre or None).setLevel(nivel)
+
+        _OYENTE = logging.handlers.QueueListener(cola, archivo, respect_handler_level=True)
+        _OYENTE.start()
+
+
+def detener_registro():
+    """Escribe lo encolado y cierra el archivo (al detener el servicio)"""
+    global _OYENTE
+    with _LOCK:
+        if _OYENTE is None:
+            return
+        _OYENTE.stop()
+        for manejador in _OYENTE.handlers:
+            manejador.close()
+        _OYENTE = None
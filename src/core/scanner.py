@@ -2,111 +2,131 @@ import psutil
 import platform
 import subprocess
 import os
-import requests
-import win32evtlog
-import win32evtlogutil
-import win32con
 import gc
+import json
+import logging
 
 try:
-    from src.core.perifericos import obtener_todos_los_perifericos
+    from src.core.perifericos import obtener_eventos_usb, obtener_perifericos
     PERIFERICOS_DISPONIBLE = True
 except ImportError:
     PERIFERICOS_DISPONIBLE = False
 
+from src.core.cpu import RastreadorCPU
+from src.core.descripciones import CacheDescripciones
+from src.core.eventos import obtener_huellas_errores
+from src.core.historial import Muestreador
+from src.core.plataforma import SIN_VENTANA, obtener_backend
+from src.core.procesos import obtener_tabla_procesos
+from src.core.recolector import Recolector
+from src.core.servicios import obtener_estado_servicios
+from src.core.telemetria import TELEMETRIA, contar_bytes, contar_hijo
+
+try:
+    from config.config import DESCRIPCIONES_PATH, IDENTIDAD_PATH
+except ImportError:
+    IDENTIDAD_PATH = os.path.join(os.path.expanduser('~'), '.agente_monitoreo', 'identidad.json')
+    DESCRIPCIONES_PATH = os.path.join(os.path.expanduser('~'), '.agente_monitoreo', 'descripciones.json')
+
+_log = logging.getLogger(__name__)
+
 # ==================== CACHÉ GLOBAL ====================
 _CACHE_ESTATICO = {}
 
+# Descripciones de ejecutables por (ruta, tamaño, mtime), persistidas en disco
+_DESCRIPCIONES = CacheDescripciones(DESCRIPCIONES_PATH)
+
+# Tiempos de CPU en segundo plano: porcentajes al instante, sin interval= ni sleep
+_CPU = RastreadorCPU()
+
 def inicializar_cache():
     """Cachea datos que nunca cambian (se llama 1 vez al inicio)"""
-    global _CACHE_ESTATICO
-    if not _CACHE_ESTATICO:
-        _CACHE_ESTATICO = {
+    if 'hostname' not in _CACHE_ESTATICO:
+        _CACHE_ESTATICO.update({
             'hostname': platform.node(),
             'sistema_operativo': f"{platform.system()} {platform.release()}",
             'arquitectura': platform.machine(),
             'procesador': platform.processor(),
             'nucleos_fisicos': psutil.cpu_count(logical=False),
             'ram_total_gb': round(psutil.virtual_memory().total / (1024 ** 3), 2),
-            'modelos_discos': obtener_modelos_discos_fisicos()  # Cacheamos modelos
-        }
+            'modelos_discos': obtener_modelos_discos_fisicos(),  # Cacheamos modelos
+            'indice_particiones': {},   # Letra → disco físico (ver obtener_disco_de_particion)
+            'firma_particiones': None
+        })
     return _CACHE_ESTATICO
 
 
 # ==================== 1. SALUD DEL DISCO ====================
 def obtener_modelos_discos_fisicos():
-    """Obtiene los modelos de los discos físicos usando WMIC (se ejecuta 1 vez)"""
-    modelos = {}
+    """Obtiene los modelos de los discos físicos (se ejecuta 1 vez)"""
     try:
-        resultado = subprocess.run(
-            ['wmic', 'diskdrive', 'get', 'Index,Model'],
-            capture_output=True,
-            text=True,
-            timeout=10,
-            creationflags=subprocess.CREATE_NO_WINDOW
-        )
-        
-        lineas = resultado.stdout.strip().split('\n')[1:]
-        
-        for linea in lineas:
-            linea = linea.strip()
-            if linea:
-                partes = linea.split(None, 1)
-                if len(partes) == 2:
-                    indice = partes[0].strip()
-                    modelo = partes[1].strip()
-                    modelos[indice] = modelo
-                    
+        return obtener_backend().leer_modelos_discos()
     except Exception as e:
-        print(f"⚠️ No se pudo obtener modelos de discos: {e}")
-    
-    return modelos
+        _log.warning(f"No se pudo obtener modelos de discos: {e}")
+        return {}
 
 
-def obtener_disco_de_particion(letra_unidad):
-    """Obtiene el número de disco físico de una letra de unidad"""
+def obtener_indice_particiones():
+    """
+    Construye el índice partición → disco físico con una sola consulta
+    (en lugar de una por partición).
+    """
     try:
-        letra = letra_unidad.replace(':', '').replace('\\', '').strip()
-        
-        resultado = subprocess.run(
-            ['wmic', 'logicaldisk', 'where', f'DeviceID="{letra}:"', 'assoc', '/assocclass:Win32_LogicalDiskToPartition'],
-            capture_output=True,
-            text=True,
-            timeout=10,
-            creationflags=subprocess.CREATE_NO_WINDOW
-        )
-        
-        for linea in resultado.stdout.split('\n'):
-            if 'Disk #' in linea:
-                try:
-                    disk_num = linea.split('Disk #')[1].split(',')[0].strip()
-                    return disk_num
-                except:
-                    pass
-        
-        return "0"  # Fallback
-            
+        return obtener_backend().leer_indice_particiones()
     except Exception as e:
-        print(f"⚠️ Error obteniendo disco de partición {letra_unidad}: {e}")
+        _log.warning(f"No se pudo obtener el índice de particiones: {e}")
+        return {}
+
+
+def _firma_particiones(particiones):
+    return frozenset((p.device, p.mountpoint, p.fstype) for p in particiones)
+
+
+def _indice_de(particiones):
+    """
+    Índice partición → disco cacheado por firma de particiones. Uno vacío
+    (consulta fallida) no se asocia a la firma: el próximo escaneo reintenta.
+    """
+    cache = inicializar_cache()
+    firma = _firma_particiones(particiones)
+    if cache.get('firma_particiones') != firma:
+        indice = obtener_indice_particiones()
+        cache['indice_particiones'] = indice
+        cache['firma_particiones'] = firma if indice else None
+    return cache['indice_particiones']
+
+
+def obtener_disco_de_particion(dispositivo, particiones=None, indice=None):
+    """
+    Obtiene el disco físico de una partición (letra de unidad en Windows,
+    dispositivo de bloque en Linux). El índice se cachea y solo se
+    reconstruye si cambian las particiones.
     
-    return None
+    Args:
+        indice: Índice ya obtenido en este escaneo (evita reconsultar por partición)
+    """
+    if indice is None:
+        indice = _indice_de(psutil.disk_partitions() if particiones is None else particiones)
+    return indice.get(obtener_backend().clave_particion(dispositivo), "0")
 
 
 def obtener_salud_discos():
-    """Obtiene información de espacio en disco usando caché de modelos"""
+    """Obtiene información de espacio en disco usando caché de modelos y particiones"""
     cache = inicializar_cache()
     modelos_discos = cache['modelos_discos']
+    particiones = psutil.disk_partitions()
+    es_local = obtener_backend().es_particion_local
+    indice = _indice_de(particiones)
     
     discos = []
-    for partition in psutil.disk_partitions():
-        if 'fixed' not in partition.opts:
+    for partition in particiones:
+        if not es_local(partition):
             continue
             
         try:
             uso = psutil.disk_usage(partition.mountpoint)
             
-            letra = partition.device
-            disco_index = obtener_disco_de_particion(letra)
+            disco_index = obtener_disco_de_particion(partition.device, indice=indice)
             modelo = modelos_discos.get(disco_index, "Desconocido") if disco_index else "Desconocido"
             
             discos.append({
@@ -162,106 +182,10 @@ def obtener_info_red():
     }
 
 
-# ==================== 5. ERRORES DEL SISTEMA ====================
-def obtener_errores_sistema(limite=5):  # REDUCIDO DE 10 A 5
-    """Obtiene errores críticos recientes (optimizado)"""
-    errores = []
-    
-    try:
-        hand = win32evtlog.OpenEventLog(None, "System")
-        flags = win32evtlog.EVENTLOG_BACKWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ
-        
-        eventos = win32evtlog.ReadEventLog(hand, flags, 0)
-        
-        for evento in eventos[:50]:  # REDUCIDO DE 100 A 50
-            if evento.EventType == win32con.EVENTLOG_ERROR_TYPE:  # SOLO ERRORES, NO WARNINGS
-                try:
-                    mensaje = win32evtlogutil.SafeFormatMessage(evento, "System")
-                    if mensaje:
-                        mensaje = mensaje[:150] + "..." if len(mensaje) > 150 else mensaje
-                    else:
-                        mensaje = "Sin descripción"
-                except:
-                    mensaje = "Error al leer mensaje"
-                
-                errores.append({
-                    "fecha": evento.TimeGenerated.Format(),
-                    "tipo": "Error",
-                    "fuente": evento.SourceName,
-                    "evento_id": evento.EventID,
-                    "mensaje": mensaje
-                })
-                
-                if len(errores) >= limite:
-                    break
-        
-        win32evtlog.CloseEventLog(hand)
-        
-    except Exception as e:
-        errores.append({
-            "error": f"No se pudo leer Event Viewer: {str(e)}"
-        })
-    
-    return errores
-
-
-# ==================== 6. ESTADO DE SERVICIOS CRÍTICOS ====================
-def obtener_estado_servicios():
-    """Verifica servicios críticos de seguridad"""
-    servicios_criticos = {
-        "WinDefend": "Windows Defender",
-        "wuauserv": "Windows Update",
-        "mpssvc": "Firewall de Windows",
-        "wscsvc": "Centro de seguridad"
-    }
-    
-    estados = []
-    
-    for servicio, nombre in servicios_criticos.items():
-        try:
-            resultado = subprocess.run(
-                ['sc', 'query', servicio],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            estado = "Detenido"
-            if "RUNNING" in resultado.stdout:
-                estado = "En ejecución"
-            elif "STOPPED" in resultado.stdout:
-                estado = "Detenido"
-            elif "PAUSED" in resultado.stdout:
-                estado = "Pausado"
-            
-            estados.append({
-                "servicio": nombre,
-                "estado": estado,
-                "critico": estado != "En ejecución"
-            })
-            
-        except Exception as e:
-            estados.append({
-                "servicio": nombre,
-                "estado": f"Error: {str(e)}",
-                "critico": True
-            })
-    
-    return estados
-
-
 def obtener_id_anydesk():
     """Obtiene el ID de AnyDesk (cacheado en memoria)"""
-    posibles_rutas_exe = [
-        r"C:\Program Files (x86)\AnyDesk\AnyDesk.exe",
-        r"C:\Program Files\AnyDesk\AnyDesk.exe",
-        os.path.join(os.environ.get('ProgramData', ''), 'AnyDesk', 'AnyDesk.exe'),
-        os.path.join(os.environ.get('LOCALAPPDATA', ''), 'AnyDesk', 'AnyDesk.exe')
-    ]
-    
     anydesk_exe = None
-    for ruta in posibles_rutas_exe:
+    for ruta in obtener_backend().rutas_anydesk():
         if os.path.exists(ruta):
             anydesk_exe = ruta
             break
@@ -275,8 +199,9 @@ def obtener_id_anydesk():
             capture_output=True,
             text=True,
             timeout=5,
-            creationflags=subprocess.CREATE_NO_WINDOW
+            creationflags=SIN_VENTANA
         )
+        contar_hijo(len(resultado.stdout))
         
         if resultado.returncode == 0:
             anydesk_id = resultado.stdout.strip()
@@ -293,6 +218,10 @@ def obtener_id_anydesk():
     
 def obtener_ip_publica():
     """Obtiene IP pública con timeout corto"""
+    # requests (urllib3, certifi, http.client) se importa recién aquí: pesa más
+    # que el resto del escáner y esta sonda corre una vez por hora
+    import requests
+
     servidores_ip = [
         'https://api.ipify.org',
         'https://checkip.amazonaws.com'
@@ -301,6 +230,7 @@ def obtener_ip_publica():
     for url in servidores_ip:
         try:
             respuesta = requests.get(url, timeout=3)  # REDUCIDO DE 5 A 3
+            contar_bytes(len(respuesta.content))
             if respuesta.status_code == 200:
                 return respuesta.text.strip()
         except Exception:
@@ -309,162 +239,71 @@ def obtener_ip_publica():
     return "IP no disponible"
 
 
+# Procesos de sistema que no interesan como "aplicaciones" en el fallback
+_PROCESOS_SISTEMA = ('svchost.exe', 'conhost.exe', 'idle', 'system', 'system idle process',
+                     'registry', 'smss.exe', 'csrss.exe', 'wininit.exe',
+                     'services.exe', 'lsass.exe', 'dwm.exe')
+
+
+def _top_aplicaciones(tabla, excluir, limite=10, minimo_mb=0):
+    """Agrupa la tabla de procesos por nombre y devuelve el top por memoria"""
+    # Sin base de procesos reciente, porcentajes() devuelve una tabla nueva
+    tabla, porcentajes = _CPU.porcentajes(tabla)
+    top, memoria = tabla.top_por_memoria(limite, excluir=excluir, minimo_bytes=minimo_mb * 1024 * 1024)
+    cpu = tabla.sumar_por_nombre(porcentajes)
+    procesos = tabla.contar_por_nombre()
+    return [{
+        'nombre': tabla.nombres[codigo],
+        'cpu_porcentaje': round(cpu[codigo], 1),
+        'ram_mb': round(memoria[codigo] / (1024 * 1024), 1),
+        'procesos': procesos[codigo],
+        '_exe': tabla.exes[codigo]
+    } for codigo in top]
+
+
+def obtener_descripciones_ejecutables(rutas):
+    """Descripción legible de cada ejecutable con una sola consulta al sistema ('' si no tiene)"""
+    return obtener_backend().describir_ejecutables(rutas)
+
+
 def obtener_aplicaciones_activas():
-    """Obtiene top 10 apps (REDUCIDO DE 15)"""
-    import json
-    
-    powershell_script = """
-    $apps = @{}
-    
-    Get-Counter '\\Proceso(*)\\Espacio de trabajo - Privado' -ErrorAction SilentlyContinue | 
-        Select-Object -ExpandProperty CounterSamples | 
-        ForEach-Object {
-            $name = $_.InstanceName
-            if ($name -notin @('idle','_total','system')) {
-                if (-not $apps.ContainsKey($name)) {
-                    $description = $name
-                    try {
-                        $proc = Get-Process -Name $name -ErrorAction SilentlyContinue | Select-Object -First 1
-                        if ($proc -and $proc.Path) {
-                            $fileInfo = [System.Diagnostics.FileVersionInfo]::GetVersionInfo($proc.Path)
-                            if ($fileInfo.FileDescription) {
-                                $description = $fileInfo.FileDescription
-                            }
-                        }
-                    } catch {}
-                    
-                    $apps[$name] = @{
-                        Description = $description
-                        RAM = 0
-                        Count = 0
-                    }
-                }
-                $apps[$name].RAM += $_.CookedValue
-                $apps[$name].Count += 1
-            }
-        }
-    
-    $result = $apps.GetEnumerator() | ForEach-Object {
-        [PSCustomObject]@{
-            Name = $_.Key + '.exe'
-            Description = $_.Value.Description
-            RAM_MB = [math]::Round($_.Value.RAM / 1MB, 1)
-            Processes = $_.Value.Count
-        }
-    } | Where-Object { $_.RAM_MB -gt 5 } | Sort-Object RAM_MB -Descending | Select-Object -First 10
-    
-    $result | ConvertTo-Json
     """
-    
+    Obtiene top 10 apps por memoria a partir de la tabla de procesos del ciclo
+    (una sola pasada); PowerShell solo se usa para las descripciones del top.
+    """
     try:
-        resultado = subprocess.run(
-            ['powershell', '-NoProfile', '-Command', powershell_script],
-            capture_output=True,
-            text=True,
-            timeout=10,  # REDUCIDO DE 15 A 10
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-        )
+        tabla = obtener_tabla_procesos()
+        apps = _top_aplicaciones(tabla, excluir=('idle', 'system', 'system idle process', '_total'),
+                                 minimo_mb=5)
         
-        if resultado.returncode == 0 and resultado.stdout.strip():
-            datos = json.loads(resultado.stdout)
-            
-            if isinstance(datos, dict):
-                datos = [datos]
-            
-            apps_formateadas = []
-            for app in datos:
-                apps_formateadas.append({
-                    'nombre': app['Name'],
-                    'descripcion': app.get('Description', app['Name']),
-                    'cpu_porcentaje': 0,
-                    'ram_mb': app['RAM_MB'],
-                    'procesos': app['Processes']
-                })
-            
-            # CPU rápido con psutil
-            cpu_data = {}
-            for proc in psutil.process_iter(['name']):
-                try:
-                    proc.cpu_percent()
-                except:
-                    pass
-            
-            import time
-            time.sleep(0.2)  # REDUCIDO DE 0.3 A 0.2
-            
-            for proc in psutil.process_iter(['name', 'cpu_percent']):
-                try:
-                    nombre = proc.info['name']
-                    if nombre not in cpu_data:
-                        cpu_data[nombre] = 0
-                    cpu_data[nombre] += proc.info['cpu_percent']
-                except:
-                    pass
-            
-            for app in apps_formateadas:
-                nombre_sin_exe = app['nombre'].replace('.exe', '.exe')
-                if nombre_sin_exe in cpu_data:
-                    app['cpu_porcentaje'] = round(cpu_data[nombre_sin_exe], 1)
-            
-            return apps_formateadas
+        try:
+            # Solo se consulta PowerShell por binarios nunca vistos (o actualizados)
+            descripciones = _DESCRIPCIONES.obtener([app['_exe'] for app in apps],
+                                                   obtener_descripciones_ejecutables)
+        except Exception as e:
+            _log.warning(f"No se pudieron obtener descripciones: {e}")
+            descripciones = {}
+        
+        return [{
+            'nombre': app['nombre'],
+            'descripcion': descripciones.get(app.pop('_exe'), app['nombre']),
+            'cpu_porcentaje': app['cpu_porcentaje'],
+            'ram_mb': app['ram_mb'],
+            'procesos': app['procesos']
+        } for app in apps]
         
     except Exception as e:
-        print(f"⚠️ Error con Performance Counters: {e}")
+        _log.warning(f"Error agrupando procesos: {e}")
     
     return obtener_aplicaciones_activas_fallback()
 
 
 def obtener_aplicaciones_activas_fallback():
-    """Fallback usando psutil"""
-    apps_agrupadas = {}
-    
-    for proc in psutil.process_iter(['name']):
-        try:
-            proc.cpu_percent()
-        except:
-            pass
-    
-    import time
-    time.sleep(0.3)
-    
-    for proc in psutil.process_iter(['name', 'cpu_percent', 'memory_info']):
-        try:
-            nombre = proc.info['name']
-            
-            if nombre.lower() in ['svchost.exe', 'conhost.exe', 'idle', 'system', 
-                                   'registry', 'smss.exe', 'csrss.exe', 'wininit.exe',
-                                   'services.exe', 'lsass.exe', 'dwm.exe']:
-                continue
-            
-            ram_mb = proc.info['memory_info'].rss / (1024 * 1024)
-            cpu_pct = proc.info['cpu_percent']
-            
-            if nombre not in apps_agrupadas:
-                apps_agrupadas[nombre] = {
-                    'nombre': nombre,
-                    'cpu_porcentaje': 0,
-                    'ram_mb': 0,
-                    'procesos': 0
-                }
-            
-            apps_agrupadas[nombre]['cpu_porcentaje'] += cpu_pct
-            apps_agrupadas[nombre]['ram_mb'] += ram_mb
-            apps_agrupadas[nombre]['procesos'] += 1
-                
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-    
-    apps_con_recursos = []
-    for app in apps_agrupadas.values():
-        apps_con_recursos.append({
-            'nombre': app['nombre'],
-            'cpu_porcentaje': round(app['cpu_porcentaje'], 1),
-            'ram_mb': round(app['ram_mb'], 1),
-            'procesos': app['procesos']
-        })
-    
-    apps_con_recursos.sort(key=lambda x: x['ram_mb'], reverse=True)
-    return apps_con_recursos[:10]  # REDUCIDO DE 15 A 10
+    """Fallback sin descripciones (excluye procesos del sistema)"""
+    apps = _top_aplicaciones(obtener_tabla_procesos(), excluir=_PROCESOS_SISTEMA)
+    for app in apps:
+        app.pop('_exe')
+    return apps
 
 
 def obtener_usuarios():
@@ -480,57 +319,152 @@ def obtener_usuarios():
         return {"usuario_actual": "Desconocido", "usuarios_activos": []}
 
 
-def obtener_id_inventario():
+# ==================== IDENTIDAD ====================
+def _leer_identidad_persistida():
     try:
-        cmd = 'wmic csproduct get uuid'
-        resultado = subprocess.check_output(cmd, shell=True).decode().split('\n')
-        uuid = resultado[1].strip()
-        return uuid
+        with open(IDENTIDAD_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _guardar_identidad(identidad):
+    try:
+        os.makedirs(os.path.dirname(IDENTIDAD_PATH), exist_ok=True)
+        temporal = IDENTIDAD_PATH + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(identidad, f)
+        os.replace(temporal, IDENTIDAD_PATH)
     except Exception as e:
-        print(f"Error obteniendo UUID: {e}")
-        return platform.node()
+        _log.warning(f"No se pudo guardar la identidad: {e}")
 
 
-def obtener_datos_pc(incluir_pesados=True):
+def obtener_id_inventario(revalidar=False):
+    """
+    Devuelve el UUID de la placa. Se consulta al sistema (WMI en Windows,
+    DMI en Linux) una sola vez por instalación:
+    queda en _CACHE_ESTATICO y en disco (IDENTIDAD_PATH).
+
+    Args:
+        revalidar: Si True, ignora las cachés y vuelve a consultar (cambio de hardware)
     """
-    Función principal optimizada.
+    if not revalidar:
+        if _CACHE_ESTATICO.get('uuid'):
+            return _CACHE_ESTATICO['uuid']
+        
+        # La identidad persistida solo vale para el mismo equipo (imágenes clonadas)
+        identidad = _leer_identidad_persistida()
+        if identidad.get('uuid') and identidad.get('hostname') == platform.node():
+            _CACHE_ESTATICO['uuid'] = identidad['uuid']
+            return identidad['uuid']
+    
+    try:
+        uuid = obtener_backend().leer_uuid()
+        if not uuid:
+            raise ValueError("UUID vacío")
+    except Exception as e:
+        _log.warning(f"Error obteniendo UUID: {e}")
+        # No se persiste el fallback: se reintenta en el próximo arranque
+        return _CACHE_ESTATICO.get('uuid') or platform.node()
+    
+    anterior = _CACHE_ESTATICO.get('uuid')
+    if anterior and anterior != uuid:
+        _log.warning(f"UUID cambiado: {anterior} -> {uuid}")
+    
+    _CACHE_ESTATICO['uuid'] = uuid
+    _guardar_identidad({'uuid': uuid, 'hostname': platform.node()})
+    return uuid
+
+
+def revalidar_id_inventario():
+    """Fuerza una nueva lectura del UUID (tras un cambio de placa o de disco clonado)"""
+    return obtener_id_inventario(revalidar=True)
+
+
+def cierre_ventana():
+    """
+    Callback que cierra la ventana de metricas_ventana en la posición actual
+    del muestreador. Se toma antes del escaneo y se pasa como al_confirmar del
+    envío: si la escritura no se confirma, las muestras siguen en la ventana.
+    """
+    marca = _MUESTREADOR.marca()
+    return lambda: _MUESTREADOR.cerrar_ventana(marca)
+
+
+# ==================== RECOLECTOR DE SONDAS ====================
+_RECOLECTOR = Recolector(telemetria=TELEMETRIA)
+
+# Muestreo continuo entre sincronizaciones (se inicia con el primer escaneo)
+_MUESTREADOR = Muestreador()
+
+# Sondas ligeras (cada sincronización)
+_RECOLECTOR.registrar("uuid", obtener_id_inventario, timeout=15, por_defecto=platform.node())
+_RECOLECTOR.registrar("cpu_uso_porcentaje", _CPU.cpu_sistema, timeout=5, por_defecto=0)
+_RECOLECTOR.registrar("ram_uso_porcentaje", lambda: psutil.virtual_memory().percent, timeout=5, por_defecto=0)
+_RECOLECTOR.registrar("usuarios", obtener_usuarios, timeout=5,
+                      por_defecto={"usuario_actual": "Desconocido", "usuarios_activos": []})
+_RECOLECTOR.registrar("discos", obtener_salud_discos, timeout=30, por_defecto=[])
+_RECOLECTOR.registrar("red", obtener_info_red, timeout=5, por_defecto={"adaptadores": [], "trafico": {}})
+_RECOLECTOR.registrar("servicios_criticos", obtener_estado_servicios, timeout=25, por_defecto=[])
+_RECOLECTOR.registrar("metricas_ventana", _MUESTREADOR.resumen, timeout=2, por_defecto={})
+_RECOLECTOR.registrar("telemetria_agente", TELEMETRIA.resumen, timeout=2, por_defecto=None)
+if PERIFERICOS_DISPONIBLE:
+    # En memoria: los avisos de conexión ya llegaron; no enumera salvo la reconciliación
+    _RECOLECTOR.registrar("usb_eventos", obtener_eventos_usb, timeout=15, por_defecto=None)
+
+# Sondas pesadas (solo con incluir_pesados)
+_RECOLECTOR.registrar("ip_publica", obtener_ip_publica, timeout=8, por_defecto="IP no disponible", pesada=True)
+_RECOLECTOR.registrar("anydesk_id", obtener_id_anydesk, timeout=8, por_defecto="Timeout", pesada=True)
+_RECOLECTOR.registrar("aplicaciones_activas", obtener_aplicaciones_activas, timeout=20, por_defecto=[], pesada=True)
+# Sin por_defecto: un fallo de lectura no debe vaciar las huellas ya enviadas
+_RECOLECTOR.registrar("errores_huellas", obtener_huellas_errores, timeout=15, por_defecto=None, pesada=True)
+if PERIFERICOS_DISPONIBLE:
+    _RECOLECTOR.registrar("perifericos", obtener_perifericos, timeout=45, por_defecto=None, pesada=True)
+
+
+def claves_sondas():
+    """Campos dinámicos con cadencia propia (los que programa el planificador)"""
+    return [c for c in _RECOLECTOR.claves() if c != "uuid"]
+
+
+def obtener_datos_pc(incluir_pesados=True, solo=None):
+    """
+    Función principal optimizada. Todas las sondas corren en paralelo,
+    por lo que el tiempo total ronda el de la sonda más lenta.
     
     Args:
         incluir_pesados: Si False, omite aplicaciones activas y errores (para sincronización rápida)
+        solo: Claves de las sondas a ejecutar (las que se van a enviar); None = todas
     """
     # Inicializar caché si es primera vez
     cache = inicializar_cache()
+    _CPU.iniciar()
+    _MUESTREADOR.iniciar()
+    
+    if solo is not None:
+        # Solo corre lo que se va a subir; uuid identifica el documento
+        resultados = _RECOLECTOR.ejecutar(solo=set(solo) | {"uuid"})
+    else:
+        resultados = _RECOLECTOR.ejecutar(incluir_pesados=incluir_pesados)
     
     # Datos base (SIEMPRE)
     datos = {
-        "uuid": obtener_id_inventario(),
+        "uuid": resultados["uuid"],
         "hostname": cache['hostname'],
         "sistema_operativo": cache['sistema_operativo'],
         "arquitectura": cache['arquitectura'],
         "procesador": cache['procesador'],
         "nucleos_fisicos": cache['nucleos_fisicos'],
         "ram_total_gb": cache['ram_total_gb'],
-        
-        # Datos dinámicos ligeros
-        "cpu_uso_porcentaje": psutil.cpu_percent(interval=0.5),  # REDUCIDO DE 1 A 0.5
-        "ram_uso_porcentaje": psutil.virtual_memory().percent,
-        "usuarios": obtener_usuarios(),
-        "discos": obtener_salud_discos(),
-        "red": obtener_info_red(),
-        "servicios_criticos": obtener_estado_servicios()
     }
     
-    # Datos pesados (CONDICIONAL)
-    if incluir_pesados:
-        datos["ip_publica"] = obtener_ip_publica()
-        datos["anydesk_id"] = obtener_id_anydesk()
-        datos["aplicaciones_activas"] = obtener_aplicaciones_activas()
-        datos["errores_recientes"] = obtener_errores_sistema(limite=5)
-
-        if PERIFERICOS_DISPONIBLE:
-            datos["perifericos"] = obtener_todos_los_perifericos()
+    # Datos dinámicos ligeros y pesados (CONDICIONAL), en orden de registro;
+    # una sonda sin resultado (None) se omite en lugar de pisar lo ya enviado
+    for clave, valor in resultados.items():
+        if clave != "uuid" and valor is not None:
+            datos[clave] = valor
 
     # Liberar memoria
     gc.collect()
     
-    return datos
\ No newline at end of file
+    return datos
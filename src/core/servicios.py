@@ -0,0 +1,52 @@
+from src.core.plataforma import obtener_backend
+
+# Códigos de estado del Service Control Manager (iguales en cualquier idioma);
+# el backend de Linux traduce los estados de systemd a estos mismos códigos
+ESTADOS_SERVICIO = {
+    1: "Detenido",
+    2: "Iniciando",
+    3: "Deteniendo",
+    4: "En ejecución",
+    5: "Reanudando",
+    6: "Pausando",
+    7: "Pausado"
+}
+_EN_EJECUCION = 4
+
+
+# ==================== ESTADO DE SERVICIOS CRÍTICOS ====================
+def obtener_estado_servicios(servicios=None):
+    """
+    Verifica servicios críticos con una sola consulta, sin importar cuántos sean.
+
+    Args:
+        servicios: {nombre_interno: nombre_legible}; por defecto los
+                   SERVICIOS_CRITICOS del backend del sistema
+    """
+    backend = obtener_backend()
+    servicios = servicios or backend.SERVICIOS_CRITICOS
+
+    try:
+        estados = backend.leer_estados_servicios()
+    except Exception as e:
+        return [{
+            "servicio": nombre,
+            "estado": f"Error: {str(e)}",
+            "critico": True
+        } for nombre in servicios.values()]
+
+    return construir_estados(servicios, estados)
+
+
+def construir_estados(servicios, estados):
+    """Arma la lista de salida a partir de {nombre_en_minúsculas: código}"""
+    resultado = []
+    for servicio, nombre in servicios.items():
+        codigo = estados.get(servicio.lower())
+        estado = ESTADOS_SERVICIO.get(codigo, "No instalado") if codigo else "No instalado"
+        resultado.append({
+            "servicio": nombre,
+            "estado": estado,
+            "critico": codigo != _EN_EJECUCION
+        })
+    return resultado
@@ -0,0 +1,226 @@
+import cProfile
+import logging
+import os
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+try:
+    from config.config import DATA_DIR, PERFILAR_SONDAS
+except ImportError:
+    DATA_DIR = os.path.join(os.path.expanduser('~'), '.agente_monitoreo')
+    PERFILAR_SONDAS = False
+
+_log = logging.getLogger(__name__)
+
+# Límites superiores (ms) de los cubos del histograma de duración; el último cubo es "más"
+CUBOS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Perfilado local opt-in: config PERFILAR_SONDAS o variable de entorno AGENTE_PERFILAR=1
+CARPETA_PERFILES = os.path.join(DATA_DIR, 'perfiles')
+
+_hilo = threading.local()
+
+
+# ==================== CONTADORES DEL HILO ACTUAL ====================
+def contar_hijo(bytes_salida=0):
+    """
+    Anota un proceso hijo (o un pedido al host de PowerShell) y los bytes de
+    su salida en la medición en curso del hilo actual; sin medición, no hace nada.
+    """
+    medicion = getattr(_hilo, 'medicion', None)
+    if medicion is not None:
+        medicion['hijos'] += 1
+        medicion['bytes'] += bytes_salida
+
+
+def contar_bytes(cantidad):
+    """Anota bytes leídos/parseados en la medición en curso del hilo actual"""
+    medicion = getattr(_hilo, 'medicion', None)
+    if medicion is not None:
+        medicion['bytes'] += cantidad
+
+
+# ==================== PERFILADO ====================
+# Desde Python 3.12 cProfile usa sys.monitoring y solo admite un perfilador
+# activo por proceso: las sondas corren en paralelo, así que se perfila una a
+# la vez y las demás se miden sin perfil
+_PERFILANDO = threading.Lock()
+
+
+def _iniciar_perfil():
+    """Perfil activo para el hilo actual, o None si ya hay otro en curso"""
+    if not _PERFILANDO.acquire(blocking=False):
+        return None
+    perfil = cProfile.Profile()
+    try:
+        perfil.enable()
+    except ValueError:
+        # Otra herramienta de perfilado (un depurador, otro cProfile) ya está activa
+        _PERFILANDO.release()
+        return None
+    return perfil
+
+
+# ==================== HISTOGRAMA ====================
+class Histograma:
+    """Histograma de cubos fijos (memoria constante por sonda)"""
+
+    def __init__(self, cubos=CUBOS_MS):
+        self._cubos = cubos
+        self._conteos = array('I', bytes(4 * (len(cubos) + 1)))
+        self.total = 0
+        self.maximo = 0.0
+
+    def agregar(self, valor):
+        for i, limite in enumerate(self._cubos):
+            if valor <= limite:
+                break
+        else:
+            i = len(self._cubos)
+        self._conteos[i] += 1
+        self.total += 1
+        self.maximo = max(self.maximo, valor)
+
+    def percentil(self, p):
+        """
+        Límite superior del cubo que contiene el percentil p (0-100), acotado
+        al máximo observado: ningún percentil supera a max_ms.
+        """
+        if not self.total:
+            return 0
+        objetivo = p / 100 * self.total
+        acumulado = 0
+        for i, conteo in enumerate(self._conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                return min(self._cubos[i], round(self.maximo)) if i < len(self._cubos) else round(self.maximo)
+        return round(self.maximo)
+
+
+# ==================== TELEMETRÍA ====================
+class Telemetria:
+    """
+    Mide cada sonda y cada etapa del ciclo: tiempo de pared, CPU del hilo
+    (sin contar la de los procesos hijos), procesos hijos lanzados, bytes
+    parseados y estado (ok, error, timeout, en_curso). Guarda histogramas
+    acumulados en memoria y un resumen compacto para telemetria_agente.
+    """
+
+    def __init__(self, perfilar=None, carpeta_perfiles=None):
+        if perfilar is None:
+            perfilar = PERFILAR_SONDAS or os.environ.get('AGENTE_PERFILAR') == '1'
+        self._perfilar = perfilar
+        self._carpeta_perfiles = carpeta_perfiles
+        self._metricas = {}
+        self._lock = threading.Lock()
+
+    def _metrica(self, clave):
+        metrica = self._metricas.get(clave)
+        if metrica is None:
+            metrica = self._metricas[clave] = {
+                'duracion': Histograma(),
+                'ejecuciones': 0,
+                'cpu_ms': 0.0,
+                'hijos': 0,
+                'bytes': 0,
+                'errores': 0,
+                'timeouts': 0,
+                'en_curso': 0,
+                'ultima_ms': 0
+            }
+        return metrica
+
+    @contextmanager
+    def medir(self, clave):
+        """Mide el bloque; las excepciones se cuentan como error y se propagan"""
+        anterior = getattr(_hilo, 'medicion', None)
+        medicion = _hilo.medicion = {'hijos': 0, 'bytes': 0}
+        perfil = None
+        estado = 'ok'
+        inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+        try:
+            if self._perfilar:
+                perfil = _iniciar_perfil()
+            yield medicion
+        except Exception:
+            estado = 'error'
+            raise
+        finally:
+            if perfil is not None:
+                perfil.disable()
+                _PERFILANDO.release()
+                self._guardar_perfil(clave, perfil)
+            _hilo.medicion = anterior
+            self.registrar(clave, (time.perf_counter() - inicio) * 1000,
+                           (time.thread_time() - inicio_cpu) * 1000,
+                           medicion['hijos'], medicion['bytes'], estado)
+
+    def registrar(self, clave, pared_ms, cpu_ms=0.0, hijos=0, bytes_parseados=0, estado='ok'):
+        """Acumula una medición y la deja en el registro como línea JSON con sus tiempos"""
+        _log.info(f"{clave}: {pared_ms:.1f} ms ({estado})", extra={'datos': {
+            'medicion': clave,
+            'ms': round(pared_ms, 1),
+            'cpu_ms': round(cpu_ms, 1),
+            'hijos': hijos,
+            'bytes': bytes_parseados,
+            'estado': estado
+        }})
+        with self._lock:
+            metrica = self._metrica(clave)
+            metrica['duracion'].agregar(pared_ms)
+            metrica['ejecuciones'] += 1
+            metrica['cpu_ms'] += cpu_ms
+            metrica['hijos'] += hijos
+            metrica['bytes'] += bytes_parseados
+            metrica['ultima_ms'] = round(pared_ms)
+            if estado == 'error':
+                metrica['errores'] += 1
+
+    def anotar(self, clave, estado):
+        """Estado observado desde fuera de la sonda (timeout o en_curso)"""
+        with self._lock:
+            metrica = self._metrica(clave)
+            if estado == 'timeout':
+                metrica['timeouts'] += 1
+            elif estado == 'en_curso':
+                metrica['en_curso'] += 1
+            elif estado == 'error':
+                metrica['errores'] += 1
+
+    def _guardar_perfil(self, clave, perfil):
+        carpeta = CARPETA_PERFILES if self._carpeta_perfiles is None else self._carpeta_perfiles
+        try:
+            os.makedirs(carpeta, exist_ok=True)
+            perfil.dump_stats(os.path.join(carpeta, f"{clave}.prof"))
+        except Exception as e:
+            _log.warning(f"No se pudo guardar el perfil de {clave}: {e}")
+
+    def resumen(self):
+        """
+        {clave: {n, p50_ms, p95_ms, max_ms, ultima_ms, cpu_ms, hijos, kb, errores, timeouts, en_curso}}
+        con promedios por ejecución (valores redondeados para no generar escrituras por ruido)
+        """
+        with self._lock:
+            resultado = {}
+            for clave, m in self._metricas.items():
+                n = max(1, m['ejecuciones'])
+                resultado[clave] = {
+                    'n': m['ejecuciones'],
+                    'p50_ms': m['duracion'].percentil(50),
+                    'p95_ms': m['duracion'].percentil(95),
+                    'max_ms': round(m['duracion'].maximo),
+                    'ultima_ms': m['ultima_ms'],
+                    'cpu_ms': round(m['cpu_ms'] / n),
+                    'hijos': round(m['hijos'] / n, 1),
+                    'kb': round(m['bytes'] / n / 1024, 1),
+                    'errores': m['errores'],
+                    'timeouts': m['timeouts'],
+                    'en_curso': m['en_curso']
+                }
+            return resultado
+
+
+# Instancia compartida por recolector, hosts de PowerShell y bucle del servicio
+TELEMETRIA = Telemetria()
@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import deque
+
+# Enumeración completa de respaldo (por si se pierde algún aviso)
+RECONCILIAR_SEGUNDOS = 1800
+
+# Eventos de conexión/desconexión recordados para subir
+MAX_EVENTOS = 50
+
+CONECTADO = 'conectado'
+DESCONECTADO = 'desconectado'
+
+
+def diferencias(anteriores, actuales):
+    """
+    Ids que aparecieron y desaparecieron entre dos conjuntos de dispositivos.
+
+    Returns:
+        (conectados, desconectados) como listas ordenadas
+    """
+    return sorted(actuales.keys() - anteriores.keys()), sorted(anteriores.keys() - actuales.keys())
+
+
+class VigilanteUSB:
+    """
+    Conjunto vivo de dispositivos USB mantenido con avisos de llegada y retiro
+    (trabajo proporcional a los cambios), con una enumeración completa barata
+    cada RECONCILIAR_SEGUNDOS como respaldo. Cada cambio genera un evento
+    fechado de conexión o desconexión.
+
+    Args:
+        enumerar: Callable() -> {id_instancia: entrada PnP} (inyectable)
+        describir: Callable(ids) -> {id_instancia: entrada PnP} de los ids
+                   indicados que sigan presentes (inyectable)
+        reloj: Callable que devuelve segundos monotónicos (inyectable)
+        fecha: Callable que devuelve la fecha de un evento (inyectable)
+    """
+
+    def __init__(self, enumerar, describir, reconciliar_cada=RECONCILIAR_SEGUNDOS,
+                 max_eventos=MAX_EVENTOS, reloj=time.monotonic,
+                 fecha=lambda: time.strftime('%Y-%m-%d %H:%M:%S')):
+        self._enumerar = enumerar
+        self._describir = describir
+        self._reconciliar_cada = reconciliar_cada
+        self._reloj = reloj
+        self._fecha = fecha
+        self._dispositivos = None
+        self._reconciliado_en = None
+        self._avisos = []
+        self._eventos = deque(maxlen=max_eventos)
+        self._lock = threading.Lock()           # avisos (hilo de la escucha)
+        self._lock_estado = threading.Lock()    # conjunto y eventos (sondas en paralelo)
+        self.estadisticas = {'avisos': 0, 'reconciliaciones': 0, 'eventos': 0}
+
+    # ---------- Entrada de avisos ----------
+    def aviso(self, tipo, id_instancia):
+        """
+        Registra un aviso de llegada (CONECTADO) o retiro (DESCONECTADO). Se
+        llama desde el hilo de la escucha: solo se anota, la consulta del
+        dispositivo se hace al actualizar.
+        """
+        if not id_instancia or 'USB' not in id_instancia.upper():
+            return
+        with self._lock:
+            self._avisos.append((tipo, id_instancia.upper(), self._fecha()))
+            self.estadisticas['avisos'] += 1
+
+    # ---------- Procesamiento ----------
+    def _registrar(self, tipo, id_instancia, entrada, fecha):
+        self._eventos.append({
+            'tipo': tipo,
+            'id': id_instancia,
+            'nombre': (entrada or {}).get('FriendlyName') or id_instancia,
+            'clase': (entrada or {}).get('Class') or 'Otro',
+            'fecha': fecha
+        })
+        self.estadisticas['eventos'] += 1
+
+    def _aplicar_avisos(self):
+        with self._lock:
+            avisos, self._avisos = self._avisos, []
+        if not avisos:
+            return
+
+        # Un solo describir() para todas las llegadas pendientes
+        llegadas = {i for tipo, i, _ in avisos if tipo == CONECTADO and i not in self._dispositivos}
+        descritos = self._describir(sorted(llegadas)) if llegadas else {}
+        descritos = {i.upper(): entrada for i, entrada in descritos.items()}
+
+        for tipo, id_instancia, fecha in avisos:
+            if tipo == CONECTADO:
+                entrada = descritos.get(id_instancia)
+                if entrada is not None and id_instancia not in self._dispositivos:
+                    self._dispositivos[id_instancia] = entrada
+                    self._registrar(CONECTADO, id_instancia, entrada, fecha)
+            elif id_instancia in self._dispositivos:
+                entrada = self._dispositivos.pop(id_instancia)
+                self._registrar(DESCONECTADO, id_instancia, entrada, fecha)
+
+    def reconciliar(self):
+        """
+        Enumeración completa; los cambios que los avisos no vieron generan eventos.
+        Se llama con _lock_estado tomado (desde actualizar).
+        """
+        actuales = {i.upper(): entrada for i, entrada in self._enumerar().items()}
+        self._reconciliado_en = self._reloj()
+        self.estadisticas['reconciliaciones'] += 1
+        if self._dispositivos is None:
+            # Primera enumeración: es la línea base, no una ola de conexiones
+            self._dispositivos = actuales
+            return
+        conectados, desconectados = diferencias(self._dispositivos, actuales)
+        fecha = self._fecha()
+        for id_instancia in conectados:
+            self._registrar(CONECTADO, id_instancia, actuales[id_instancia], fecha)
+        for id_instancia in desconectados:
+            self._registrar(DESCONECTADO, id_instancia, self._dispositivos[id_instancia], fecha)
+        self._dispositivos = actuales
+
+    def actualizar(self):
+        """Aplica los avisos pendientes y reconcilia si toca"""
+        with self._lock_estado:
+            self._actualizar()
+
+    def _actualizar(self):
+        if self._dispositivos is None:
+            with self._lock:
+                # Los avisos previos a la línea base ya quedan reflejados en ella
+                self._avisos = []
+            self.reconciliar()
+            return
+        self._aplicar_avisos()
+        if self._reloj() - self._reconciliado_en >= self._reconciliar_cada:
+            self.reconciliar()
+
+    # ---------- Consulta ----------
+    def entradas(self):
+        """Entradas PnP de los dispositivos presentes (tras actualizar)"""
+        with self._lock_estado:
+            self._actualizar()
+            return list(self._dispositivos.values())
+
+    def eventos(self):
+        """Últimos eventos de conexión/desconexión, del más antiguo al más reciente (tras actualizar)"""
+        with self._lock_estado:
+            self._actualizar()
+            return list(self._eventos)
+
+
+# ==================== SIMULACIÓN ====================
+if __name__ == "__main__":
+    import pprint
+
+    # Fuente de eventos simulada: corre en cualquier sistema
+    presentes = {
+        'USB\\VID_046D&PID_C52B\\1': {'FriendlyName': 'Logitech Unifying', 'Class': 'HIDClass'},
+        'USB\\VID_0781&PID_5567\\2': {'FriendlyName': 'SanDisk Cruzer', 'Class': 'DiskDrive'},
+    }
+    t = [0.0]
+    vigilante = VigilanteUSB(
+        enumerar=lambda: dict(presentes),
+        describir=lambda ids: {i: presentes[i] for i in ids if i in presentes},
+        reconciliar_cada=60,
+        reloj=lambda: t[0],
+        fecha=lambda: f"t+{t[0]:.0f}s"
+    )
+    vigilante.actualizar()
+
+    t[0] = 5
+    presentes['USB\\VID_046D&PID_085E\\3'] = {'FriendlyName': 'Logitech BRIO', 'Class': 'Image'}
+    vigilante.aviso(CONECTADO, 'USB\\VID_046D&PID_085E\\3')
+    vigilante.aviso(CONECTADO, 'USB\\VID_046D&PID_085E\\3')     # aviso repetido (otra interfaz)
+    t[0] = 10
+    del presentes['USB\\VID_0781&PID_5567\\2']
+    vigilante.aviso(DESCONECTADO, 'USB\\VID_0781&PID_5567\\2')
+    vigilante.actualizar()
+
+    t[0] = 70
+    del presentes['USB\\VID_046D&PID_C52B\\1']                  # retiro sin aviso
+    vigilante.actualizar()
+
+    pprint.pprint(vigilante.eventos())
+    pprint.pprint(vigilante.estadisticas)
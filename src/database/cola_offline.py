@@ -0,0 +1,387 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+_log = logging.getLogger(__name__)
+
+# Límites de la cola (un equipo offline no debe llenar el disco)
+MAX_PENDIENTES = 500
+MAX_EDAD_SEGUNDOS = 7 * 24 * 3600
+
+# Reintentos del drenado en segundo plano
+ESPERA_INICIAL = 15
+ESPERA_MAXIMA = 1800
+MAX_LOTE = 20
+
+_MARCA = '__centinela__'
+
+
+class ColaOffline:
+    """
+    Cola persistente (SQLite) de escrituras pendientes hacia Firestore.
+
+    Las escrituras se fusionan por documento (ver fusionar_escrituras), así
+    que la cola nunca guarda más de una entrada por documento.
+
+    Las confirmaciones de cada escritura (p. ej. avanzar la base del delta) se
+    ejecutan cuando drenar() la envía con éxito. Viven solo en memoria: tras un
+    reinicio la base del delta arranca vacía y no hay nada que avanzar.
+
+    Args:
+        ruta: Archivo SQLite (':memory:' para pruebas)
+        centinelas: {nombre: objeto} para valores no serializables,
+                    por ejemplo {'SERVER_TIMESTAMP': firestore.SERVER_TIMESTAMP}
+    """
+
+    def __init__(self, ruta, centinelas=None, max_pendientes=MAX_PENDIENTES,
+                 max_edad=MAX_EDAD_SEGUNDOS):
+        if ruta != ':memory:':
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._centinelas = centinelas or {}
+        self._max_pendientes = max_pendientes
+        self._max_edad = max_edad
+        # {(coleccion, documento): [callables]} en orden de encolado
+        self._confirmaciones = {}
+        with self._lock:
+            self._conexion.execute("""
+                CREATE TABLE IF NOT EXISTS pendientes (
+                    coleccion TEXT NOT NULL,
+                    documento TEXT NOT NULL,
+                    tipo TEXT NOT NULL,
+                    datos TEXT NOT NULL,
+                    creado REAL NOT NULL,
+                    actualizado REAL NOT NULL,
+                    PRIMARY KEY (coleccion, documento)
+                )
+            """)
+            self._conexion.commit()
+
+    # ---------- Serialización ----------
+    def _serializar(self, datos):
+        inverso = {id(obj): nombre for nombre, obj in self._centinelas.items()}
+
+        def convertir(valor):
+            if id(valor) in inverso:
+                return {_MARCA: inverso[id(valor)]}
+            return str(valor)
+
+        return json.dumps(datos, default=convertir, ensure_ascii=False)
+
+    def _deserializar(self, texto):
+        def convertir(obj):
+            if len(obj) == 1 and _MARCA in obj:
+                return self._centinelas.get(obj[_MARCA])
+            return obj
+
+        return json.loads(texto, object_hook=convertir)
+
+    # ---------- Operaciones ----------
+    def encolar(self, coleccion, documento, tipo, datos, ahora=None, confirmaciones=()):
+        """
+        Guarda una escritura ('set', 'update' o 'merge') fusionándola con la pendiente
+
+        Args:
+            confirmaciones: Callables a invocar cuando drenar() la envíe con éxito
+        """
+        ahora = time.time() if ahora is None else ahora
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT tipo, datos, creado FROM pendientes WHERE coleccion = ? AND documento = ?",
+                (coleccion, documento)
+            ).fetchone()
+
+            creado = ahora
+            if fila is not None:
+                tipo_previo, datos_previos, creado = fila
+                tipo, datos = fusionar_escrituras(
+                    tipo_previo, self._deserializar(datos_previos), tipo, datos
+                )
+
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO pendientes VALUES (?, ?, ?, ?, ?, ?)",
+                (coleccion, documento, tipo, self._serializar(datos), creado, ahora)
+            )
+            if confirmaciones:
+                self._confirmaciones.setdefault((coleccion, documento), []).extend(confirmaciones)
+            self._aplicar_limites(ahora)
+            self._conexion.commit()
+
+    def _aplicar_limites(self, ahora):
+        # Por antigüedad de la primera escritura: las fusiones posteriores no la renuevan
+        self._conexion.execute(
+            "DELETE FROM pendientes WHERE creado < ?", (ahora - self._max_edad,)
+        )
+        self._conexion.execute("""
+            DELETE FROM pendientes WHERE rowid NOT IN (
+                SELECT rowid FROM pendientes ORDER BY actualizado DESC LIMIT ?
+            )
+        """, (self._max_pendientes,))
+        if self._confirmaciones:
+            # Lo descartado por los límites nunca se escribirá: sus confirmaciones tampoco
+            vigentes = set(self._conexion.execute("SELECT coleccion, documento FROM pendientes"))
+            for clave in [c for c in self._confirmaciones if c not in vigentes]:
+                del self._confirmaciones[clave]
+
+    def pendientes(self, coleccion=None, documento=None):
+        with self._lock:
+            if documento is None:
+                return self._conexion.execute("SELECT COUNT(*) FROM pendientes").fetchone()[0]
+            return self._conexion.execute(
+                "SELECT COUNT(*) FROM pendientes WHERE coleccion = ? AND documento = ?",
+                (coleccion, documento)
+            ).fetchone()[0]
+
+    def drenar(self, escribir_lote, max_lote=MAX_LOTE):
+        """
+        Envía hasta max_lote entradas (las más antiguas) con escribir_lote(entradas)
+        y las borra si la escritura tuvo éxito o si Firestore las rechazó de forma
+        permanente (ver escribir_aislando). Los errores transitorios se propagan.
+        Las confirmaciones se ejecutan solo para lo que Firestore aceptó.
+
+        Returns:
+            Cantidad de entradas enviadas
+        """
+        with self._lock:
+            self._aplicar_limites(time.time())
+            filas = self._conexion.execute(
+                "SELECT coleccion, documento, tipo, datos, actualizado FROM pendientes "
+                "ORDER BY creado LIMIT ?", (max_lote,)
+            ).fetchall()
+            if not filas:
+                return 0
+            # Las confirmaciones de lo que se encole durante el envío quedan para el próximo
+            confirmaciones = {(c, d): self._confirmaciones.pop((c, d), []) for c, d, _, _, _ in filas}
+
+        try:
+            rechazadas = escribir_aislando(
+                escribir_lote, [(c, d, t, self._deserializar(datos)) for c, d, t, datos, _ in filas]
+            )
+        except Exception:
+            with self._lock:
+                for clave, previas in confirmaciones.items():
+                    if previas:
+                        self._confirmaciones[clave] = previas + self._confirmaciones.get(clave, [])
+            raise
+        for (coleccion, documento, tipo, _), error in rechazadas:
+            _log.warning(f"Cola offline: escritura descartada ({coleccion}/{documento}, {tipo}): {error}")
+            confirmaciones.pop((coleccion, documento), None)
+
+        with self._lock:
+            # Solo se borra lo enviado: si se encoló algo nuevo mientras tanto, queda
+            self._conexion.executemany(
+                "DELETE FROM pendientes WHERE coleccion = ? AND documento = ? AND actualizado = ?",
+                [(c, d, actualizado) for c, d, _, _, actualizado in filas]
+            )
+            self._conexion.commit()
+
+        for (coleccion, documento), pendientes in confirmaciones.items():
+            for confirmar in pendientes:
+                try:
+                    confirmar()
+                except Exception as e:
+                    _log.warning(f"Cola offline: error confirmando {coleccion}/{documento}: {e}")
+        return len(filas)
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+
+# ==================== FUSIÓN DE ESCRITURAS ====================
+# Tipos: 'set' (reemplaza el documento), 'update' (rutas de campo 'a.b.c',
+# el documento debe existir) y 'merge' (set con merge=True, anidado).
+def fusionar_escrituras(tipo_previo, previo, tipo, nuevo):
+    """Combina dos escrituras al mismo documento en una sola equivalente"""
+    if tipo == 'set':
+        return 'set', nuevo
+    if tipo == 'update':
+        if tipo_previo == 'update':
+            return 'update', fusionar_updates(previo, nuevo)
+        return tipo_previo, aplicar_update(previo, nuevo)
+    # tipo == 'merge'
+    if tipo_previo == 'update':
+        previo = aplicar_update({}, previo)
+        tipo_previo = 'merge'
+    return tipo_previo, mezclar(previo, nuevo)
+
+
+def mezclar(base, nuevo):
+    """Mezcla profunda de diccionarios (semántica de set con merge=True)"""
+    resultado = _copiar(base)
+    for clave, valor in nuevo.items():
+        if isinstance(valor, dict) and isinstance(resultado.get(clave), dict):
+            resultado[clave] = mezclar(resultado[clave], valor)
+        else:
+            resultado[clave] = valor
+    return resultado
+
+
+def aplicar_update(documento, update):
+    """Aplica un update con rutas de campo ('a.b.c') sobre un documento completo"""
+    resultado = _copiar(documento)
+    for ruta, valor in update.items():
+        destino = resultado
+        partes = ruta.split('.')
+        for parte in partes[:-1]:
+            if not isinstance(destino.get(parte), dict):
+                destino[parte] = {}
+            destino = destino[parte]
+        destino[partes[-1]] = valor
+    return resultado
+
+
+def fusionar_updates(previo, nuevo):
+    """Combina dos updates: lo nuevo gana, incluidas rutas más cortas que pisan a las largas"""
+    resultado = {}
+    for ruta, valor in previo.items():
+        # 'red' en el nuevo pisa 'red.trafico.x' del previo
+        if any(ruta == r or ruta.startswith(r + '.') for r in nuevo):
+            continue
+        resultado[ruta] = valor
+    for ruta, valor in nuevo.items():
+        # 'red.trafico.x' en el nuevo se aplica dentro de 'red' del previo
+        base = next((r for r in resultado if ruta.startswith(r + '.')), None)
+        if base is not None and isinstance(resultado[base], dict):
+            resultado[base] = aplicar_update(resultado[base], {ruta[len(base) + 1:]: valor})
+        else:
+            resultado[ruta] = valor
+    return resultado
+
+
+def _copiar(valor):
+    if isinstance(valor, dict):
+        return {k: _copiar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_copiar(v) for v in valor]
+    return valor
+
+
+# ==================== CLASIFICACIÓN DE ERRORES ====================
+# Errores de Firestore que justifican reintentar. Se reconocen por nombre de
+# clase (google.api_core.exceptions, google.auth.exceptions) para no importar
+# google al cargar este módulo; los de red (OSError) también son transitorios.
+_ERRORES_TRANSITORIOS = {
+    'ServiceUnavailable', 'DeadlineExceeded', 'TooManyRequests', 'ResourceExhausted',
+    'Aborted', 'InternalServerError', 'GatewayTimeout', 'RetryError', 'TransportError'
+}
+
+
+def _nombres_de_clase(error):
+    return {clase.__name__ for clase in type(error).__mro__}
+
+
+def es_error_transitorio(error):
+    """True si reintentar puede funcionar (sin conexión, tiempo agotado, sobrecarga)"""
+    if isinstance(error, OSError):
+        return True
+    return bool(_nombres_de_clase(error) & _ERRORES_TRANSITORIOS)
+
+
+def escribir_aislando(escribir_lote, entradas):
+    """
+    Escribe un lote. Un WriteBatch falla entero, así que si Firestore lo rechaza
+    por un error permanente (NotFound, InvalidArgument, PermissionDenied...) se
+    reintenta entrada por entrada para no arrastrar a los demás documentos. Un
+    'update' sobre un documento borrado se reenvía como 'merge', que lo recrea.
+
+    Returns:
+        [(entrada, error)] rechazadas de forma permanente (no deben reintentarse)
+
+    Raises:
+        El error transitorio, si lo hubo: el lote completo sigue pendiente
+    """
+    try:
+        escribir_lote(entradas)
+        return []
+    except Exception as e:
+        if es_error_transitorio(e):
+            raise
+        error = e
+
+    if len(entradas) > 1:
+        rechazadas = []
+        for entrada in entradas:
+            rechazadas += escribir_aislando(escribir_lote, [entrada])
+        return rechazadas
+
+    entrada = entradas[0]
+    coleccion, documento, tipo, datos = entrada
+    if tipo == 'update' and 'NotFound' in _nombres_de_clase(error):
+        recreada = (coleccion, documento, 'merge', aplicar_update({}, datos))
+        return [(entrada, e) for _, e in escribir_aislando(escribir_lote, [recreada])]
+    return [(entrada, error)]
+
+
+def escribir_lote_firestore(db, entradas):
+    """Escribe entradas (coleccion, documento, tipo, datos) en un único WriteBatch"""
+    lote = db.batch()
+    for coleccion, documento, tipo, datos in entradas:
+        ref = db.collection(coleccion).document(documento)
+        if tipo == 'set':
+            lote.set(ref, datos)
+        elif tipo == 'merge':
+            lote.set(ref, datos, merge=True)
+        else:
+            lote.update(ref, datos)
+    lote.commit()
+
+
+# ==================== DRENADO EN SEGUNDO PLANO ====================
+class DrenadorCola:
+    """Hilo que vacía la cola con backoff exponencial mientras no haya conexión"""
+
+    def __init__(self, cola, escribir_lote, log=None, espera_inicial=ESPERA_INICIAL,
+                 espera_maxima=ESPERA_MAXIMA):
+        self._cola = cola
+        self._escribir_lote = escribir_lote
+        self._log = log or _log.info
+        self._espera_inicial = espera_inicial
+        self._espera_maxima = espera_maxima
+        self._espera = espera_inicial
+        self._evento = threading.Event()
+        self._detenido = False
+        self._hilo = None
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name="drenador-cola", daemon=True)
+            self._hilo.start()
+
+    def despertar(self):
+        """Intentar ya (por ejemplo, al volver la conexión)"""
+        self._espera = self._espera_inicial
+        self._evento.set()
+
+    def detener(self):
+        self._detenido = True
+        self._evento.set()
+
+    def drenar_una_vez(self):
+        """Drena hasta vaciar la cola. Devuelve True si quedó vacía."""
+        while True:
+            enviadas = self._cola.drenar(self._escribir_lote)
+            if enviadas == 0:
+                return True
+            self._log(f"Cola offline: {enviadas} escrituras enviadas")
+
+    def _bucle(self):
+        while not self._detenido:
+            self._evento.wait(self._espera)
+            self._evento.clear()
+            if self._detenido:
+                break
+            if not self._cola.pendientes():
+                self._espera = self._espera_inicial
+                continue
+            try:
+                self.drenar_una_vez()
+                self._espera = self._espera_inicial
+            except Exception as e:
+                # drenar() ya descarta lo rechazado de forma permanente: lo que llega aquí se reintenta
+                self._espera = min(self._espera * 2, self._espera_maxima)
+                self._log(f"Cola offline sin conexión, reintento en {self._espera}s: {e}")
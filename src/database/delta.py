@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+
+# Bandas muertas: cambios menores a este valor no justifican una escritura.
+# Las rutas usan '.' para diccionarios y '[]' para cualquier elemento de lista.
+BANDAS_MUERTAS = {
+    'cpu_uso_porcentaje': 5.0,
+    'ram_uso_porcentaje': 2.0,
+    'red.trafico.bytes_enviados_mb': 50.0,
+    'red.trafico.bytes_recibidos_mb': 50.0,
+    'red.trafico.paquetes_enviados': 50000,
+    'red.trafico.paquetes_recibidos': 50000,
+    'discos[].usado_gb': 0.5,
+    'discos[].libre_gb': 0.5,
+    'discos[].porcentaje_usado': 1.0,
+    'aplicaciones_activas[].ram_mb': 50.0,
+    'aplicaciones_activas[].cpu_porcentaje': 5.0,
+}
+
+# Bandas para acelerar la sonda dueña de la ruta (ver planificador): un cambio
+# que se escribe no basta, tiene que superar también esta banda. Los contadores
+# acumulados avanzan en cada sincronización; solo una ráfaga cuenta como cambio.
+BANDAS_ACELERACION = {
+    **BANDAS_MUERTAS,
+    'red.trafico.bytes_enviados_mb': 500.0,
+    'red.trafico.bytes_recibidos_mb': 500.0,
+    'red.trafico.paquetes_enviados': 500000,
+    'red.trafico.paquetes_recibidos': 500000,
+    'red.trafico.errores_entrada': 100,
+    'red.trafico.errores_salida': 100,
+}
+
+# Mapas cuyo contenido se controla completo: si una clave desaparece (p. ej. una
+# huella de error desalojada), el mapa entero se reescribe en lugar de dejarla huérfana
+MAPAS_COMPLETOS = ('errores_huellas',)
+
+# Aunque no cambie nada, se escribe al menos cada tanto para refrescar ultima_sincronizacion
+LATIDO_MAXIMO = 1800
+
+
+def aplanar(datos, prefijo=''):
+    """
+    Convierte diccionarios anidados en rutas de campo de Firestore:
+    {'red': {'trafico': {'x': 1}}} → {'red.trafico.x': 1}.
+    Las listas son hojas (Firestore no admite rutas dentro de arrays).
+    """
+    plano = {}
+    for clave, valor in datos.items():
+        ruta = f"{prefijo}{clave}"
+        if isinstance(valor, dict) and valor:
+            plano.update(aplanar(valor, ruta + '.'))
+        else:
+            plano[ruta] = valor
+    return plano
+
+
+def _es_numero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def iguales(anterior, actual, ruta, bandas=BANDAS_MUERTAS):
+    """Compara dos valores aplicando las bandas muertas por ruta"""
+    if _es_numero(anterior) and _es_numero(actual):
+        return abs(actual - anterior) < bandas.get(ruta, 0) or actual == anterior
+    if isinstance(anterior, list) and isinstance(actual, list):
+        if len(anterior) != len(actual):
+            return False
+        return all(iguales(a, b, ruta + '[]', bandas) for a, b in zip(anterior, actual))
+    if isinstance(anterior, dict) and isinstance(actual, dict):
+        if anterior.keys() != actual.keys():
+            return False
+        return all(iguales(anterior[k], actual[k], f"{ruta}.{k}", bandas) for k in actual)
+    return anterior == actual
+
+
+def _tamano(datos):
+    return len(json.dumps(datos, default=str, ensure_ascii=False).encode('utf-8'))
+
+
+class CalculadorDelta:
+    """
+    Recuerda el último documento confirmado por Firestore y calcula el delta
+    mínimo (por ruta de campo) para cada sincronización.
+    """
+
+    def __init__(self, bandas=None, latido_maximo=LATIDO_MAXIMO, mapas_completos=MAPAS_COMPLETOS,
+                 bandas_aceleracion=None):
+        self._bandas = BANDAS_MUERTAS if bandas is None else bandas
+        self._bandas_aceleracion = BANDAS_ACELERACION if bandas_aceleracion is None else bandas_aceleracion
+        self._mapas_completos = mapas_completos
+        self._latido_maximo = latido_maximo
+        self._confirmados = {}
+        self._ultima_escritura = {}
+        # confirmar() llega desde el hilo del escritor por lotes
+        self._lock = threading.Lock()
+        self.estadisticas = {
+            'syncs': 0,
+            'syncs_omitidas': 0,
+            'campos_ahorrados': 0,
+            'bytes_ahorrados': 0
+        }
+
+    def conocido(self, document_id):
+        return document_id in self._confirmados
+
+    def calcular(self, document_id, datos):
+        """
+        Returns:
+            (delta, reporte): delta es {ruta: valor} listo para .update();
+            reporte indica campos y bytes ahorrados en esta sincronización.
+        """
+        plano = aplanar(datos)
+        with self._lock:
+            confirmado = dict(self._confirmados.get(document_id, {}))
+        delta = {
+            ruta: valor for ruta, valor in plano.items()
+            if ruta not in confirmado or not iguales(confirmado[ruta], valor, ruta, self._bandas)
+        }
+
+        for mapa in self._mapas_completos:
+            if not isinstance(datos.get(mapa), dict):
+                continue
+            prefijo = mapa + '.'
+            previas = {ruta[len(prefijo):].split('.', 1)[0] for ruta in confirmado if ruta.startswith(prefijo)}
+            if previas - datos[mapa].keys():
+                # Un update con el mapa entero reemplaza el campo y borra las claves viejas
+                delta = {r: v for r, v in delta.items() if not r.startswith(prefijo)}
+                delta[mapa] = datos[mapa]
+
+        reporte = {
+            'campos_enviados': len(delta),
+            'campos_ahorrados': len(plano) - len(delta),
+            'bytes_ahorrados': _tamano(datos) - _tamano(delta) if delta else _tamano(datos)
+        }
+        self.estadisticas['syncs'] += 1
+        self.estadisticas['campos_ahorrados'] += reporte['campos_ahorrados']
+        self.estadisticas['bytes_ahorrados'] += reporte['bytes_ahorrados']
+        return delta, reporte
+
+    def cambios_significativos(self, document_id, delta):
+        """
+        Campos de primer nivel del delta cuyo cambio supera BANDAS_ACELERACION
+        respecto del último estado confirmado (una ruta nueva siempre cuenta).
+        """
+        with self._lock:
+            confirmado = self._confirmados.get(document_id, {})
+            return {
+                ruta.split('.', 1)[0] for ruta, valor in delta.items()
+                if ruta not in confirmado or not iguales(confirmado[ruta], valor, ruta, self._bandas_aceleracion)
+            }
+
+    def requiere_latido(self, document_id, ahora=None):
+        ahora = time.time() if ahora is None else ahora
+        return ahora - self._ultima_escritura.get(document_id, 0) >= self._latido_maximo
+
+    def confirmar(self, document_id, delta, ahora=None):
+        """Registra un delta escrito con éxito como nuevo estado conocido"""
+        with self._lock:
+            confirmado = self._confirmados.setdefault(document_id, {})
+            for ruta, valor in delta.items():
+                if isinstance(valor, dict):
+                    # Un diccionario en un update reemplaza todo lo que colgaba de esa ruta
+                    for conocida in [r for r in confirmado if r == ruta or r.startswith(ruta + '.')]:
+                        del confirmado[conocida]
+                    confirmado.update(aplanar(valor, ruta + '.') if valor else {ruta: valor})
+                else:
+                    confirmado[ruta] = valor
+            self._ultima_escritura[document_id] = time.time() if ahora is None else ahora
+
+    def omitir(self):
+        self.estadisticas['syncs_omitidas'] += 1
+
+    def reiniciar(self, document_id, datos, ahora=None):
+        """Tras un .set() completo, el documento confirmado es exactamente 'datos'"""
+        plano = aplanar(datos)
+        with self._lock:
+            self._confirmados[document_id] = plano
+            self._ultima_escritura[document_id] = time.time() if ahora is None else ahora
@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+
+from src.database.cola_offline import escribir_aislando, fusionar_escrituras
+
+_log = logging.getLogger(__name__)
+
+# Segundos durante los que se juntan escrituras antes de enviar un lote
+VENTANA_SEGUNDOS = 2.0
+
+# Límite de operaciones por WriteBatch en Firestore
+MAX_OPERACIONES_LOTE = 500
+
+
+class EscritorLotes:
+    """
+    Junta escrituras por documento durante una ventana corta, las fusiona
+    y las envía en un WriteBatch desde un hilo propio. Quien escribe nunca
+    espera a la red.
+
+    Si un lote falla por un error transitorio, o si el documento ya tiene
+    escrituras en la cola offline (para no desordenarlas), las entradas pasan
+    a esa cola junto con sus confirmaciones, que se ejecutan al drenarla. Las
+    que Firestore rechaza de forma permanente se descartan sin confirmar
+    (ver escribir_aislando).
+
+    Args:
+        escribir_lote: Callable(entradas) con entradas (coleccion, documento, tipo, datos)
+        cola: ColaOffline opcional para los fallos
+        al_encolar: Callable opcional invocado tras encolar por pendientes previas
+    """
+
+    def __init__(self, escribir_lote, cola=None, al_encolar=None, log=None,
+                 ventana=VENTANA_SEGUNDOS):
+        self._escribir_lote = escribir_lote
+        self._cola = cola
+        self._al_encolar = al_encolar
+        self._log = log or _log.info
+        self._ventana = ventana
+        self._pendientes = {}
+        self._lock = threading.Lock()
+        self._lock_envio = threading.Lock()
+        self._evento = threading.Event()
+        self._detenido = False
+        self._hilo = None
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name="escritor-lotes", daemon=True)
+            self._hilo.start()
+
+    def escribir(self, coleccion, documento, tipo, datos, al_confirmar=None):
+        """
+        Agenda una escritura ('set', 'update' o 'merge'). No bloquea.
+
+        Args:
+            al_confirmar: Callable opcional que se invoca cuando Firestore la confirma
+        """
+        clave = (coleccion, documento)
+        with self._lock:
+            previa = self._pendientes.get(clave)
+            if previa is None:
+                self._pendientes[clave] = [tipo, datos, [al_confirmar] if al_confirmar else []]
+            else:
+                previa[0], previa[1] = fusionar_escrituras(previa[0], previa[1], tipo, datos)
+                if al_confirmar:
+                    previa[2].append(al_confirmar)
+        self._evento.set()
+
+    def vaciar(self):
+        """Envía ya todo lo pendiente (bloqueante). Para usar al detener el servicio."""
+        with self._lock_envio:
+            with self._lock:
+                pendientes, self._pendientes = self._pendientes, {}
+            if pendientes:
+                self._enviar(pendientes)
+
+    def detener(self, vaciar=True):
+        self._detenido = True
+        self._evento.set()
+        if vaciar:
+            self.vaciar()
+
+    def _bucle(self):
+        while not self._detenido:
+            self._evento.wait()
+            if self._detenido:
+                break
+            # Ventana de agrupación: lo que llegue en este lapso viaja en el mismo lote
+            self._evento.clear()
+            time.sleep(self._ventana)
+            try:
+                self.vaciar()
+            except Exception as e:
+                self._log(f"Error en escritor por lotes: {e}")
+
+    def _enviar(self, pendientes):
+        directas = []
+        for (coleccion, documento), (tipo, datos, confirmaciones) in pendientes.items():
+            if self._cola is not None and self._cola.pendientes(coleccion, documento):
+                self._cola.encolar(coleccion, documento, tipo, datos, confirmaciones=confirmaciones)
+                if self._al_encolar:
+                    self._al_encolar()
+                continue
+            directas.append(((coleccion, documento, tipo, datos), confirmaciones))
+
+        for inicio in range(0, len(directas), MAX_OPERACIONES_LOTE):
+            tramo = directas[inicio:inicio + MAX_OPERACIONES_LOTE]
+            try:
+                rechazadas = escribir_aislando(self._escribir_lote, [entrada for entrada, _ in tramo])
+            except Exception as e:
+                if self._cola is None:
+                    self._log(f"Lote descartado ({len(tramo)} escrituras): {e}")
+                    continue
+                self._log(f"Sin conexión, {len(tramo)} escrituras a la cola offline: {e}")
+                for entrada, confirmaciones in tramo:
+                    self._cola.encolar(*entrada, confirmaciones=confirmaciones)
+                continue
+
+            descartadas = {id(entrada) for entrada, _ in rechazadas}
+            for (coleccion, documento, tipo, _), error in rechazadas:
+                self._log(f"Escritura descartada ({coleccion}/{documento}, {tipo}): {error}")
+            for entrada, confirmaciones in tramo:
+                if id(entrada) in descartadas:
+                    continue
+                for confirmar in confirmaciones:
+                    try:
+                        confirmar()
+                    except Exception as e:
+                        self._log(f"Error confirmando escritura: {e}")
@@ -1,125 +1,210 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+import logging
 import os
 import platform
-import time
 import sys
+import threading
+
+from src.database.cola_offline import ColaOffline, DrenadorCola, escribir_lote_firestore
+from src.database.delta import CalculadorDelta
+from src.database.escritor import EscritorLotes
+
+# El registro lo configura el servicio (SvcDoRun, ver src/core/registro.py):
+# importar el cliente desde pruebas o herramientas no abre el archivo de log
+_log = logging.getLogger(__name__)
 
-def log_debug(mensaje):
-    try:
-        path = "C:\\agente_debug.txt" if os.path.exists("C:\\") else "agente_debug.txt"
-        with open(path, "a", encoding='utf-8') as f:
-            f.write(f"{time.ctime()}: [Firebase] {mensaje}\n")
-    except:
-        pass
+
+def log_debug(mensaje, **datos):
+    """Registra un mensaje del cliente; los argumentos con nombre van como campos estructurados"""
+    _log.info(mensaje, extra={'datos': datos} if datos else None)
 
 # Importación robusta de configuración
 try:
     import config.config as cfg
     FIREBASE_JSON_PATH = cfg.FIREBASE_JSON_PATH
     FIREBASE_COLLECTION_NAME = cfg.FIREBASE_COLLECTION_NAME
+    COLA_OFFLINE_PATH = cfg.COLA_OFFLINE_PATH
 except:
     base = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
     FIREBASE_JSON_PATH = os.path.join(base, "auth", "serviceAccountKey.json")
     FIREBASE_COLLECTION_NAME = "computadoras"
+    COLA_OFFLINE_PATH = os.path.join(os.path.expanduser('~'), '.agente_monitoreo', 'cola_offline.db')
+
+# ==================== INICIALIZACIÓN DIFERIDA ====================
+# firebase_admin (y con él grpc y google.cloud) tarda cientos de ms en
+# importarse: se carga en la primera escritura, no al importar este módulo,
+# para que el servicio pueda informar RUNNING de inmediato
+firestore = None
+db = None
+_cola = None
+_drenador = None
+_escritor = None
+_lock_inicio = threading.Lock()
+
+
+def _inicializar():
+    """Conecta con Firebase y arranca la cola offline y el escritor (una sola vez)"""
+    global firestore, db, _cola, _drenador, _escritor
+    if _escritor is not None:
+        return
+    with _lock_inicio:
+        if _escritor is not None:
+            return
+
+        import firebase_admin
+        from firebase_admin import credentials, firestore as modulo_firestore
+
+        if not firebase_admin._apps:
+            try:
+                if not os.path.exists(FIREBASE_JSON_PATH):
+                    log_debug(f"ERROR: No existe el JSON en {FIREBASE_JSON_PATH}")
+                cred = credentials.Certificate(FIREBASE_JSON_PATH)
+                firebase_admin.initialize_app(cred)
+                log_debug("Conexión establecida con Firebase")
+            except Exception as e:
+                log_debug(f"Fallo crítico de conexión: {str(e)}")
+                sys.exit(1)
+
+        firestore = modulo_firestore
+        db = firestore.client()
+
+        # Cola offline: escrituras que no pudieron enviarse; se drenan en
+        # segundo plano al volver la conexión
+        try:
+            _cola = ColaOffline(COLA_OFFLINE_PATH, centinelas={'SERVER_TIMESTAMP': firestore.SERVER_TIMESTAMP})
+            _drenador = DrenadorCola(_cola, lambda entradas: escribir_lote_firestore(db, entradas), log=log_debug)
+            _drenador.iniciar()
+        except Exception as e:
+            log_debug(f"Cola offline no disponible: {e}")
+            _cola = None
+            _drenador = None
+
+        # Escritor por lotes: las escrituras se agrupan y se envían desde un
+        # hilo propio; el muestreo no espera a la red
+        escritor = EscritorLotes(
+            lambda entradas: escribir_lote_firestore(db, entradas),
+            cola=_cola,
+            al_encolar=_drenador.despertar if _drenador else None,
+            log=log_debug
+        )
+        escritor.iniciar()
+        _escritor = escritor
+
+
+def _escribir(coleccion, document_id, tipo, datos, al_confirmar=None):
+    """Agenda una escritura ('set', 'update' o 'merge'); ver EscritorLotes"""
+    _inicializar()
+    _escritor.escribir(coleccion, document_id, tipo, datos, al_confirmar)
+
 
-# Inicialización única
-if not firebase_admin._apps:
+def vaciar_escrituras():
+    """Envía ya las escrituras agendadas (sin efecto si el cliente no se inicializó)"""
+    if _escritor is not None:
+        _escritor.vaciar()
+
+
+def detener_cliente():
+    """Envía las escrituras pendientes y detiene los hilos (al detener el servicio)"""
+    if _escritor is None:
+        return
     try:
-        if not os.path.exists(FIREBASE_JSON_PATH):
-            log_debug(f"ERROR: No existe el JSON en {FIREBASE_JSON_PATH}")
-        cred = credentials.Certificate(FIREBASE_JSON_PATH)
-        firebase_admin.initialize_app(cred)
-        log_debug("Conexión establecida con Firebase")
+        _escritor.detener(vaciar=True)
     except Exception as e:
-        log_debug(f"Fallo crítico de conexión: {str(e)}")
-        sys.exit(1)
+        log_debug(f"Error vaciando escrituras al detener: {e}")
+    if _drenador is not None:
+        _drenador.detener()
+    log_debug("Cliente de Firebase detenido")
 
-db = firestore.client()
 
 # ==================== SISTEMA DE CONTADORES ====================
 _contadores = {
-    'sincronizaciones_totales': 0,
-    'ultima_sync_completa': 0,
-    'ultima_sync_apps': 0,
-    'ultima_sync_errores': 0,
-    'ultima_sync_perifericos': 0
+    'sincronizaciones_totales': 0
+}
+
+# Campos que solo viajan en la sincronización completa
+_CAMPOS_ESTATICOS = {
+    "uuid", "hostname", "sistema_operativo", "arquitectura", "procesador",
+    "nucleos_fisicos", "ram_total_gb"
 }
 
-def enviar_datos_pc(datos, forzar_completo=False):
+# Último documento confirmado por Firestore (para enviar solo lo que cambió)
+_delta = CalculadorDelta()
+
+def _encadenar(*acciones):
+    """Callback de confirmación que ejecuta en orden las acciones dadas (omite las None)"""
+    acciones = [a for a in acciones if a is not None]
+
+    def confirmar():
+        for accion in acciones:
+            accion()
+    return confirmar
+
+
+def enviar_datos_pc(datos, forzar_completo=False, campos=None, al_confirmar=None):
     """
-    Envía datos con sistema de frecuencias diferenciadas.
+    Envía datos: la primera vez (o forzado) el documento completo; después,
+    solo los campos que cambiaron (ver delta.py). Sin cambios no se escribe.
+    
+    Args:
+        campos: Campos a considerar en una sincronización incremental (los que
+                el planificador dio por vencidos); None = todos los dinámicos
+        al_confirmar: Callable opcional a ejecutar cuando Firestore confirme la
+                      escritura (no se llama si no hubo nada que escribir)
     
-    - Datos básicos (CPU, RAM, disco): cada 5 min (siempre)
-    - Aplicaciones activas: cada 15 min
-    - Errores del sistema: cada 30 min
-    - IP pública/AnyDesk: solo en sync completa inicial
+    Returns:
+        Conjunto de campos de primer nivel que cambiaron más allá de su banda
+        de aceleración (para el planificador)
     """
     try:
         document_id = datos.get("uuid")
         if not document_id:
-            return
+            return set()
         
         _contadores['sincronizaciones_totales'] += 1
-        tiempo_actual = time.time()
+        
+        _inicializar()
         
         # Primera sincronización o forzada → COMPLETA
         if _contadores['sincronizaciones_totales'] == 1 or forzar_completo:
             datos["ultima_sincronizacion"] = firestore.SERVER_TIMESTAMP
-            db.collection(FIREBASE_COLLECTION_NAME).document(document_id).set(datos)
-            _contadores['ultima_sync_completa'] = tiempo_actual
-            _contadores['ultima_sync_apps'] = tiempo_actual
-            _contadores['ultima_sync_errores'] = tiempo_actual
+            _escribir(FIREBASE_COLLECTION_NAME, document_id, 'set', datos,
+                      al_confirmar=_encadenar(lambda: _delta.reiniciar(document_id, datos), al_confirmar))
             log_debug(f"Sincronización COMPLETA: {document_id}")
-            return
+            return set(datos)
         
-        # Sincronizaciones posteriores → INCREMENTALES
-        actualizacion = {
-            "cpu_uso_porcentaje": datos.get("cpu_uso_porcentaje"),
-            "ram_uso_porcentaje": datos.get("ram_uso_porcentaje"),
-            "discos": datos.get("discos"),
-            "red": datos.get("red"),
-            "servicios_criticos": datos.get("servicios_criticos"),
-            "ultima_sincronizacion": firestore.SERVER_TIMESTAMP
-        }
+        # Sincronizaciones posteriores → INCREMENTALES (periféricos por categoría,
+        # huellas de error por huella; ver delta.MAPAS_COMPLETOS)
+        if campos is None:
+            campos = [c for c in datos if c not in _CAMPOS_ESTATICOS]
+        actualizacion = {c: datos[c] for c in campos if c in datos and c not in _CAMPOS_ESTATICOS}
         
-        # Aplicaciones cada 15 min (900 seg)
-        if tiempo_actual - _contadores['ultima_sync_apps'] >= 900:
-            if "aplicaciones_activas" in datos:
-                actualizacion["aplicaciones_activas"] = datos["aplicaciones_activas"]
-                _contadores['ultima_sync_apps'] = tiempo_actual
-                log_debug("Actualizando aplicaciones activas")
+        # Solo rutas de campo que cambiaron más allá de su banda muerta
+        delta, reporte = _delta.calcular(document_id, actualizacion)
+        if not delta and not _delta.requiere_latido(document_id):
+            _delta.omitir()
+            log_debug(f"Sin cambios, escritura omitida: {document_id}", documento=document_id, **reporte)
+            return set()
         
-        # Errores cada 30 min (1800 seg)
-        if tiempo_actual - _contadores['ultima_sync_errores'] >= 1800:
-            if "errores_recientes" in datos:
-                actualizacion["errores_recientes"] = datos["errores_recientes"]
-                _contadores['ultima_sync_errores'] = tiempo_actual
-                log_debug("Actualizando errores del sistema")
-            if "perifericos" in datos:
-                actualizacion["perifericos"] = datos["perifericos"]
-                _contadores['ultima_sync_perifericos'] = tiempo_actual
-                log_debug("Actualizando periféricos")
-                
-        db.collection(FIREBASE_COLLECTION_NAME).document(document_id).update(actualizacion)
-        log_debug(f"Sincronización incremental: {document_id}")
+        escritura = dict(delta)
+        escritura["ultima_sincronizacion"] = firestore.SERVER_TIMESTAMP
+        _escribir(FIREBASE_COLLECTION_NAME, document_id, 'update', escritura,
+                  al_confirmar=_encadenar(lambda: _delta.confirmar(document_id, delta), al_confirmar))
+        log_debug(f"Sincronización incremental: {document_id}", documento=document_id, **reporte)
+        return _delta.cambios_significativos(document_id, delta)
         
     except Exception as e:
         log_debug(f"Error enviando datos: {e}")
+        return set()
 
 
 def escuchar_comandos_remotos(uuid_pc):
     """Listener optimizado para comandos remotos"""
+    _inicializar()
     tareas_ref = db.collection("tareas").document(uuid_pc)
-    try:
-        tareas_ref.set({
-            "hostname": platform.node(),
-            "comando": "NINGUNO",
-            "ultima_conexion": firestore.SERVER_TIMESTAMP
-        }, merge=True)
-    except Exception as e:
-        log_debug(f"Error en listener: {e}")
-        return
+    _escribir("tareas", uuid_pc, 'merge', {
+        "hostname": platform.node(),
+        "comando": "NINGUNO",
+        "ultima_conexion": firestore.SERVER_TIMESTAMP
+    })
 
     def on_snapshot(doc_snapshot, changes, read_time):
         from src.core.scanner import obtener_datos_pc
@@ -128,12 +213,12 @@ def escuchar_comandos_remotos(uuid_pc):
                 data = change.document.to_dict()
                 if data and data.get('comando') == "ACTUALIZAR_DATOS":
                     log_debug("Comando recibido: ACTUALIZAR_DATOS")
-                    tareas_ref.update({"comando": "PROCESANDO..."})
+                    _escribir("tareas", uuid_pc, 'update', {"comando": "PROCESANDO..."})
                     try:
                         # Forzar sincronización completa con todos los datos
                         nuevos_datos = obtener_datos_pc(incluir_pesados=True)
                         enviar_datos_pc(nuevos_datos, forzar_completo=True)
-                        tareas_ref.update({
+                        _escribir("tareas", uuid_pc, 'update', {
                             "comando": "PROCESADO",
                             "fecha_comando_ejecutado": firestore.SERVER_TIMESTAMP
                         })
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, 'benchmarks'))
+
+from falsos import redirigir_datos  # noqa: E402
+
+# Salidas reales de los backends, compartidas con los benchmarks
+GRABACIONES = os.path.join(RAIZ, 'benchmarks', 'grabaciones')
+
+
+def leer_grabacion(nombre):
+    with open(os.path.join(GRABACIONES, nombre), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture(autouse=True)
+def carpeta_datos(tmp_path, monkeypatch):
+    """Identidad, cachés, cola y registro de cada prueba en tmp_path, nunca en el DATA_DIR real"""
+    carpeta = str(tmp_path / 'datos')
+    redirigir_datos(carpeta, asignar=monkeypatch.setattr)
+    return carpeta
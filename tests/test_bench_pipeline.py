@@ -0,0 +1,32 @@
+from bench_pipeline import comparar
+
+BASE = {
+    'escaneo': {'corridas': 5, 'p50_ms': 10.0, 'p50_rel': 3.0, 'asignado_kb': 180.0, 'hijos': 1.0,
+                'powershell': 0.0, 'lotes': 0.0, 'escrituras': 0.0, 'bytes_escritos': 0.0},
+    'envio_completo': {'corridas': 1, 'p50_ms': 1.0, 'p50_rel': 0.3, 'asignado_kb': 88.0, 'hijos': 0.0,
+                       'powershell': 0.0, 'lotes': 1.0, 'escrituras': 1.0, 'bytes_escritos': 10000.0},
+}
+
+
+def _medido(**cambios):
+    medido = {etapa: dict(metricas) for etapa, metricas in BASE.items()}
+    for ruta, valor in cambios.items():
+        etapa, clave = ruta.split('__')
+        medido[etapa][clave] = valor
+    return medido
+
+
+def test_los_ms_absolutos_no_son_regresion():
+    # Otro equipo, tres veces más lento en todo: la latencia relativa no cambia
+    assert comparar(_medido(escaneo__p50_ms=30.0, envio_completo__p50_ms=3.0), BASE, 0.25) == []
+
+
+def test_latencia_relativa_solo_en_etapas_de_varias_corridas():
+    assert comparar(_medido(envio_completo__p50_rel=3.0), BASE, 0.25) == []
+    assert comparar(_medido(escaneo__p50_rel=4.0), BASE, 0.25) == []
+    assert comparar(_medido(escaneo__p50_rel=4.5), BASE, 0.25) == ['escaneo.p50_rel: 3.0 -> 4.5']
+
+
+def test_conteos_exactos():
+    assert comparar(_medido(envio_completo__lotes=2.0), BASE, 0.25) == ['envio_completo.lotes: 1.0 -> 2.0']
+    assert comparar(_medido(escaneo__hijos=2.0), BASE, 0.25) == ['escaneo.hijos: 1.0 -> 2.0']
@@ -0,0 +1,191 @@
+import time
+
+import pytest
+
+from src.database.cola_offline import ColaOffline, DrenadorCola, es_error_transitorio, escribir_aislando
+from src.database.escritor import EscritorLotes
+
+
+# Mismos nombres que google.api_core.exceptions (la clasificación es por nombre de clase)
+class ServiceUnavailable(Exception):
+    pass
+
+
+class NotFound(Exception):
+    pass
+
+
+class InvalidArgument(Exception):
+    pass
+
+
+class Firestore:
+    """escribir_lote falso: un WriteBatch que falla entero si alguna entrada es rechazada"""
+
+    def __init__(self, borrados=(), invalidos=(), sin_conexion=False):
+        self.documentos = {d: {} for d in ('pc1', 'pc2', 'pc3')}
+        for documento in borrados:
+            del self.documentos[documento]
+        self.invalidos = set(invalidos)
+        self.sin_conexion = sin_conexion
+        self.lotes = []
+
+    def escribir_lote(self, entradas):
+        self.lotes.append([(d, t) for _, d, t, _ in entradas])
+        if self.sin_conexion:
+            raise ServiceUnavailable("503 sin conexión")
+        for _, documento, tipo, _ in entradas:
+            if documento in self.invalidos:
+                raise InvalidArgument("400 campo inválido")
+            if tipo == 'update' and documento not in self.documentos:
+                raise NotFound(f"404 No document to update: {documento}")
+        for _, documento, tipo, datos in entradas:
+            self.documentos.setdefault(documento, {}).update(datos)
+
+
+def test_clasificacion_de_errores():
+    assert es_error_transitorio(ServiceUnavailable())
+    assert es_error_transitorio(ConnectionResetError())
+    assert es_error_transitorio(TimeoutError())
+    assert not es_error_transitorio(NotFound())
+    assert not es_error_transitorio(InvalidArgument())
+    assert not es_error_transitorio(ValueError())
+
+
+def test_clasificacion_con_las_excepciones_de_google():
+    excepciones = pytest.importorskip('google.api_core.exceptions')
+    assert es_error_transitorio(excepciones.ServiceUnavailable('x'))
+    assert es_error_transitorio(excepciones.DeadlineExceeded('x'))
+    assert not es_error_transitorio(excepciones.NotFound('x'))
+    assert not es_error_transitorio(excepciones.InvalidArgument('x'))
+    assert not es_error_transitorio(excepciones.PermissionDenied('x'))
+
+
+def test_escribir_aislando_no_arrastra_a_otros_documentos():
+    firestore = Firestore(invalidos={'pc2'})
+    entradas = [('c', 'pc1', 'update', {'a': 1}), ('c', 'pc2', 'update', {'a': 2}), ('c', 'pc3', 'set', {'a': 3})]
+
+    rechazadas = escribir_aislando(firestore.escribir_lote, entradas)
+
+    assert [(entrada[1], type(error)) for entrada, error in rechazadas] == [('pc2', InvalidArgument)]
+    assert firestore.documentos['pc1'] == {'a': 1} and firestore.documentos['pc3'] == {'a': 3}
+
+
+def test_update_sobre_documento_borrado_se_recrea():
+    firestore = Firestore(borrados={'pc1'})
+
+    assert escribir_aislando(firestore.escribir_lote, [('c', 'pc1', 'update', {'red.ip': '10.0.0.2'})]) == []
+    assert firestore.documentos['pc1'] == {'red': {'ip': '10.0.0.2'}}
+    assert firestore.lotes[-1] == [('pc1', 'merge')]
+
+
+def test_error_transitorio_se_propaga():
+    firestore = Firestore(sin_conexion=True)
+    with pytest.raises(ServiceUnavailable):
+        escribir_aislando(firestore.escribir_lote, [('c', 'pc1', 'set', {}), ('c', 'pc2', 'set', {})])
+    assert len(firestore.lotes) == 1
+
+
+def test_drenar_descarta_lo_rechazado_y_conserva_lo_transitorio():
+    cola = ColaOffline(':memory:')
+    cola.encolar('c', 'pc1', 'update', {'a': 1})
+    cola.encolar('c', 'pc2', 'update', {'a': 2})
+
+    with pytest.raises(ServiceUnavailable):
+        cola.drenar(Firestore(sin_conexion=True).escribir_lote)
+    assert cola.pendientes() == 2
+
+    firestore = Firestore(invalidos={'pc2'})
+    assert DrenadorCola(cola, firestore.escribir_lote).drenar_una_vez()
+    assert cola.pendientes() == 0
+    assert firestore.documentos['pc1'] == {'a': 1}
+
+
+def test_edad_por_creacion_aunque_siga_recibiendo_escrituras():
+    cola = ColaOffline(':memory:', max_edad=100)
+    cola.encolar('c', 'pc1', 'update', {'a': 1}, ahora=0)
+    cola.encolar('c', 'pc1', 'update', {'b': 2}, ahora=90)
+    assert cola.pendientes() == 1
+
+    cola.encolar('c', 'pc2', 'set', {}, ahora=150)
+    assert cola.pendientes('c', 'pc1') == 0
+    assert cola.pendientes('c', 'pc2') == 1
+
+
+def test_escritor_no_confirma_ni_encola_lo_rechazado():
+    firestore = Firestore(invalidos={'pc2'})
+    cola = ColaOffline(':memory:')
+    confirmadas = []
+    escritor = EscritorLotes(firestore.escribir_lote, cola=cola, log=lambda mensaje: None)
+    escritor.escribir('c', 'pc1', 'update', {'a': 1}, al_confirmar=lambda: confirmadas.append('pc1'))
+    escritor.escribir('c', 'pc2', 'update', {'a': 2}, al_confirmar=lambda: confirmadas.append('pc2'))
+
+    escritor.vaciar()
+
+    assert confirmadas == ['pc1']
+    assert cola.pendientes() == 0
+
+
+def test_escritor_encola_si_no_hay_conexion():
+    cola = ColaOffline(':memory:')
+    escritor = EscritorLotes(Firestore(sin_conexion=True).escribir_lote, cola=cola, log=lambda mensaje: None)
+    escritor.escribir('c', 'pc1', 'update', {'a': 1})
+
+    escritor.vaciar()
+
+    assert cola.pendientes('c', 'pc1') == 1
+
+
+def test_lo_encolado_sin_conexion_se_confirma_al_drenar():
+    cola = ColaOffline(':memory:')
+    confirmadas = []
+    escritor = EscritorLotes(Firestore(sin_conexion=True).escribir_lote, cola=cola, log=lambda mensaje: None)
+    escritor.escribir('c', 'pc1', 'update', {'a': 1}, al_confirmar=lambda: confirmadas.append('a'))
+    escritor.vaciar()
+    # Con el documento en la cola, lo siguiente se encola detrás aunque vuelva la conexión
+    escritor = EscritorLotes(Firestore().escribir_lote, cola=cola, log=lambda mensaje: None)
+    escritor.escribir('c', 'pc1', 'update', {'b': 2}, al_confirmar=lambda: confirmadas.append('b'))
+    escritor.vaciar()
+    assert confirmadas == []
+
+    with pytest.raises(ServiceUnavailable):
+        cola.drenar(Firestore(sin_conexion=True).escribir_lote)
+    assert confirmadas == []
+
+    firestore = Firestore()
+    assert DrenadorCola(cola, firestore.escribir_lote).drenar_una_vez()
+    assert confirmadas == ['a', 'b']
+    assert firestore.documentos['pc1'] == {'a': 1, 'b': 2}
+
+
+def test_drenado_avanza_la_base_del_delta():
+    from src.database.delta import CalculadorDelta
+
+    delta = CalculadorDelta()
+    delta.reiniciar('pc1', {'cpu_uso_porcentaje': 10})
+    cola = ColaOffline(':memory:')
+    escritor = EscritorLotes(Firestore(sin_conexion=True).escribir_lote, cola=cola, log=lambda mensaje: None)
+    cambio, _ = delta.calcular('pc1', {'cpu_uso_porcentaje': 80})
+    escritor.escribir('c', 'pc1', 'update', cambio, al_confirmar=lambda: delta.confirmar('pc1', cambio))
+    escritor.vaciar()
+    assert delta.calcular('pc1', {'cpu_uso_porcentaje': 80})[0] == cambio
+
+    cola.drenar(Firestore().escribir_lote)
+
+    assert delta.calcular('pc1', {'cpu_uso_porcentaje': 80})[0] == {}
+
+
+def test_lo_rechazado_o_descartado_de_la_cola_no_se_confirma():
+    cola = ColaOffline(':memory:', max_pendientes=2)
+    confirmadas = []
+    ahora = time.time()
+    for i, documento in enumerate(('pc1', 'pc2', 'pc3')):
+        cola.encolar('c', documento, 'update', {'a': 1}, ahora=ahora + i,
+                     confirmaciones=[lambda documento=documento: confirmadas.append(documento)])
+    # pc1 quedó fuera por el límite de pendientes; pc2 lo rechaza Firestore
+    assert cola.pendientes() == 2
+
+    cola.drenar(Firestore(invalidos={'pc2'}).escribir_lote)
+
+    assert confirmadas == ['pc3']
+    assert cola._confirmaciones == {}
@@ -0,0 +1,183 @@
+import pytest
+
+from src.core.cpu import (VENTANA_MAXIMA_PROCESOS, VENTANA_MINIMA, RastreadorCPU, calcular_porcentaje_sistema,
+                          calcular_porcentajes_procesos)
+from src.core.procesos import TablaProcesos
+
+
+def _tabla(filas, leida_en):
+    """filas: (pid, nombre, segundos_cpu, creado)"""
+    return TablaProcesos.desde_filas([(pid, nombre, '', 0, 0, cpu, creado) for pid, nombre, cpu, creado in filas],
+                                     leida_en=leida_en)
+
+
+class Contadores:
+    """Lectores y reloj sintéticos para RastreadorCPU"""
+
+    def __init__(self):
+        self.t = 100.0
+        self.total = 1000.0
+        self.ocioso = 800.0
+        self.filas = [(10, 'chrome.exe', 5.0, 1.0), (20, 'python.exe', 1.0, 2.0)]
+        # Filas tras una espera del rastreador (None = sin cambios)
+        self.filas_tras_espera = None
+        self.lecturas_procesos = 0
+        self.esperas = []
+
+    def leer_sistema(self):
+        return self.total, self.ocioso
+
+    def leer_procesos(self):
+        self.lecturas_procesos += 1
+        return _tabla(self.filas, self.t)
+
+    def esperar(self, segundos):
+        self.esperas.append(segundos)
+        self.avanzar(segundos, ocupado=0.0, filas=self.filas_tras_espera)
+
+    def avanzar(self, segundos, ocupado, filas=None):
+        """Avanza el reloj; 'ocupado' es la fracción de CPU del sistema en el lapso"""
+        self.t += segundos
+        self.total += segundos * 4
+        self.ocioso += segundos * 4 * (1 - ocupado)
+        if filas is not None:
+            self.filas = filas
+
+    def rastreador(self):
+        return RastreadorCPU(leer_sistema=self.leer_sistema, leer_procesos=self.leer_procesos,
+                             reloj=lambda: self.t, esperar=self.esperar)
+
+
+def test_calcular_porcentaje_sistema():
+    assert calcular_porcentaje_sistema((1000.0, 800.0), (1040.0, 830.0)) == 25.0
+    assert calcular_porcentaje_sistema((1000.0, 800.0), (1040.0, 800.0)) == 100.0
+    # Sin tiempo transcurrido (o contadores que retroceden) no hay porcentaje
+    assert calcular_porcentaje_sistema((1000.0, 800.0), (1000.0, 800.0)) == 0.0
+    assert calcular_porcentaje_sistema((1000.0, 800.0), (990.0, 790.0)) == 0.0
+
+
+def test_calcular_porcentajes_procesos_empareja_por_pid_y_creacion():
+    previa = _tabla([(10, 'chrome.exe', 5.0, 1.0), (20, 'python.exe', 1.0, 2.0), (30, 'viejo.exe', 9.0, 3.0)], 0)
+    actual = _tabla([
+        (10, 'chrome.exe', 7.0, 1.0),       # 2 s de CPU en 10 s
+        (20, 'python.exe', 0.5, 50.0),      # PID reutilizado: otro proceso, sin base
+        (40, 'nuevo.exe', 3.0, 60.0),       # no estaba antes
+    ], 10)
+
+    porcentajes = calcular_porcentajes_procesos(previa, actual, 10)
+
+    assert list(porcentajes) == [20.0, 0.0, 0.0]
+
+
+def test_calcular_porcentajes_procesos_varios_nucleos_y_ventana_nula():
+    previa = _tabla([(10, 'render.exe', 0.0, 1.0)], 0)
+    actual = _tabla([(10, 'render.exe', 30.0, 1.0)], 10)
+    assert list(calcular_porcentajes_procesos(previa, actual, 10)) == [300.0]
+    assert list(calcular_porcentajes_procesos(previa, actual, 0)) == [0.0]
+
+
+def test_sin_bases_no_hay_porcentaje_de_sistema():
+    contadores = Contadores()
+    assert contadores.rastreador().cpu_sistema() == 0.0
+
+
+def test_base_recien_tomada_no_da_porcentaje_espurio():
+    contadores = Contadores()
+    rastreador = contadores.rastreador()
+    rastreador.actualizar()
+
+    # Como scanner.iniciar() seguido del primer escaneo: milisegundos después de la base
+    contadores.avanzar(0.01, ocupado=1.0)
+    assert rastreador.cpu_sistema() == 0.0
+
+    contadores.avanzar(VENTANA_MINIMA, ocupado=0.5)
+    assert rastreador.cpu_sistema() == 50.5
+
+
+def test_el_bucle_no_lee_procesos():
+    contadores = Contadores()
+    rastreador = contadores.rastreador()
+    for _ in range(10):
+        rastreador.actualizar()
+        contadores.avanzar(10, ocupado=0.5)
+    assert contadores.lecturas_procesos == 0
+
+
+def test_procesos_a_pedido_sin_base():
+    contadores = Contadores()
+    contadores.filas_tras_espera = [(10, 'chrome.exe', 5.5, 1.0), (20, 'python.exe', 1.0, 2.0)]
+    rastreador = contadores.rastreador()
+
+    tabla, porcentajes = rastreador.porcentajes()
+
+    # Se toma la base, se espera VENTANA_MINIMA y se devuelve la tabla nueva
+    assert contadores.esperas == [VENTANA_MINIMA]
+    assert list(tabla.cpu) == [5.5, 1.0]
+    assert list(porcentajes) == [pytest.approx(50.0), 0.0]
+
+
+def test_procesos_contra_base_reciente_sin_esperar():
+    contadores = Contadores()
+    rastreador = contadores.rastreador()
+    rastreador.porcentajes()
+    contadores.avanzar(10, ocupado=0.5, filas=[(10, 'chrome.exe', 7.0, 1.0), (20, 'python.exe', 1.0, 2.0)])
+
+    _, porcentajes = rastreador.porcentajes()
+    assert contadores.esperas == [VENTANA_MINIMA]
+    assert list(porcentajes) == [pytest.approx(20.0), 0.0]
+
+
+def test_base_de_procesos_vieja_se_renueva():
+    contadores = Contadores()
+    rastreador = contadores.rastreador()
+    rastreador.porcentajes()
+    # 15 minutos después (cadencia de aplicaciones_activas): no promediar todo el lapso
+    contadores.avanzar(900, ocupado=0.5, filas=[(10, 'chrome.exe', 500.0, 1.0), (20, 'python.exe', 1.0, 2.0)])
+    contadores.filas_tras_espera = [(10, 'chrome.exe', 500.25, 1.0), (20, 'python.exe', 1.0, 2.0)]
+    assert 900 > VENTANA_MAXIMA_PROCESOS
+
+    _, porcentajes = rastreador.porcentajes()
+    assert len(contadores.esperas) == 2
+    assert porcentajes[0] == pytest.approx(25.0)
+
+
+def test_ventana_corta_devuelve_el_ultimo_valor():
+    contadores = Contadores()
+    rastreador = contadores.rastreador()
+    rastreador.actualizar()
+    contadores.avanzar(10, ocupado=0.25)
+    assert rastreador.cpu_sistema() == 25.0
+
+    # Base nueva y consulta inmediata: la base anterior (10 s) sigue sirviendo
+    rastreador.actualizar()
+    contadores.avanzar(0.2, ocupado=1.0)
+    assert rastreador.cpu_sistema() == pytest.approx(26.5, abs=0.1)
+
+
+def test_elige_la_base_mas_reciente_con_ventana_suficiente():
+    contadores = Contadores()
+    rastreador = contadores.rastreador()
+    rastreador.actualizar()                     # base A en t=100
+    contadores.avanzar(10, ocupado=1.0)
+    rastreador.actualizar()                     # base B en t=110
+    contadores.avanzar(10, ocupado=0.0)
+
+    # Desde B (10 s ociosos), no desde A (mezcla 50 %)
+    assert rastreador.cpu_sistema() == 0.0
+
+    rastreador.actualizar()                     # base C en t=120; solo quedan B y C
+    contadores.avanzar(0.5, ocupado=0.0)
+    # C es muy reciente: se usa B (10 s ociosos + 0,5 s ociosos)
+    assert rastreador.cpu_sistema() == 0.0
+
+
+def test_porcentajes_por_nombre():
+    contadores = Contadores()
+    contadores.filas = [(10, 'chrome.exe', 5.0, 1.0), (11, 'chrome.exe', 2.0, 1.5), (20, 'python.exe', 1.0, 2.0)]
+    rastreador = contadores.rastreador()
+    rastreador.actualizar(procesos=contadores.leer_procesos())
+    contadores.avanzar(10, ocupado=0.5,
+                       filas=[(10, 'chrome.exe', 6.0, 1.0), (11, 'chrome.exe', 3.0, 1.5), (20, 'python.exe', 1.0, 2.0)])
+
+    assert rastreador.cpu_por_nombre() == {'chrome.exe': 20.0, 'python.exe': 0.0}
+    assert rastreador.cpu_procesos()[10] == ('chrome.exe', 10.0)
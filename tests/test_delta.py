@@ -0,0 +1,121 @@
+from src.database.delta import LATIDO_MAXIMO, CalculadorDelta, aplanar, iguales
+
+
+def test_aplanar_anidados_en_rutas_y_listas_como_hojas():
+    datos = {'red': {'trafico': {'bytes_enviados_mb': 1.5}, 'adaptadores': [{'nombre': 'eth0'}]},
+             'usuarios': [], 'errores_huellas': {}, 'cpu_uso_porcentaje': 10}
+    assert aplanar(datos) == {
+        'red.trafico.bytes_enviados_mb': 1.5,
+        'red.adaptadores': [{'nombre': 'eth0'}],
+        'usuarios': [],
+        # Un mapa vacío es un valor, no desaparece del documento
+        'errores_huellas': {},
+        'cpu_uso_porcentaje': 10
+    }
+
+
+def test_iguales_dentro_de_la_banda_muerta():
+    assert iguales(40.0, 44.9, 'cpu_uso_porcentaje')
+    assert not iguales(40.0, 45.0, 'cpu_uso_porcentaje')
+    # Sin banda para la ruta: cualquier diferencia cuenta
+    assert not iguales(40.0, 40.1, 'temperatura')
+    assert iguales(7, 7, 'temperatura')
+
+
+def test_iguales_recorre_listas_y_diccionarios_con_la_ruta_de_elemento():
+    antes = [{'unidad': 'C:', 'usado_gb': 100.0, 'porcentaje_usado': 50.0}]
+    assert iguales(antes, [{'unidad': 'C:', 'usado_gb': 100.4, 'porcentaje_usado': 50.9}], 'discos')
+    assert not iguales(antes, [{'unidad': 'C:', 'usado_gb': 100.6, 'porcentaje_usado': 50.0}], 'discos')
+    # Otra cantidad de elementos o de claves no es "casi igual"
+    assert not iguales(antes, antes + antes, 'discos')
+    assert not iguales(antes, [{'unidad': 'C:', 'usado_gb': 100.0}], 'discos')
+
+
+def test_iguales_booleanos_y_bandas_explicitas():
+    assert not iguales(True, False, 'x', bandas={'x': 5})
+    assert not iguales(0, 1, 'x') and iguales(0, 1, 'x', bandas={'x': 5})
+
+
+def test_delta_solo_con_lo_que_supera_la_banda():
+    delta = CalculadorDelta()
+    delta.reiniciar('pc', {'cpu_uso_porcentaje': 40.0, 'ram_uso_porcentaje': 60.0, 'hostname': 'PC-01'})
+
+    cambio, reporte = delta.calcular('pc', {'cpu_uso_porcentaje': 43.0, 'ram_uso_porcentaje': 63.0,
+                                            'hostname': 'PC-01'})
+    assert cambio == {'ram_uso_porcentaje': 63.0}
+    assert (reporte['campos_enviados'], reporte['campos_ahorrados']) == (1, 2)
+
+
+def test_la_banda_se_mide_contra_lo_confirmado_no_contra_el_ciclo_anterior():
+    delta = CalculadorDelta()
+    delta.reiniciar('pc', {'cpu_uso_porcentaje': 40.0})
+
+    # Deriva lenta: cada paso queda dentro de la banda, pero no se confirma nada
+    for valor in (42.0, 44.0):
+        assert delta.calcular('pc', {'cpu_uso_porcentaje': valor})[0] == {}
+    cambio, _ = delta.calcular('pc', {'cpu_uso_porcentaje': 46.0})
+    assert cambio == {'cpu_uso_porcentaje': 46.0}
+
+    # Sin confirmar, el siguiente cálculo vuelve a enviarlo
+    assert delta.calcular('pc', {'cpu_uso_porcentaje': 46.0})[0] == cambio
+    delta.confirmar('pc', cambio)
+    assert delta.calcular('pc', {'cpu_uso_porcentaje': 46.0})[0] == {}
+
+
+def test_confirmar_un_diccionario_reemplaza_lo_que_colgaba_de_la_ruta():
+    delta = CalculadorDelta()
+    delta.reiniciar('pc', {'red': {'trafico': {'bytes_enviados_mb': 1.0, 'viejo': 3}}})
+
+    delta.confirmar('pc', {'red.trafico': {'bytes_enviados_mb': 2.0}})
+    cambio, _ = delta.calcular('pc', {'red': {'trafico': {'bytes_enviados_mb': 2.0}}})
+    assert cambio == {}
+    # La ruta borrada no quedó en lo confirmado: volver a mandarla es un cambio
+    cambio, _ = delta.calcular('pc', {'red': {'trafico': {'bytes_enviados_mb': 2.0, 'viejo': 3}}})
+    assert cambio == {'red.trafico.viejo': 3}
+
+
+def test_mapa_completo_con_claves_desalojadas_se_reescribe_entero():
+    delta = CalculadorDelta()
+    huellas = {'a1': {'cuenta': 3}, 'b2': {'cuenta': 1}}
+    delta.reiniciar('pc', {'errores_huellas': huellas, 'cpu_uso_porcentaje': 10})
+
+    # b2 desalojada y c3 nueva: un update por rutas dejaría b2 huérfana en Firestore
+    nuevas = {'a1': {'cuenta': 4}, 'c3': {'cuenta': 1}}
+    cambio, _ = delta.calcular('pc', {'errores_huellas': nuevas, 'cpu_uso_porcentaje': 10})
+    assert cambio == {'errores_huellas': nuevas}
+
+    delta.confirmar('pc', cambio)
+    cambio, _ = delta.calcular('pc', {'errores_huellas': nuevas, 'cpu_uso_porcentaje': 10})
+    assert cambio == {}
+    # Lo confirmado ya no recuerda b2: reaparecer es un cambio por ruta
+    cambio, _ = delta.calcular('pc', {'errores_huellas': {**nuevas, 'b2': {'cuenta': 1}},
+                                      'cpu_uso_porcentaje': 10})
+    assert cambio == {'errores_huellas.b2.cuenta': 1}
+
+
+def test_mapa_completo_que_solo_crece_se_actualiza_por_rutas():
+    delta = CalculadorDelta()
+    delta.reiniciar('pc', {'errores_huellas': {'a1': {'cuenta': 3}}})
+
+    cambio, _ = delta.calcular('pc', {'errores_huellas': {'a1': {'cuenta': 3}, 'c3': {'cuenta': 1}}})
+    assert cambio == {'errores_huellas.c3.cuenta': 1}
+
+
+def test_mapa_no_declarado_completo_se_actualiza_por_rutas():
+    delta = CalculadorDelta(mapas_completos=())
+    delta.reiniciar('pc', {'errores_huellas': {'a1': {'cuenta': 3}, 'b2': {'cuenta': 1}}})
+
+    cambio, _ = delta.calcular('pc', {'errores_huellas': {'a1': {'cuenta': 4}}})
+    assert cambio == {'errores_huellas.a1.cuenta': 4}
+
+
+def test_latido_desde_la_ultima_escritura_confirmada():
+    delta = CalculadorDelta()
+    # Documento nunca escrito en este proceso
+    assert delta.requiere_latido('pc', ahora=LATIDO_MAXIMO)
+
+    delta.reiniciar('pc', {'cpu_uso_porcentaje': 10}, ahora=1000)
+    assert not delta.requiere_latido('pc', ahora=1000 + LATIDO_MAXIMO - 1)
+    delta.confirmar('pc', {'cpu_uso_porcentaje': 20}, ahora=1000 + LATIDO_MAXIMO - 1)
+    assert not delta.requiere_latido('pc', ahora=1000 + LATIDO_MAXIMO)
+    assert delta.requiere_latido('pc', ahora=1000 + 2 * LATIDO_MAXIMO - 1)
@@ -0,0 +1,155 @@
+import json
+
+import pytest
+from conftest import leer_grabacion
+
+from src.core.descripciones import CacheDescripciones
+from src.core.plataforma import windows
+
+GRABACION = leer_grabacion('ps_version_archivos.json')
+RUTAS = [d['Ruta'] for d in json.loads(GRABACION)]
+
+
+@pytest.fixture
+def powershell(monkeypatch):
+    """Reemplaza el host de PowerShell; devuelve los scripts recibidos"""
+    scripts = []
+
+    def instalar(salida):
+        def ejecutar(script, timeout=10):
+            scripts.append(script)
+            return salida
+        monkeypatch.setattr(windows, 'ejecutar_powershell', ejecutar)
+        return scripts
+    return instalar
+
+
+def test_describir_ejecutables_con_salida_grabada(powershell):
+    powershell(GRABACION)
+
+    # null (sin recurso de versión) y '' (no se pudo leer) son respuestas explícitas sin descripción
+    assert windows.describir_ejecutables(RUTAS) == {
+        RUTAS[0]: 'Google Chrome',
+        RUTAS[1]: 'Microsoft Edge',
+        RUTAS[2]: 'Microsoft Outlook',
+        RUTAS[3]: '',
+        RUTAS[4]: '',
+    }
+
+
+def test_describir_ejecutables_ignora_la_salida_del_pipeline_roto(powershell):
+    # Lo que devolvía 5.1 con el arreglo entero como $_: no es respuesta de ninguna ruta
+    powershell(json.dumps({'Ruta': RUTAS, 'Descripcion': ''}))
+    assert windows.describir_ejecutables(RUTAS) == {}
+
+
+def test_describir_ejecutables_un_solo_objeto(powershell):
+    # ConvertTo-Json de un único elemento no devuelve un arreglo
+    powershell(json.dumps({'Ruta': RUTAS[0], 'Descripcion': 'Google Chrome'}))
+    assert windows.describir_ejecutables(RUTAS[:1]) == {RUTAS[0]: 'Google Chrome'}
+
+
+def test_describir_ejecutables_sin_rutas_no_llama_a_powershell(powershell):
+    scripts = powershell('')
+    assert windows.describir_ejecutables(['', None]) == {}
+    assert scripts == []
+
+
+def test_script_itera_las_rutas_y_no_el_arreglo(powershell):
+    scripts = powershell(GRABACION)
+    windows.describir_ejecutables(["C:\\Program Files\\O'Brien\\app.exe"] + RUTAS)
+
+    script = scripts[0]
+    # En Windows PowerShell 5.1 '<json>' | ConvertFrom-Json | ForEach-Object recibe
+    # el arreglo entero como $_: GetVersionInfo falla y se pierden todas las descripciones
+    assert '| ConvertFrom-Json | ForEach-Object' not in script
+    assert 'foreach ($ruta in $rutas)' in script
+    # Las rutas viajan como JSON dentro de una cadena entre comillas simples
+    rutas_json = script.split("$rutas = '", 1)[1].split("' | ConvertFrom-Json", 1)[0].replace("''", "'")
+    assert json.loads(rutas_json)[0] == "C:\\Program Files\\O'Brien\\app.exe"
+
+
+# ==================== CACHÉ ====================
+class Consulta:
+    """consultar(rutas) falso: responde solo las rutas de 'respuestas'"""
+
+    def __init__(self, respuestas):
+        self.respuestas = respuestas
+        self.pedidos = []
+
+    def __call__(self, rutas):
+        self.pedidos.append(sorted(rutas))
+        return {r: self.respuestas[r] for r in rutas if r in self.respuestas}
+
+
+@pytest.fixture
+def ejecutables(tmp_path):
+    rutas = []
+    for nombre in ('chrome.exe', 'herramienta.exe', 'nuevo.exe'):
+        ruta = tmp_path / nombre
+        ruta.write_bytes(b'MZ')
+        rutas.append(str(ruta))
+    return rutas
+
+
+def test_cache_guarda_descripciones_y_ausencias_respondidas(tmp_path, ejecutables):
+    chrome, herramienta, _ = ejecutables
+    consulta = Consulta({chrome: 'Google Chrome', herramienta: ''})
+    cache = CacheDescripciones(str(tmp_path / 'descripciones.json'))
+
+    assert cache.obtener([chrome, herramienta], consulta) == {chrome: 'Google Chrome'}
+    assert cache.obtener([chrome, herramienta], consulta) == {chrome: 'Google Chrome'}
+    assert len(consulta.pedidos) == 1
+
+    # Persistida: otro arranque no vuelve a preguntar
+    otra = CacheDescripciones(str(tmp_path / 'descripciones.json'))
+    assert otra.obtener([chrome, herramienta], consulta) == {chrome: 'Google Chrome'}
+    assert len(consulta.pedidos) == 1
+
+
+def test_cache_no_guarda_rutas_sin_respuesta(tmp_path, ejecutables):
+    chrome, _, nuevo = ejecutables
+    cache = CacheDescripciones(str(tmp_path / 'descripciones.json'))
+
+    # Respuesta incompleta: 'nuevo' no vino
+    cache.obtener([chrome, nuevo], Consulta({chrome: 'Google Chrome'}))
+    consulta = Consulta({nuevo: 'Nuevo'})
+    assert cache.obtener([chrome, nuevo], consulta) == {chrome: 'Google Chrome', nuevo: 'Nuevo'}
+    assert consulta.pedidos == [[nuevo]]
+
+
+def test_cache_no_guarda_nada_si_la_consulta_falla(tmp_path, ejecutables):
+    chrome = ejecutables[0]
+    cache = CacheDescripciones(str(tmp_path / 'descripciones.json'))
+
+    def falla(rutas):
+        raise RuntimeError("PowerShell no responde")
+
+    with pytest.raises(RuntimeError):
+        cache.obtener([chrome], falla)
+    consulta = Consulta({chrome: 'Google Chrome'})
+    assert cache.obtener([chrome], consulta) == {chrome: 'Google Chrome'}
+    assert consulta.pedidos == [[chrome]]
+
+
+def test_cache_reconsulta_si_el_binario_cambia(tmp_path, ejecutables):
+    chrome = ejecutables[0]
+    cache = CacheDescripciones(str(tmp_path / 'descripciones.json'))
+    cache.obtener([chrome], Consulta({chrome: 'Google Chrome'}))
+
+    with open(chrome, 'ab') as f:
+        f.write(b'\x00' * 16)
+    consulta = Consulta({chrome: 'Google Chrome 2'})
+    assert cache.obtener([chrome], consulta) == {chrome: 'Google Chrome 2'}
+
+
+def test_cache_reconsulta_ausencias_de_versiones_anteriores(tmp_path, ejecutables):
+    chrome = ejecutables[0]
+    estado = (tmp_path / 'chrome.exe').stat()
+    with open(tmp_path / 'descripciones.json', 'w', encoding='utf-8') as f:
+        json.dump([[chrome, estado.st_size, int(estado.st_mtime), '']], f)
+
+    consulta = Consulta({chrome: 'Google Chrome'})
+    cache = CacheDescripciones(str(tmp_path / 'descripciones.json'))
+    assert cache.obtener([chrome], consulta) == {chrome: 'Google Chrome'}
+    assert consulta.pedidos == [[chrome]]
@@ -0,0 +1,59 @@
+from collections import namedtuple
+
+import pytest
+
+from src.core import scanner
+
+Particion = namedtuple('Particion', 'device mountpoint fstype')
+PARTICIONES = [Particion('C:\\', 'C:\\', 'NTFS'), Particion('D:\\', 'D:\\', 'NTFS')]
+
+
+class Backend:
+    """Backend falso: la consulta del índice falla mientras 'fallar' sea True"""
+
+    def __init__(self, fallar=False, vacio=False):
+        self.fallar = fallar
+        self.vacio = vacio
+        self.consultas = 0
+
+    def leer_indice_particiones(self):
+        self.consultas += 1
+        if self.fallar:
+            raise RuntimeError("Get-Partition no responde")
+        return {} if self.vacio else {'C:': '0', 'D:': '1'}
+
+    def clave_particion(self, dispositivo):
+        return dispositivo.rstrip('\\')
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = Backend()
+    monkeypatch.setattr(scanner, 'obtener_backend', lambda: backend)
+    monkeypatch.setattr(scanner, '_CACHE_ESTATICO', {'hostname': 'pc', 'indice_particiones': {},
+                                                    'firma_particiones': None})
+    return backend
+
+
+def test_indice_cacheado_por_firma(backend):
+    assert scanner.obtener_disco_de_particion('D:\\', PARTICIONES) == '1'
+    assert scanner.obtener_disco_de_particion('C:\\', PARTICIONES) == '0'
+    assert backend.consultas == 1
+
+    # Cambian las particiones: se reconstruye
+    scanner.obtener_disco_de_particion('C:\\', PARTICIONES[:1])
+    assert backend.consultas == 2
+
+
+@pytest.mark.parametrize('falla', [{'fallar': True}, {'vacio': True}])
+def test_consulta_fallida_no_queda_cacheada(backend, falla):
+    backend.fallar = falla.get('fallar', False)
+    backend.vacio = falla.get('vacio', False)
+    assert scanner.obtener_disco_de_particion('D:\\', PARTICIONES) == '0'
+
+    # Mismas particiones: el siguiente escaneo vuelve a consultar
+    backend.fallar = backend.vacio = False
+    assert scanner.obtener_disco_de_particion('D:\\', PARTICIONES) == '1'
+    assert backend.consultas == 2
+    assert scanner.obtener_disco_de_particion('D:\\', PARTICIONES) == '1'
+    assert backend.consultas == 2
@@ -0,0 +1,128 @@
+import threading
+
+from src.database import escritor as modulo
+from src.database.escritor import EscritorLotes
+
+
+class Commits:
+    """escribir_lote falso: anota cada lote y avisa cuando llega uno"""
+
+    def __init__(self):
+        self.lotes = []
+        self.llego = threading.Event()
+
+    def __call__(self, entradas):
+        self.lotes.append([(d, t, datos) for _, d, t, datos in entradas])
+        self.llego.set()
+
+
+def _escritor(commits, **opciones):
+    return EscritorLotes(commits, log=lambda mensaje: None, **opciones)
+
+
+def test_varias_escrituras_al_mismo_documento_viajan_como_una():
+    commits = Commits()
+    escritor = _escritor(commits)
+    escritor.escribir('c', 'pc1', 'update', {'cpu': 10, 'red.ip': '10.0.0.2'})
+    escritor.escribir('c', 'pc2', 'merge', {'a': 1})
+    escritor.escribir('c', 'pc1', 'update', {'cpu': 20})
+    escritor.escribir('c', 'pc1', 'update', {'red': {'ip': '10.0.0.9'}})
+
+    escritor.vaciar()
+
+    assert commits.lotes == [[
+        ('pc1', 'update', {'cpu': 20, 'red': {'ip': '10.0.0.9'}}),
+        ('pc2', 'merge', {'a': 1})
+    ]]
+    escritor.vaciar()
+    assert len(commits.lotes) == 1
+
+
+def test_set_seguido_de_update_sigue_siendo_set():
+    commits = Commits()
+    escritor = _escritor(commits)
+    escritor.escribir('c', 'pc1', 'set', {'cpu': 10, 'red': {'ip': '10.0.0.2'}})
+    escritor.escribir('c', 'pc1', 'update', {'red.ip': '10.0.0.9'})
+
+    escritor.vaciar()
+
+    assert commits.lotes == [[('pc1', 'set', {'cpu': 10, 'red': {'ip': '10.0.0.9'}})]]
+
+
+def test_confirmaciones_en_orden_y_despues_del_commit():
+    commits = Commits()
+    escritor = _escritor(commits)
+    confirmadas = []
+
+    def confirmar(nombre):
+        return lambda: confirmadas.append((nombre, len(commits.lotes)))
+
+    escritor.escribir('c', 'pc1', 'set', {'cpu': 10}, al_confirmar=confirmar('set'))
+    escritor.escribir('c', 'pc1', 'update', {'cpu': 20}, al_confirmar=confirmar('update'))
+    escritor.escribir('c', 'pc1', 'update', {'ram': 50})
+    escritor.escribir('c', 'pc1', 'update', {'cpu': 30}, al_confirmar=confirmar('ultimo'))
+    assert confirmadas == []
+
+    escritor.vaciar()
+
+    assert confirmadas == [('set', 1), ('update', 1), ('ultimo', 1)]
+
+
+def test_una_confirmacion_que_falla_no_corta_las_demas():
+    escritor = _escritor(Commits())
+    confirmadas = []
+    escritor.escribir('c', 'pc1', 'update', {'cpu': 10}, al_confirmar=lambda: 1 / 0)
+    escritor.escribir('c', 'pc1', 'update', {'cpu': 20}, al_confirmar=lambda: confirmadas.append('pc1'))
+
+    escritor.vaciar()
+
+    assert confirmadas == ['pc1']
+
+
+def test_la_ventana_junta_lo_que_llega_en_ese_lapso():
+    commits = Commits()
+    escritor = _escritor(commits, ventana=0.2)
+    escritor.iniciar()
+    try:
+        escritor.escribir('c', 'pc1', 'update', {'cpu': 10})
+        escritor.escribir('c', 'pc2', 'update', {'cpu': 20})
+        assert commits.llego.wait(5)
+    finally:
+        escritor.detener(vaciar=False)
+
+    assert [[d for d, _, _ in lote] for lote in commits.lotes] == [['pc1', 'pc2']]
+
+
+def test_detener_vaciando_envia_lo_pendiente_sin_esperar_la_ventana():
+    commits = Commits()
+    escritor = _escritor(commits, ventana=60)
+    escritor.iniciar()
+    confirmadas = []
+    escritor.escribir('c', 'pc1', 'update', {'cpu': 10}, al_confirmar=lambda: confirmadas.append('pc1'))
+
+    escritor.detener(vaciar=True)
+
+    assert commits.lotes == [[('pc1', 'update', {'cpu': 10})]]
+    assert confirmadas == ['pc1']
+
+
+def test_detener_sin_vaciar_no_escribe():
+    commits = Commits()
+    escritor = _escritor(commits, ventana=60)
+    escritor.escribir('c', 'pc1', 'update', {'cpu': 10})
+
+    escritor.detener(vaciar=False)
+
+    assert commits.lotes == []
+
+
+def test_lotes_partidos_al_limite_de_operaciones(monkeypatch):
+    monkeypatch.setattr(modulo, 'MAX_OPERACIONES_LOTE', 2)
+    commits = Commits()
+    escritor = _escritor(commits)
+    for documento in ('pc1', 'pc2', 'pc3'):
+        escritor.escribir('c', documento, 'update', {'cpu': 10})
+
+    escritor.vaciar()
+
+    assert [len(lote) for lote in commits.lotes] == [2, 1]
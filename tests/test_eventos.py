@@ -0,0 +1,171 @@
+import json
+import sys
+import types
+
+import pytest
+
+from src.core.eventos import REGISTROS_INICIALES, TIPO_ADVERTENCIA, TIPO_ERROR, LectorEventos
+from src.core.plataforma import windows
+
+
+def _registro(numero, tipo=TIPO_ERROR, fuente='Disk', mensaje='Error en el disco 3'):
+    return {'registro': numero, 'tipo': tipo, 'fuente': fuente, 'evento_id': 7,
+            'fecha': f'2026-10-01 00:00:{numero % 60:02d}', 'mensaje': mensaje}
+
+
+class LogEnMemoria:
+    """leer_registros(log, desde) sobre una lista; anota los cursores pedidos"""
+
+    def __init__(self, registros):
+        self.registros = list(registros)
+        self.pedidos = []
+
+    def leer(self, log, desde):
+        self.pedidos.append(desde)
+        nuevos = [r for r in self.registros if desde is None or r['registro'] > desde]
+        ultimo = self.registros[-1]['registro'] if self.registros else 0
+        return nuevos, ultimo
+
+
+def _lector(tmp_path, log):
+    return LectorEventos(ruta_cursor=str(tmp_path / 'cursor.json'), leer_registros=log.leer,
+                         formatear=lambda registro, nombre: registro['mensaje'],
+                         ruta_huellas=str(tmp_path / 'huellas.json'))
+
+
+def test_cursor_persistido_entre_instancias(tmp_path):
+    log = LogEnMemoria([_registro(1), _registro(2, tipo=TIPO_ADVERTENCIA), _registro(3)])
+
+    assert _lector(tmp_path, log).procesar() == 2
+    with open(tmp_path / 'cursor.json', 'r', encoding='utf-8') as f:
+        assert json.load(f) == {'System': 3}
+
+    # Otro arranque del agente: sigue desde el cursor guardado, sin releer
+    log.registros.append(_registro(4))
+    lector = _lector(tmp_path, log)
+    assert lector.procesar() == 1
+    assert log.pedidos == [None, 3]
+    assert lector.recientes(5)[0]['repeticiones'] == 3
+
+
+def test_cursor_sin_cambios_no_reescribe(tmp_path):
+    log = LogEnMemoria([_registro(1)])
+    lector = _lector(tmp_path, log)
+    lector.procesar()
+    (tmp_path / 'cursor.json').unlink()
+
+    assert lector.procesar() == 0
+    assert not (tmp_path / 'cursor.json').exists()
+
+
+def test_huellas_agrupan_mensajes_que_solo_difieren_en_numeros(tmp_path):
+    log = LogEnMemoria([_registro(1, mensaje='Timeout 30 ms en {0a1b2c3d-0000-0000-0000-000000000001}'),
+                        _registro(2, mensaje='Timeout 45 ms en {0a1b2c3d-0000-0000-0000-000000000002}'),
+                        _registro(3, fuente='Tcpip', mensaje='Dirección duplicada')])
+    lector = _lector(tmp_path, log)
+    lector.procesar()
+
+    conteos = sorted(h['conteo'] for h in lector.mapa_huellas().values())
+    assert conteos == [1, 2]
+
+
+# ==================== LECTURA DEL VISOR DE EVENTOS ====================
+class Win32EvtlogFalso(types.ModuleType):
+    """win32evtlog con un log de registros [mas_antiguo, ultimo] leídos en tandas"""
+
+    EVENTLOG_SEEK_READ = 0x2
+    EVENTLOG_SEQUENTIAL_READ = 0x1
+    EVENTLOG_FORWARDS_READ = 0x4
+    TANDA = 16
+
+    def __init__(self, mas_antiguo, ultimo):
+        super().__init__('win32evtlog')
+        self.mas_antiguo = mas_antiguo
+        self.ultimo = ultimo
+        self._siguiente = None
+
+    def OpenEventLog(self, servidor, log):
+        return object()
+
+    def CloseEventLog(self, hand):
+        pass
+
+    def GetNumberOfEventLogRecords(self, hand):
+        return max(0, self.ultimo - self.mas_antiguo + 1)
+
+    def GetOldestEventLogRecord(self, hand):
+        return self.mas_antiguo
+
+    def ReadEventLog(self, hand, flags, offset):
+        if flags & self.EVENTLOG_SEEK_READ:
+            self._siguiente = offset
+        desde = self._siguiente
+        hasta = min(self.ultimo, desde + self.TANDA - 1)
+        self._siguiente = hasta + 1
+        return [types.SimpleNamespace(RecordNumber=n, EventType=TIPO_ERROR, SourceName='Disk', EventID=7,
+                                      TimeGenerated=types.SimpleNamespace(Format=lambda: '10/01/26 00:00:00'),
+                                      StringInserts=None)
+                for n in range(desde, hasta + 1)]
+
+
+@pytest.fixture
+def visor(monkeypatch):
+    def crear(mas_antiguo, ultimo):
+        modulo = Win32EvtlogFalso(mas_antiguo, ultimo)
+        monkeypatch.setitem(sys.modules, 'win32evtlog', modulo)
+        return modulo
+    return crear
+
+
+def _numeros(registros):
+    return [r['registro'] for r in registros]
+
+
+def test_leer_registros_continua_desde_el_cursor(visor):
+    visor(1, 40)
+    registros, ultimo = windows.leer_registros('System', 25)
+    assert _numeros(registros) == list(range(26, 41))
+    assert ultimo == 40
+
+
+def test_leer_registros_sin_cursor_lee_solo_los_ultimos(visor):
+    visor(1, REGISTROS_INICIALES + 50)
+    registros, ultimo = windows.leer_registros('System', None)
+    assert len(registros) == REGISTROS_INICIALES
+    assert registros[0]['registro'] == 51 and ultimo == REGISTROS_INICIALES + 50
+
+
+def test_leer_registros_sin_novedades_conserva_el_cursor(visor):
+    visor(1, 40)
+    assert windows.leer_registros('System', 40) == ([], 40)
+
+
+@pytest.mark.parametrize('mas_antiguo, ultimo, cursor', [
+    (1, 30, 500),       # log borrado: la numeración volvió a empezar por debajo del cursor
+    (1000, 1030, 10),   # log rotado: el cursor quedó por debajo del registro más antiguo
+])
+def test_leer_registros_rebobina_si_el_log_se_borro(visor, mas_antiguo, ultimo, cursor):
+    visor(mas_antiguo, ultimo)
+    registros, nuevo_cursor = windows.leer_registros('System', cursor)
+    assert _numeros(registros) == list(range(mas_antiguo, ultimo + 1))
+    assert nuevo_cursor == ultimo
+
+
+def test_leer_registros_log_vacio(visor):
+    visor(1, 0)
+    assert windows.leer_registros('System', 500) == ([], 0)
+
+
+def test_lector_persiste_el_cursor_tras_borrar_el_log(tmp_path, visor):
+    with open(tmp_path / 'cursor.json', 'w', encoding='utf-8') as f:
+        json.dump({'System': 500}, f)
+    visor(1, 30)
+    lector = LectorEventos(ruta_cursor=str(tmp_path / 'cursor.json'), leer_registros=windows.leer_registros,
+                           formatear=lambda registro, log: 'Error en el disco',
+                           ruta_huellas=str(tmp_path / 'huellas.json'))
+
+    assert lector.procesar() == 30
+    with open(tmp_path / 'cursor.json', 'r', encoding='utf-8') as f:
+        assert json.load(f) == {'System': 30}
+    assert LectorEventos(ruta_cursor=str(tmp_path / 'cursor.json'), leer_registros=windows.leer_registros,
+                         formatear=lambda registro, log: '', ruta_huellas=None)._cursor == 30
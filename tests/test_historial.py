@@ -0,0 +1,104 @@
+import pytest
+
+from src.core.historial import BufferCircular, Muestreador, calcular_muestra, resumir
+
+
+def test_buffer_circular_antes_de_llenarse():
+    buffer = BufferCircular(4, 'd')
+    for valor in (1, 2, 3):
+        buffer.agregar(valor)
+    assert len(buffer) == 3
+    assert buffer.valores() == [1, 2, 3]
+    assert buffer.valores(1) == [2, 3]
+
+
+def test_buffer_circular_da_la_vuelta():
+    buffer = BufferCircular(4, 'd')
+    for valor in range(1, 11):
+        buffer.agregar(valor)
+    # Solo quedan las 4 más recientes, en orden cronológico
+    assert len(buffer) == 4
+    assert buffer.valores() == [7, 8, 9, 10]
+    assert buffer.valores(2) == [9, 10]
+    assert buffer.valores(4) == []
+    assert buffer.bytes_ocupados == 4 * 8
+
+
+def test_resumir():
+    assert resumir([]) is None
+    assert resumir([5.0]) == {'min': 5.0, 'max': 5.0, 'prom': 5.0, 'p95': 5.0}
+
+    valores = list(range(1, 101))
+    assert resumir(valores) == {'min': 1, 'max': 100, 'prom': 50.5, 'p95': 95}
+    # Rango más cercano: con 10 valores el p95 es el décimo
+    assert resumir([3, 1, 2, 10, 4, 5, 6, 7, 8, 9])['p95'] == 10
+
+
+def test_calcular_muestra():
+    previos = {'cpu_total': 100.0, 'cpu_ocioso': 80.0, 'ram_porcentaje': 40.0, 'disco_lectura': 0,
+               'disco_escritura': 0, 'red_envio': 10240, 'red_recepcion': 50000}
+    actuales = {'cpu_total': 120.0, 'cpu_ocioso': 95.0, 'ram_porcentaje': 42.0, 'disco_lectura': 51200,
+                'disco_escritura': 0, 'red_envio': 20480, 'red_recepcion': 0}
+    muestra = calcular_muestra(previos, actuales, 5)
+    assert muestra['cpu_porcentaje'] == 25.0
+    assert muestra['disco_lectura_kbs'] == 10.0
+    assert muestra['red_envio_kbs'] == 2.0
+    # Contador reiniciado (adaptador reconectado): 0, no negativo
+    assert muestra['red_recepcion_kbs'] == 0
+
+
+class Contadores:
+    def __init__(self):
+        self.t = 0.0
+        self.n = 0
+
+    def leer(self):
+        self.n += 1
+        return {'cpu_total': self.n * 10.0, 'cpu_ocioso': self.n * 5.0, 'ram_porcentaje': 50.0,
+                'disco_lectura': 0, 'disco_escritura': 0, 'red_envio': 0, 'red_recepcion': 0}
+
+
+def _muestreador(muestras, capacidad=720):
+    contadores = Contadores()
+    muestreador = Muestreador(leer_contadores=contadores.leer, intervalo=5, capacidad=capacidad,
+                              reloj=lambda: contadores.t)
+    tomar(muestreador, contadores, muestras + 1)
+    return muestreador, contadores
+
+
+def tomar(muestreador, contadores, cantidad):
+    for _ in range(cantidad):
+        muestreador.muestrear()
+        contadores.t += 5
+
+
+def test_resumen_no_consume_la_ventana():
+    muestreador, _ = _muestreador(6)
+
+    primero = muestreador.resumen()
+    assert primero['muestras'] == 6 and primero['cpu_porcentaje']['prom'] == 50.0
+    # Un escaneo completo fuera de banda (ACTUALIZAR_DATOS) o un envío que no se confirma
+    assert muestreador.resumen() == primero
+
+
+def test_cerrar_ventana_en_la_marca():
+    muestreador, contadores = _muestreador(6)
+    marca = muestreador.marca()
+    tomar(muestreador, contadores, 2)     # muestras tomadas mientras se enviaba
+
+    muestreador.cerrar_ventana(marca)
+    assert muestreador.resumen()['muestras'] == 2
+
+    # Una confirmación tardía de una marca anterior no reabre la ventana
+    muestreador.cerrar_ventana(marca - 3)
+    assert muestreador.resumen()['muestras'] == 2
+
+    muestreador.cerrar_ventana(muestreador.marca())
+    assert muestreador.resumen() == {}
+
+
+def test_ventana_sin_confirmar_se_acota_a_la_capacidad():
+    muestreador, _ = _muestreador(30, capacidad=10)
+    resumen = muestreador.resumen()
+    assert resumen['muestras'] == 10
+    assert resumen['segundos'] == pytest.approx(50)
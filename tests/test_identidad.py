@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import types
+
+import pytest
+
+from conftest import leer_grabacion
+
+from src.core import scanner
+from src.core.plataforma import windows
+
+
+@pytest.fixture
+def uuids(monkeypatch):
+    """Backend falso que entrega los UUID de la lista en orden; anota las consultas"""
+    pendientes = ['4C4C4544-0042-3510-8052-B4C04F4A4B32', '4C4C4544-0042-3510-8052-B4C04F4A4B99']
+    consultas = []
+
+    def leer_uuid():
+        consultas.append(1)
+        return pendientes[min(len(consultas), len(pendientes)) - 1]
+
+    monkeypatch.setattr(scanner, 'obtener_backend', lambda: types.SimpleNamespace(leer_uuid=leer_uuid))
+    monkeypatch.setattr(scanner, '_CACHE_ESTATICO', {})
+    return consultas
+
+
+def test_la_identidad_se_guarda_en_la_carpeta_de_datos_de_la_prueba(uuids, carpeta_datos):
+    uuid = scanner.obtener_id_inventario()
+
+    assert scanner.IDENTIDAD_PATH == os.path.join(carpeta_datos, 'identidad.json')
+    with open(scanner.IDENTIDAD_PATH, encoding='utf-8') as f:
+        assert json.load(f)['uuid'] == uuid
+
+
+def test_un_reinicio_lee_la_identidad_del_disco(uuids, monkeypatch):
+    uuid = scanner.obtener_id_inventario()
+    monkeypatch.setattr(scanner, '_CACHE_ESTATICO', {})
+
+    assert scanner.obtener_id_inventario() == uuid
+    assert len(uuids) == 1
+
+
+def test_revalidar_vuelve_a_consultar_y_persiste(uuids, monkeypatch):
+    scanner.obtener_id_inventario()
+
+    nuevo = scanner.revalidar_id_inventario()
+    monkeypatch.setattr(scanner, '_CACHE_ESTATICO', {})
+
+    assert nuevo.endswith('B99') and len(uuids) == 2
+    assert scanner.obtener_id_inventario() == nuevo
+
+
+class Wmic:
+    """Sustituto de subprocess para el backend de Windows; anota cada llamada"""
+
+    TimeoutExpired = subprocess.TimeoutExpired
+
+    def __init__(self, salida, codigo=0):
+        self.salida = salida
+        self.codigo = codigo
+        self.llamadas = []
+
+    def run(self, args, **opciones):
+        self.llamadas.append((args, opciones))
+        return subprocess.CompletedProcess(args, self.codigo, self.salida, '')
+
+
+def test_leer_uuid_de_wmic_grabado(monkeypatch):
+    wmic = Wmic(leer_grabacion('wmic_csproduct.txt'))
+    monkeypatch.setattr(windows, 'subprocess', wmic)
+
+    assert windows.leer_uuid() == '4C4C4544-0042-3910-8052-B7C04F4E3732'
+    # Lista de argumentos, sin shell y con tiempo máximo
+    (args, opciones), = wmic.llamadas
+    assert args == ['wmic', 'csproduct', 'get', 'uuid']
+    assert opciones['timeout'] and not opciones.get('shell')
+
+
+def test_leer_uuid_sin_respuesta_de_wmic(monkeypatch):
+    monkeypatch.setattr(windows, 'subprocess', Wmic('', codigo=0x80041003))
+    assert windows.leer_uuid() == ''
@@ -0,0 +1,113 @@
+from src.core.inventario_perifericos import InventarioPerifericos, huella_contenido
+
+
+class Dispositivos:
+    """Listas de dispositivos por categoría y lecturas hechas"""
+
+    def __init__(self):
+        self.listas = {
+            'monitores': [{'modelo': 'DELL P2419H', 'serie': 'ABC123'}],
+            'impresoras': [{'nombre': 'HP LaserJet', 'puerto': 'USB001'}],
+        }
+        self.lecturas = []
+        self.fallar = set()
+
+    def lector(self, categoria):
+        def leer():
+            self.lecturas.append(categoria)
+            if categoria in self.fallar:
+                raise RuntimeError("WMI no responde")
+            return [dict(d) for d in self.listas[categoria]]
+        return leer
+
+
+def _inventario(dispositivos, **opciones):
+    t = [0.0]
+    inventario = InventarioPerifericos({c: dispositivos.lector(c) for c in dispositivos.listas},
+                                       reloj=lambda: t[0], **opciones)
+    return inventario, t
+
+
+def test_primera_lectura_de_todo():
+    dispositivos = Dispositivos()
+    inventario, _ = _inventario(dispositivos)
+
+    assert sorted(inventario.actualizar()) == ['impresoras', 'monitores']
+    assert inventario.valores()['monitores'][0]['serie'] == 'ABC123'
+
+
+def test_reescaneo_solo_tras_aviso_o_ttl():
+    dispositivos = Dispositivos()
+    inventario, t = _inventario(dispositivos, ttl=3600, ttl_sin_senal=600)
+    inventario.activar_senal()
+    inventario.actualizar()
+    dispositivos.lecturas.clear()
+
+    t[0] = 3599
+    assert inventario.actualizar() == []
+    assert dispositivos.lecturas == []
+    assert inventario.estadisticas['escaneos_omitidos'] == 2
+
+    inventario.marcar_cambio(['impresoras'])
+    inventario.actualizar()
+    assert dispositivos.lecturas == ['impresoras']
+
+    t[0] = 3600
+    dispositivos.lecturas.clear()
+    inventario.actualizar()
+    assert dispositivos.lecturas == ['monitores']
+
+
+def test_sin_senal_aplica_el_ttl_corto():
+    dispositivos = Dispositivos()
+    inventario, t = _inventario(dispositivos, ttl=3600, ttl_sin_senal=600)
+    inventario.actualizar()
+    dispositivos.lecturas.clear()
+
+    t[0] = 600
+    inventario.actualizar()
+    assert sorted(dispositivos.lecturas) == ['impresoras', 'monitores']
+
+
+def test_misma_huella_no_cuenta_como_cambio():
+    dispositivos = Dispositivos()
+    inventario, _ = _inventario(dispositivos)
+    inventario.actualizar()
+    anterior = inventario.valores()['monitores']
+
+    # Mismo contenido con las claves en otro orden
+    dispositivos.listas['monitores'] = [{'serie': 'ABC123', 'modelo': 'DELL P2419H'}]
+    inventario.marcar_cambio()
+    assert inventario.actualizar() == []
+    assert inventario.valores()['monitores'] is anterior
+
+    dispositivos.listas['monitores'].append({'modelo': 'LG 27UL500', 'serie': 'XYZ'})
+    inventario.marcar_cambio(['monitores'])
+    assert inventario.actualizar() == ['monitores']
+    assert inventario.estadisticas['cambios'] == 3
+
+
+def test_error_del_lector_conserva_la_categoria_y_reintenta():
+    dispositivos = Dispositivos()
+    inventario, _ = _inventario(dispositivos)
+    inventario.actualizar()
+    huellas = inventario.huellas()
+
+    dispositivos.listas['impresoras'] = []
+    dispositivos.fallar.add('impresoras')
+    inventario.marcar_cambio()
+    assert inventario.actualizar() == []
+    assert inventario.valores()['impresoras'][0]['nombre'] == 'HP LaserJet'
+    assert inventario.huellas() == huellas
+
+    # El aviso no se pierde: la próxima consulta vuelve a leer
+    dispositivos.fallar.clear()
+    dispositivos.lecturas.clear()
+    assert inventario.actualizar() == ['impresoras']
+    assert dispositivos.lecturas == ['impresoras']
+    assert inventario.valores()['impresoras'] == []
+
+
+def test_huella_contenido_independiente_del_orden_de_claves():
+    assert huella_contenido({'a': 1, 'b': [1, 2]}) == huella_contenido({'b': [1, 2], 'a': 1})
+    assert huella_contenido([1, 2]) != huella_contenido([2, 1])
@@ -0,0 +1,176 @@
+import random
+
+from src.core.planificador import (CADENCIA_MINIMA, ESPERA_DIFERIDA, FACTOR_MAXIMO, FACTOR_MINIMO, Planificador,
+                                   desfase_flota)
+from src.database.delta import CalculadorDelta
+
+
+def _planificador(tareas, **opciones):
+    t = [0.0]
+    opciones = {'aleatorio': random.Random(0), 'jitter': 0, 'leer_carga': lambda: 0,
+                'en_bateria': lambda: False, **opciones}
+    planificador = Planificador(tareas, reloj=lambda: t[0], **opciones)
+    return planificador, t
+
+
+def test_cambios_aceleran_hasta_el_minimo_y_luego_relajan():
+    planificador, _ = _planificador({'red': (300, 1)})
+    for _ in range(5):
+        planificador.completar(['red'], {'red'})
+    assert planificador.estado()['red'] == max(CADENCIA_MINIMA, 300 * FACTOR_MINIMO)
+
+    for _ in range(5):
+        planificador.completar(['red'], set())
+    assert planificador.estado()['red'] == 300
+
+
+def test_sondas_sin_aceleracion_mantienen_su_cadencia():
+    planificador, _ = _planificador({'telemetria_agente': (1800, 1), 'metricas_ventana': (300, 1)},
+                                    sin_aceleracion={'telemetria_agente', 'metricas_ventana'})
+    for _ in range(5):
+        planificador.completar(['telemetria_agente', 'metricas_ventana'], {'telemetria_agente', 'metricas_ventana'})
+    assert planificador.estado() == {'telemetria_agente': 1800, 'metricas_ventana': 300}
+
+
+def test_exentas_por_defecto_desde_config():
+    planificador, _ = _planificador({'telemetria_agente': (1800, 1)})
+    planificador.completar(['telemetria_agente'], {'telemetria_agente'})
+    assert planificador.estado()['telemetria_agente'] == 1800
+
+
+def test_contadores_de_trafico_no_aceleran_la_red():
+    delta = CalculadorDelta()
+    red = {'adaptadores': [{'nombre': 'eth0', 'ips': ['10.0.0.2']}],
+           'trafico': {'bytes_enviados_mb': 1000.0, 'paquetes_enviados': 10 ** 6, 'errores_entrada': 0}}
+    delta.reiniciar('pc', {'red': red})
+
+    # Tráfico normal de un ciclo: supera la banda muerta (se escribe) pero no la de aceleración
+    trafico = {'bytes_enviados_mb': 1080.0, 'paquetes_enviados': 10 ** 6 + 60000, 'errores_entrada': 3}
+    cambio, _ = delta.calcular('pc', {'red': {**red, 'trafico': trafico}})
+    assert cambio and delta.cambios_significativos('pc', cambio) == set()
+
+    # Una ráfaga o un adaptador nuevo sí
+    rafaga = {**trafico, 'bytes_enviados_mb': 2000.0}
+    cambio, _ = delta.calcular('pc', {'red': {**red, 'trafico': rafaga}})
+    assert delta.cambios_significativos('pc', cambio) == {'red'}
+
+    adaptadores = red['adaptadores'] + [{'nombre': 'wlan0', 'ips': []}]
+    cambio, _ = delta.calcular('pc', {'red': {**red, 'adaptadores': adaptadores}})
+    assert delta.cambios_significativos('pc', cambio) == {'red'}
+
+
+def test_rutas_nuevas_cuentan_como_cambio():
+    delta = CalculadorDelta()
+    delta.reiniciar('pc', {'cpu_uso_porcentaje': 10})
+    cambio, _ = delta.calcular('pc', {'cpu_uso_porcentaje': 12, 'usuarios': ['ana']})
+    assert delta.cambios_significativos('pc', cambio) == {'usuarios'}
+
+
+def test_desfase_flota_reparte_los_equipos_en_toda_la_cadencia():
+    desfases = [desfase_flota(f'PC-{i:04d}', 300) for i in range(2000)]
+
+    assert all(0 <= d < 300 for d in desfases)
+    # Diez franjas de 30 s: ninguna concentra ni se queda sin equipos
+    franjas = [sum(1 for d in desfases if inicio <= d < inicio + 30) for inicio in range(0, 300, 30)]
+    assert min(franjas) > 150 and max(franjas) < 250
+    # Estable por equipo y proporcional a la cadencia
+    assert desfase_flota('PC-0001', 300) == desfases[1]
+    assert abs(desfase_flota('PC-0001', 900) - 3 * desfases[1]) < 1e-6
+
+
+def test_primer_despertar_segun_el_desfase_del_equipo():
+    tareas = {'red': (300, 1), 'discos': (300, 2), 'perifericos': (1800, 5)}
+    planificador, t = _planificador(tareas, id_flota='PC-0042')
+    desfase = desfase_flota('PC-0042', 300)
+
+    # Las sondas de igual cadencia del mismo equipo comparten despertar
+    assert planificador.estado()['red'] == planificador.estado()['discos'] == round(desfase, 1)
+    assert planificador.proxima_espera() == desfase
+
+    t[0] = desfase - 1
+    assert planificador.vencidas() == []
+    t[0] = desfase
+    assert sorted(planificador.vencidas()) == ['discos', 'red']
+
+
+def test_lo_que_no_entra_en_el_presupuesto_se_difiere():
+    tareas = {'a': (300, 5), 'b': (300, 5), 'c': (300, 5), 'd': (300, 1)}
+    planificador, t = _planificador(tareas, presupuesto=11)
+    t[0] = 300
+
+    assert planificador.vencidas() == ['a', 'b', 'd']
+    assert planificador.estado()['c'] == ESPERA_DIFERIDA
+    planificador.completar(['a', 'b', 'd'])
+
+    t[0] += ESPERA_DIFERIDA - 1
+    assert planificador.vencidas() == []
+    t[0] += 1
+    assert planificador.vencidas() == ['c']
+
+
+def test_una_sonda_mas_cara_que_el_presupuesto_igual_corre():
+    planificador, t = _planificador({'perifericos': (1800, 20), 'red': (300, 1)}, presupuesto=16)
+    t[0] = 1800
+
+    # La más atrasada en proporción a su cadencia va primero; la cara no cabe detrás
+    assert planificador.vencidas() == ['red']
+    planificador.completar(['red'])
+
+    # Sola en su despertar sí corre, aunque supere el presupuesto
+    t[0] += ESPERA_DIFERIDA
+    assert planificador.vencidas() == ['perifericos']
+
+
+def test_maquina_ocupada_o_con_bateria_espacia_las_sondas():
+    carga, bateria = [0], [False]
+    planificador, _ = _planificador({'red': (300, 1)}, leer_carga=lambda: carga[0],
+                                    en_bateria=lambda: bateria[0])
+
+    carga[0] = 95
+    planificador.completar(['red'])
+    assert planificador.estado()['red'] == 600
+
+    bateria[0] = True
+    planificador.completar(['red'])
+    assert planificador.estado()['red'] == 1200
+
+    carga[0] = 10
+    planificador.completar(['red'])
+    assert planificador.estado()['red'] == 600
+
+    bateria[0] = False
+    planificador.completar(['red'])
+    assert planificador.estado()['red'] == 300
+
+
+def test_el_espaciado_respeta_el_maximo_y_se_suma_a_la_aceleracion():
+    planificador, _ = _planificador({'red': (300, 1), 'discos': (600, 1)}, leer_carga=lambda: 100,
+                                    en_bateria=lambda: True)
+    planificador.completar(['discos'])
+    assert planificador.estado()['discos'] == 600 * FACTOR_MAXIMO
+
+    # Acelerada al mínimo (×0.25) y con la máquina ocupada y a batería (×4)
+    for _ in range(3):
+        planificador.completar(['red'], {'red'})
+    assert planificador.estado()['red'] == 300
+
+
+def test_lecturas_de_estado_que_fallan_no_frenan_las_sondas():
+    def falla():
+        raise RuntimeError("sin sensores")
+
+    planificador, _ = _planificador({'red': (300, 1)}, leer_carga=falla, en_bateria=falla)
+    planificador.completar(['red'])
+    assert planificador.estado()['red'] == 300
+
+
+def test_el_jitter_es_uno_por_tanda():
+    planificador, _ = _planificador({'red': (300, 1), 'discos': (300, 2), 'usuarios': (300, 1)},
+                                    jitter=0.1)
+    planificador.completar(['red', 'discos'])
+    planificador.completar(['usuarios'])
+
+    estado = planificador.estado()
+    assert estado['red'] == estado['discos']
+    assert estado['red'] != estado['usuarios']
+    assert all(270 <= segundos <= 330 for segundos in estado.values())
@@ -0,0 +1,125 @@
+import json
+import subprocess
+
+from conftest import leer_grabacion
+
+from src.core.eventos import MAX_REGISTROS_POR_CICLO, REGISTROS_INICIALES, TIPO_ADVERTENCIA, TIPO_ERROR
+from src.core.plataforma import linux
+
+
+def test_parsear_list_units_grabado():
+    estados = linux.parsear_list_units(leer_grabacion('systemctl_list_units.txt'))
+
+    assert len(estados) == 22
+    assert estados['ssh'] == 4 and estados['ufw'] == 4
+    assert estados['unattended-upgrades'] == 4      # reloading
+    assert estados['fwupd'] == 2                    # activating
+    assert estados['networkd-dispatcher'] == 3      # deactivating
+    assert estados['rsyslog'] == 1 and estados['systemd-timesyncd'] == 1
+    # Nombres en minúsculas y con la instancia de las plantillas
+    assert estados['networkmanager'] == 4 and estados['getty@tty1'] == 4
+    # Unidades referenciadas pero sin archivo: no son servicios instalados
+    assert 'auditd' not in estados
+
+
+def test_parsear_list_units_ignora_lineas_ajenas():
+    salida = ("\n"
+              "dev-sda1.device loaded active plugged /dev/sda1\n"
+              "ssh.service loaded active\n"
+              "raro.service loaded maintenance running Estado desconocido\n")
+    assert linux.parsear_list_units(salida) == {}
+
+
+def test_parsear_lpstat_grabado():
+    impresoras = {i['nombre']: i for i in linux.parsear_lpstat(leer_grabacion('lpstat.txt'))}
+
+    assert sorted(impresoras) == ['Brother_HL_L2350DW', 'HP_LaserJet_M404', 'PDF', 'Zebra_ZD420']
+    assert {nombre: i['estado'] for nombre, i in impresoras.items()} == {
+        'Brother_HL_L2350DW': 'Disponible',
+        'HP_LaserJet_M404': 'Imprimiendo',
+        'PDF': 'Disponible',
+        'Zebra_ZD420': 'Deshabilitada'
+    }
+    assert {nombre: i['tipo'] for nombre, i in impresoras.items()} == {
+        'Brother_HL_L2350DW': 'Local',
+        'HP_LaserJet_M404': 'Red',
+        'PDF': 'Local',
+        'Zebra_ZD420': 'Red'
+    }
+    assert impresoras['HP_LaserJet_M404']['puerto'] == 'ipp://192.168.1.40/ipp/print'
+    assert [nombre for nombre, i in impresoras.items() if i['predeterminada']] == ['HP_LaserJet_M404']
+
+
+def test_parsear_lpstat_sin_cups():
+    assert linux.parsear_lpstat("lpstat: No destinations added.\n") == []
+
+
+def _entradas_journal():
+    return [json.loads(linea) for linea in leer_grabacion('journalctl_errores.json').splitlines()]
+
+
+def test_registro_journal_grabado():
+    registros = [linux._registro_journal(entrada) for entrada in _entradas_journal()]
+
+    assert [r['tipo'] for r in registros] == [TIPO_ERROR, TIPO_ERROR, TIPO_ERROR, TIPO_ADVERTENCIA]
+    # SYSLOG_IDENTIFIER, y sin él _SYSTEMD_UNIT, _COMM o el kernel
+    assert [r['fuente'] for r in registros] == ['systemd', 'kernel', 'backup.sh', 'gnome-shell']
+    assert registros[0]['registro'].endswith(';x=a1b2c3d4e5f60718')
+    assert registros[0]['mensaje'] == 'Failed to start rsyslog.service - System Logging Service.'
+    assert all(len(r['fecha']) == 19 for r in registros)
+
+
+def test_registro_journal_mensaje_como_lista_de_bytes():
+    registro = linux._registro_journal(_entradas_journal()[2])
+    # Latin-1 dentro de un journal UTF-8: se reemplaza lo ilegible, no se pierde el resto
+    assert registro['mensaje'] == 'No se pudo copiar /srv/datos/�t�.txt'
+
+    utf8 = linux._registro_journal({'MESSAGE': list('Falló el montaje'.encode('utf-8'))})
+    assert utf8['mensaje'] == 'Falló el montaje'
+    assert utf8['tipo'] != TIPO_ERROR       # sin PRIORITY: info
+
+
+class JournalGrabado:
+    """Reemplazo de _ejecutar: responde a journalctl con la grabación; anota los comandos"""
+
+    def __init__(self, salida, cursor_rotado=False):
+        self.salida = salida
+        self.cursor_rotado = cursor_rotado
+        self.comandos = []
+
+    def __call__(self, comando, timeout=10, **opciones):
+        self.comandos.append(comando)
+        if any(c.startswith('--after-cursor=') for c in comando) and self.cursor_rotado:
+            return subprocess.CompletedProcess(comando, 1, '', 'Failed to seek to cursor: Invalid argument\n')
+        return subprocess.CompletedProcess(comando, 0, self.salida, '')
+
+
+def test_leer_registros_desde_un_cursor(monkeypatch):
+    journal = JournalGrabado(leer_grabacion('journalctl_errores.json'))
+    monkeypatch.setattr(linux, '_ejecutar', journal)
+
+    registros, cursor = linux.leer_registros('System', 's=anterior')
+
+    assert len(registros) == 4 and cursor == registros[-1]['registro']
+    assert journal.comandos == [['journalctl', '--no-pager', '-o', 'json', '-p', '3',
+                                 '-n', str(MAX_REGISTROS_POR_CICLO), '--after-cursor=s=anterior']]
+
+
+def test_leer_registros_con_cursor_rotado_relee_desde_el_principio(monkeypatch):
+    journal = JournalGrabado(leer_grabacion('journalctl_errores.json'), cursor_rotado=True)
+    monkeypatch.setattr(linux, '_ejecutar', journal)
+
+    registros, cursor = linux.leer_registros('System', 's=vaciado')
+
+    assert len(registros) == 4 and cursor == registros[-1]['registro']
+    assert len(journal.comandos) == 2
+    assert journal.comandos[1][-2:] == ['-n', str(REGISTROS_INICIALES)]
+
+
+def test_primera_lectura_sin_errores_fija_el_cursor_actual(monkeypatch):
+    monkeypatch.setattr(linux, '_ejecutar', JournalGrabado(''))
+    monkeypatch.setattr(linux, '_cursor_actual', lambda: 's=actual')
+
+    assert linux.leer_registros('System', None) == ([], 's=actual')
+    # Con un cursor previo y nada nuevo, se conserva el mismo
+    assert linux.leer_registros('System', 's=actual') == ([], 's=actual')
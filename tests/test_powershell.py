@@ -0,0 +1,82 @@
+import sys
+import time
+
+import pytest
+
+from src.core.powershell import _SCRIPT_HOST, ErrorPowerShell, HostPowerShell
+
+# Sustituto en Python del host: habla el mismo protocolo de líneas JSON.
+# El "script" es una orden: eco:<texto>, error:<mensaje>, morir, colgar,
+# tardia:<texto> (antes de responder repite una respuesta de un pedido anterior)
+SUSTITUTO = r'''
+import json, os, sys, time
+print('ruido fuera de protocolo', flush=True)
+for linea in sys.stdin:
+    if not linea.strip():
+        continue
+    pedido = json.loads(linea)
+    orden, _, argumento = pedido['script'].partition(':')
+    if orden == 'morir':
+        sys.exit(1)
+    if orden == 'colgar':
+        time.sleep(60)
+    if orden == 'tardia':
+        print(json.dumps({'id': pedido['id'] - 1, 'ok': True, 'salida': 'vieja'}), flush=True)
+    if orden == 'error':
+        respuesta = {'id': pedido['id'], 'ok': False, 'error': argumento}
+    elif orden == 'pid':
+        respuesta = {'id': pedido['id'], 'ok': True, 'salida': str(os.getpid())}
+    else:
+        respuesta = {'id': pedido['id'], 'ok': True, 'salida': argumento}
+    print(json.dumps(respuesta), flush=True)
+'''
+
+
+@pytest.fixture
+def host():
+    host = HostPowerShell(comando=[sys.executable, '-c', SUSTITUTO])
+    yield host
+    host.cerrar()
+
+
+def test_respuesta_ok(host):
+    assert host.ejecutar('eco:hola\nmundo ñ') == 'hola\nmundo ñ'
+    assert host.ejecutar('eco:') == ''
+    assert host.reinicios == 0
+
+
+def test_respuesta_de_error(host):
+    with pytest.raises(ErrorPowerShell, match='clase WMI inexistente'):
+        host.ejecutar('error:clase WMI inexistente')
+    # El host sigue sirviendo
+    assert host.ejecutar('eco:ok') == 'ok'
+    assert host.reinicios == 0
+
+
+def test_reinicio_tras_caida(host):
+    pid = host.ejecutar('pid')
+    with pytest.raises(ErrorPowerShell, match='terminó'):
+        host.ejecutar('morir')
+    assert host.ejecutar('pid') != pid
+    assert host.reinicios == 1
+
+
+def test_reinicio_tras_timeout(host):
+    pid = host.ejecutar('pid')
+    inicio = time.monotonic()
+    with pytest.raises(ErrorPowerShell, match='Timeout'):
+        host.ejecutar('colgar', timeout=0.5)
+    assert time.monotonic() - inicio < 5
+    assert host.ejecutar('pid') != pid
+    assert host.reinicios == 1
+
+
+def test_descarta_respuesta_tardia_de_otro_pedido(host):
+    host.ejecutar('eco:primero')
+    assert host.ejecutar('tardia:segundo') == 'segundo'
+    assert host.reinicios == 0
+
+
+def test_error_action_stop_solo_para_el_pedido():
+    assert "$ErrorActionPreference = 'Stop'" not in _SCRIPT_HOST
+    assert 'ConvertFrom-Json -ErrorAction Stop' in _SCRIPT_HOST
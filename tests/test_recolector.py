@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from src.core import scanner
+from src.core.recolector import MAX_HILOS, Recolector
+from src.core.telemetria import Telemetria
+
+
+@pytest.fixture
+def liberar():
+    evento = threading.Event()
+    yield evento
+    evento.set()
+
+
+def _demora(segundos, valor):
+    def sonda():
+        time.sleep(segundos)
+        return valor
+    return sonda
+
+
+def test_una_sonda_lenta_excede_su_timeout_y_las_demas_responden(liberar):
+    telemetria = Telemetria(perfilar=False)
+    recolector = Recolector(telemetria=telemetria)
+    recolector.registrar('lenta', lambda: liberar.wait(5), timeout=0.2, por_defecto='sin dato')
+    recolector.registrar('red', _demora(0.05, {'ip': '10.0.0.2'}), timeout=2)
+    recolector.registrar('discos', lambda: 1 / 0, timeout=2, por_defecto=[])
+    recolector.registrar('cpu', lambda: 12.5, timeout=2)
+
+    inicio = time.monotonic()
+    resultados = recolector.ejecutar()
+
+    assert resultados == {'lenta': 'sin dato', 'red': {'ip': '10.0.0.2'}, 'discos': [], 'cpu': 12.5}
+    assert time.monotonic() - inicio < 1.5
+    assert telemetria.resumen()['lenta']['timeouts'] == 1
+
+
+def test_la_espera_en_la_cola_no_cuenta_para_el_timeout(liberar):
+    # Dos hilos: 'segunda' espera a que 'primera' libere el suyo
+    recolector = Recolector(max_hilos=2)
+    recolector.registrar('colgada', lambda: liberar.wait(5), timeout=0.3, por_defecto='x')
+    recolector.registrar('primera', _demora(0.6, 1), timeout=1.0)
+    recolector.registrar('segunda', _demora(0.6, 2), timeout=1.0)
+
+    # Contado desde el envío, 'segunda' terminaría a los 1.2 s de un timeout de 1.0
+    assert recolector.ejecutar() == {'colgada': 'x', 'primera': 1, 'segunda': 2}
+
+
+def test_una_sonda_que_nunca_empieza_se_cancela(liberar):
+    recolector = Recolector(max_hilos=1)
+    recolector.registrar('colgada', lambda: liberar.wait(5), timeout=0.1, por_defecto='x')
+    recolector.registrar('en_cola', lambda: 'listo', timeout=0.2, por_defecto='sin turno')
+
+    assert recolector.ejecutar() == {'colgada': 'x', 'en_cola': 'sin turno'}
+
+    # Cancelada, no queda "en curso": con el hilo libre vuelve a correr
+    liberar.set()
+    time.sleep(0.05)
+    assert recolector.ejecutar(solo={'en_cola'}) == {'en_cola': 'listo'}
+
+
+def test_el_por_defecto_es_una_copia():
+    recolector = Recolector()
+    recolector.registrar('discos', lambda: 1 / 0, por_defecto=[])
+
+    recolector.ejecutar()['discos'].append('sucio')
+
+    assert recolector.ejecutar() == {'discos': []}
+
+
+def test_pesadas_solo_con_incluir_pesados():
+    recolector = Recolector()
+    recolector.registrar('cpu', lambda: 1)
+    recolector.registrar('perifericos', lambda: 2, pesada=True)
+
+    assert recolector.ejecutar(incluir_pesados=False) == {'cpu': 1}
+    assert recolector.ejecutar() == {'cpu': 1, 'perifericos': 2}
+    assert recolector.ejecutar(solo={'perifericos'}) == {'perifericos': 2}
+
+
+def test_hay_un_hilo_por_sonda_del_escaner():
+    assert len(scanner._RECOLECTOR.claves()) <= MAX_HILOS
@@ -0,0 +1,116 @@
+import json
+import logging
+import subprocess
+import sys
+import time
+
+from conftest import RAIZ
+
+from src.core.registro import ArchivoRotativo, FormatoJSON
+from src.core.telemetria import Telemetria
+
+DIA = 24 * 3600
+
+
+def _registro(mensaje, creado):
+    record = logging.LogRecord('src.prueba', logging.INFO, __file__, 1, mensaje, None, None)
+    record.created = creado
+    record.msecs = 0
+    return record
+
+
+def _archivo(ruta, **opciones):
+    manejador = ArchivoRotativo(str(ruta), **opciones)
+    manejador.setFormatter(FormatoJSON())
+    return manejador
+
+
+def _mensajes(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return [json.loads(linea)['msg'] for linea in f]
+
+
+def test_rota_por_antiguedad_sin_llegar_al_tamano(tmp_path):
+    ruta = tmp_path / 'agente.log'
+    inicio = time.time()
+    manejador = _archivo(ruta, max_bytes=5 * 1024 * 1024, copias=3, max_edad=7 * DIA)
+
+    manejador.emit(_registro('uno', inicio))
+    manejador.emit(_registro('dos', inicio + 6 * DIA))
+    manejador.emit(_registro('tres', inicio + 7 * DIA))
+    manejador.emit(_registro('cuatro', inicio + 13 * DIA))
+    manejador.close()
+
+    assert _mensajes(tmp_path / 'agente.log.1') == ['uno', 'dos']
+    assert _mensajes(ruta) == ['tres', 'cuatro']
+
+
+def test_la_antiguedad_sobrevive_a_un_reinicio(tmp_path):
+    ruta = tmp_path / 'agente.log'
+    inicio = time.time() - 8 * DIA
+    manejador = _archivo(ruta, copias=3, max_edad=7 * DIA)
+    manejador.emit(_registro('antes del reinicio', inicio))
+    manejador.close()
+
+    # Otro arranque: la edad se toma del primer registro del archivo, no de cuándo se abrió
+    manejador = _archivo(ruta, copias=3, max_edad=7 * DIA)
+    manejador.emit(_registro('después', time.time()))
+    manejador.close()
+
+    assert _mensajes(tmp_path / 'agente.log.1') == ['antes del reinicio']
+    assert _mensajes(ruta) == ['después']
+
+
+def test_sigue_rotando_por_tamano(tmp_path):
+    ruta = tmp_path / 'agente.log'
+    manejador = _archivo(ruta, max_bytes=300, copias=2, max_edad=7 * DIA)
+    ahora = time.time()
+    for i in range(10):
+        manejador.emit(_registro(f'mensaje {i}', ahora + i))
+    manejador.close()
+
+    assert (tmp_path / 'agente.log.1').exists() and (tmp_path / 'agente.log.2').exists()
+    assert not (tmp_path / 'agente.log.3').exists()
+
+
+def test_sin_max_edad_solo_por_tamano(tmp_path):
+    ruta = tmp_path / 'agente.log'
+    manejador = _archivo(ruta, copias=3)
+    ahora = time.time()
+    manejador.emit(_registro('uno', ahora))
+    manejador.emit(_registro('dos', ahora + 365 * DIA))
+    manejador.close()
+
+    assert _mensajes(ruta) == ['uno', 'dos']
+
+
+def test_cada_medicion_queda_como_linea_json_con_sus_tiempos(tmp_path):
+    ruta = tmp_path / 'agente.log'
+    manejador = _archivo(ruta)
+    registrador = logging.getLogger('src.core.telemetria')
+    registrador.addHandler(manejador)
+    nivel = registrador.level
+    registrador.setLevel(logging.INFO)
+    try:
+        telemetria = Telemetria(perfilar=False)
+        with telemetria.medir('discos') as medicion:
+            medicion['hijos'] += 1
+        telemetria.registrar('ciclo_envio', 12.34, estado='error')
+    finally:
+        registrador.removeHandler(manejador)
+        registrador.setLevel(nivel)
+        manejador.close()
+
+    with open(ruta, encoding='utf-8') as f:
+        lineas = [json.loads(linea) for linea in f]
+    assert [linea['datos']['medicion'] for linea in lineas] == ['discos', 'ciclo_envio']
+    assert lineas[0]['datos']['hijos'] == 1 and lineas[0]['datos']['estado'] == 'ok'
+    assert lineas[1]['datos']['ms'] == 12.3 and lineas[1]['datos']['estado'] == 'error'
+    assert lineas[1]['modulo'] == 'src.core.telemetria'
+
+
+def test_importar_el_cliente_no_configura_el_registro():
+    codigo = ("import src.database.firebase_client, src.core.registro as r, logging; "
+              "assert r._OYENTE is None; assert not logging.getLogger().handlers")
+    resultado = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, capture_output=True, text=True)
+    assert resultado.returncode == 0, resultado.stderr
@@ -0,0 +1,44 @@
+from conftest import leer_grabacion
+
+from src.core.plataforma.windows import parsear_salida_sc
+from src.core.servicios import construir_estados
+
+
+def test_parsear_salida_sc_grabada_en_espanol():
+    estados = parsear_salida_sc(leer_grabacion('sc_queryex.txt'))
+
+    assert len(estados) == 117
+    assert sum(1 for codigo in estados.values() if codigo == 4) == 91
+    assert sum(1 for codigo in estados.values() if codigo == 1) == 26
+    # Nombres en minúsculas: la búsqueda no depende de cómo se configuraron
+    assert estados['windefend'] == 4
+    assert estados['adobearmservice'] == 1
+
+
+def test_parsear_salida_sc_en_ingles():
+    salida = (
+        "SERVICE_NAME: Spooler\r\n"
+        "DISPLAY_NAME: Print Spooler\r\n"
+        "        TYPE               : 110  WIN32_OWN_PROCESS\r\n"
+        "        STATE              : 7  PAUSED\r\n"
+        "\r\n"
+        "SERVICE_NAME: wuauserv\r\n"
+        "        STATE              : 2  START_PENDING\r\n"
+    )
+    assert parsear_salida_sc(salida) == {'spooler': 7, 'wuauserv': 2}
+
+
+def test_parsear_salida_sc_ignora_estado_sin_nombre_y_salida_vacia():
+    assert parsear_salida_sc("        ESTADO             : 4  RUNNING\n") == {}
+    assert parsear_salida_sc("") == {}
+
+
+def test_construir_estados_desde_la_grabacion():
+    estados = parsear_salida_sc(leer_grabacion('sc_queryex.txt'))
+    servicios = {"WinDefend": "Windows Defender", "AdobeARMservice": "Adobe", "NoExiste": "Fantasma"}
+
+    assert construir_estados(servicios, estados) == [
+        {"servicio": "Windows Defender", "estado": "En ejecución", "critico": False},
+        {"servicio": "Adobe", "estado": "Detenido", "critico": True},
+        {"servicio": "Fantasma", "estado": "No instalado", "critico": True},
+    ]
@@ -0,0 +1,103 @@
+import threading
+
+from src.core.recolector import Recolector
+from src.core.telemetria import Histograma, Telemetria
+
+
+def test_percentil_no_supera_el_maximo_observado():
+    histograma = Histograma()
+    for valor in (0.2, 0.3, 0.4):
+        histograma.agregar(valor)
+    # Antes: p50 = 10 (límite del primer cubo) con max_ms = 0
+    assert histograma.percentil(50) == 0
+    assert histograma.percentil(95) == 0
+
+    histograma.agregar(7.6)
+    assert histograma.percentil(95) == 8
+
+
+def test_percentil_por_cubos():
+    histograma = Histograma()
+    for valor in [5] * 50 + [40] * 45 + [900] * 5:
+        histograma.agregar(valor)
+    assert histograma.percentil(50) == 10
+    assert histograma.percentil(95) == 50
+    assert histograma.percentil(100) == 900
+    assert Histograma().percentil(50) == 0
+
+
+def test_percentil_del_ultimo_cubo_es_el_maximo():
+    histograma = Histograma()
+    histograma.agregar(45000)
+    assert histograma.percentil(50) == 45000
+
+
+def test_resumen_separa_timeouts_de_sondas_en_curso():
+    telemetria = Telemetria(perfilar=False)
+    telemetria.registrar('discos', 1200.0)
+    telemetria.anotar('discos', 'timeout')
+    telemetria.anotar('discos', 'en_curso')
+    telemetria.anotar('discos', 'en_curso')
+    telemetria.anotar('discos', 'error')
+
+    resumen = telemetria.resumen()['discos']
+    assert (resumen['timeouts'], resumen['en_curso'], resumen['errores']) == (1, 2, 1)
+    assert resumen['p50_ms'] == 1200 and resumen['max_ms'] == 1200
+
+
+def test_recolector_anota_timeout_y_luego_en_curso():
+    telemetria = Telemetria(perfilar=False)
+    recolector = Recolector(telemetria=telemetria)
+    liberar = threading.Event()
+    recolector.registrar('colgada', lambda: liberar.wait(5), timeout=0.05, por_defecto='x')
+
+    try:
+        assert recolector.ejecutar() == {'colgada': 'x'}
+        assert recolector.ejecutar() == {'colgada': 'x'}
+    finally:
+        liberar.set()
+
+    resumen = telemetria.resumen()['colgada']
+    assert (resumen['timeouts'], resumen['en_curso']) == (1, 1)
+
+
+def test_perfilado_concurrente_perfila_una_sonda_y_mide_todas(tmp_path):
+    telemetria = Telemetria(perfilar=True, carpeta_perfiles=str(tmp_path))
+    dentro = threading.Barrier(3, timeout=5)
+    errores = []
+
+    def sonda(clave):
+        try:
+            with telemetria.medir(clave):
+                dentro.wait()
+        except Exception as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=sonda, args=(f'sonda{i}',)) for i in range(3)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert errores == []
+    assert sorted(telemetria.resumen()) == ['sonda0', 'sonda1', 'sonda2']
+    assert len(list(tmp_path.glob('*.prof'))) == 1
+
+
+def test_perfilador_ocupado_no_rompe_la_medicion(tmp_path, monkeypatch):
+    from src.core import telemetria as modulo
+
+    class PerfilOcupado:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(modulo.cProfile, 'Profile', PerfilOcupado)
+    telemetria = Telemetria(perfilar=True, carpeta_perfiles=str(tmp_path))
+
+    with telemetria.medir('discos') as medicion:
+        assert medicion == {'hijos': 0, 'bytes': 0}
+    assert getattr(modulo._hilo, 'medicion', None) is None
+    assert telemetria.resumen()['discos']['errores'] == 0
+    # El candado quedó libre: la próxima medición puede perfilar
+    assert modulo._PERFILANDO.acquire(blocking=False)
+    modulo._PERFILANDO.release()
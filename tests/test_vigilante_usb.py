@@ -0,0 +1,128 @@
+from src.core.vigilante_usb import CONECTADO, DESCONECTADO, VigilanteUSB, diferencias
+
+MOUSE = 'USB\\VID_046D&PID_C52B\\1'
+PENDRIVE = 'USB\\VID_0781&PID_5567\\2'
+CAMARA = 'USB\\VID_046D&PID_085E\\3'
+
+
+class Bus:
+    """Dispositivos presentes y llamadas a enumerar/describir"""
+
+    def __init__(self, *ids):
+        self.presentes = {i: {'FriendlyName': f'Disp {i[-1]}', 'Class': 'HIDClass'} for i in ids}
+        self.enumeraciones = 0
+        self.descripciones = []
+
+    def enumerar(self):
+        self.enumeraciones += 1
+        return dict(self.presentes)
+
+    def describir(self, ids):
+        self.descripciones.append(list(ids))
+        return {i: self.presentes[i] for i in ids if i in self.presentes}
+
+
+def _vigilante(bus, reconciliar_cada=60):
+    t = [0.0]
+    vigilante = VigilanteUSB(bus.enumerar, bus.describir, reconciliar_cada=reconciliar_cada,
+                             reloj=lambda: t[0], fecha=lambda: f't+{t[0]:.0f}')
+    return vigilante, t
+
+
+def _resumen(vigilante):
+    return [(e['tipo'], e['id'], e['fecha']) for e in vigilante.eventos()]
+
+
+def test_diferencias():
+    assert diferencias({'a': 1, 'b': 2}, {'b': 2, 'c': 3}) == (['c'], ['a'])
+    assert diferencias({}, {}) == ([], [])
+
+
+def test_primera_enumeracion_es_linea_base():
+    bus = Bus(MOUSE, PENDRIVE)
+    vigilante, _ = _vigilante(bus)
+    vigilante.aviso(CONECTADO, MOUSE)     # anterior a la línea base: ya queda reflejado en ella
+
+    assert len(vigilante.entradas()) == 2
+    assert vigilante.eventos() == []
+    assert bus.descripciones == []
+
+
+def test_llegada_y_retiro_por_avisos_sin_enumerar():
+    bus = Bus(MOUSE, PENDRIVE)
+    vigilante, t = _vigilante(bus)
+    vigilante.actualizar()
+
+    t[0] = 5
+    bus.presentes[CAMARA] = {'FriendlyName': 'Logitech BRIO', 'Class': 'Image'}
+    vigilante.aviso(CONECTADO, CAMARA.lower())
+    vigilante.aviso(CONECTADO, CAMARA)        # aviso repetido (otra interfaz del mismo dispositivo)
+    t[0] = 10
+    del bus.presentes[PENDRIVE]
+    vigilante.aviso(DESCONECTADO, PENDRIVE)
+
+    assert _resumen(vigilante) == [(CONECTADO, CAMARA, 't+5'), (DESCONECTADO, PENDRIVE, 't+10')]
+    # Un solo describir() para las llegadas pendientes y ninguna enumeración extra
+    assert bus.descripciones == [[CAMARA]]
+    assert bus.enumeraciones == 1
+    assert {e['FriendlyName'] for e in vigilante.entradas()} == {'Disp 1', 'Logitech BRIO'}
+
+
+def test_avisos_ignorados():
+    bus = Bus(MOUSE)
+    vigilante, _ = _vigilante(bus)
+    vigilante.actualizar()
+
+    vigilante.aviso(CONECTADO, 'HID\\VID_046D&PID_C52B\\7')   # no es USB
+    vigilante.aviso(CONECTADO, '')
+    vigilante.aviso(CONECTADO, MOUSE)                       # ya presente
+    vigilante.aviso(DESCONECTADO, PENDRIVE)                 # nunca estuvo
+    vigilante.aviso(CONECTADO, CAMARA)                      # ya no está al describir
+
+    assert vigilante.eventos() == []
+    assert vigilante.estadisticas['avisos'] == 3
+
+
+def test_reconciliacion_detecta_cambios_sin_aviso():
+    bus = Bus(MOUSE, PENDRIVE)
+    vigilante, t = _vigilante(bus, reconciliar_cada=60)
+    vigilante.actualizar()
+
+    del bus.presentes[MOUSE]
+    bus.presentes[CAMARA] = {'FriendlyName': 'Logitech BRIO', 'Class': 'Image'}
+    t[0] = 59
+    assert vigilante.eventos() == []      # aún no toca reconciliar
+
+    t[0] = 60
+    assert _resumen(vigilante) == [(CONECTADO, CAMARA, 't+60'), (DESCONECTADO, MOUSE, 't+60')]
+    assert vigilante.estadisticas['reconciliaciones'] == 2
+    assert bus.enumeraciones == 2
+
+
+def test_reconciliacion_no_duplica_lo_que_vieron_los_avisos():
+    bus = Bus(MOUSE)
+    vigilante, t = _vigilante(bus, reconciliar_cada=60)
+    vigilante.actualizar()
+
+    bus.presentes[PENDRIVE] = {'FriendlyName': 'SanDisk', 'Class': 'DiskDrive'}
+    vigilante.aviso(CONECTADO, PENDRIVE)
+    vigilante.actualizar()
+    t[0] = 120
+
+    assert [e['tipo'] for e in vigilante.eventos()] == [CONECTADO]
+
+
+def test_eventos_acotados():
+    bus = Bus(MOUSE)
+    t = [0.0]
+    vigilante = VigilanteUSB(bus.enumerar, bus.describir, max_eventos=3, reloj=lambda: t[0])
+    vigilante.actualizar()
+    for _ in range(3):
+        vigilante.aviso(DESCONECTADO, MOUSE)
+        vigilante.actualizar()
+        vigilante.aviso(CONECTADO, MOUSE)
+        vigilante.actualizar()
+
+    eventos = vigilante.eventos()
+    assert [e['tipo'] for e in eventos] == [CONECTADO, DESCONECTADO, CONECTADO]
+    assert vigilante.estadisticas['eventos'] == 6